@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import json
 import os
 import datetime
@@ -12,43 +12,114 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Ensure data directory exists
-os.makedirs('data', exist_ok=True)
-
-# Set up logging
-log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-log_file = 'blkout_nxt.log'
-log_handler = RotatingFileHandler(log_file, maxBytes=1024*1024*5, backupCount=5)
-log_handler.setFormatter(log_formatter)
-log_handler.setLevel(logging.INFO)
-
 app_logger = logging.getLogger('blkout_nxt')
 app_logger.setLevel(logging.INFO)
-app_logger.addHandler(log_handler)
 
-# Add console logging for Render
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(log_formatter)
-console_handler.setLevel(logging.INFO)
-app_logger.addHandler(console_handler)
+def configure_logging():
+    """Create the data directory and attach the file and console log handlers, once per process.
+
+    Called when the process starts serving (see start_background_jobs), not
+    at import, so importing the app has no side effects on disk.
+    """
+    if app_logger.handlers:
+        return
+
+    # Ensure data directory exists
+    os.makedirs('data', exist_ok=True)
 
-app_logger.info("Starting BLKOUT NXT Backend")
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    log_file = 'blkout_nxt.log'
+    log_handler = RotatingFileHandler(log_file, maxBytes=1024*1024*5, backupCount=5)
+    log_handler.setFormatter(log_formatter)
+    log_handler.setLevel(logging.INFO)
+    app_logger.addHandler(log_handler)
+
+    # Add console logging for Render
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(log_formatter)
+    console_handler.setLevel(logging.INFO)
+    app_logger.addHandler(console_handler)
+
+    app_logger.info("Starting BLKOUT NXT Backend")
 
 # Import our custom modules
 from member_manager import MemberManager
 from email_sender import EmailSender
 from survey_handler import SurveyHandler
+from drip_scheduler import DripScheduler
+import json_codec
 
 app = Flask(__name__)
 
-# Initialize the managers
+# Initialize the managers; they all share one member store
 member_manager = MemberManager()
-survey_handler = SurveyHandler()
-email_sender = EmailSender()
+survey_handler = SurveyHandler(member_manager)
+email_sender = EmailSender(member_manager, survey_handler)
+drip_scheduler = DripScheduler(member_manager, email_sender)
+
+# The Sheets sync pulls in requests and reads the service account, so it is built on first use
+_sheets_sync = None
+
+def get_sheets_sync():
+    """Get the Google Sheets sync, creating it on first use."""
+    global _sheets_sync
+    if _sheets_sync is None:
+        from sheets_sync import SheetsSync
+        _sheets_sync = SheetsSync(member_manager, email_sender.config)
+    return _sheets_sync
+
+# Held open for the life of the process that runs the drip scheduler
+SCHEDULER_LOCK_FILE = os.path.join('data', 'drip_scheduler.lock')
+_scheduler_lock = None
+
+def acquire_scheduler_lock():
+    """Take the drip scheduler lock without waiting; True if this process now holds it.
+
+    The lock is an flock on a file under data/, so exactly one process on
+    the host wins it and the kernel releases it when that process exits.
+    """
+    global _scheduler_lock
+    try:
+        import fcntl
+    except ImportError:
+        # No flock on Windows; the development server is a single process anyway
+        return True
+
+    lock_file = open(SCHEDULER_LOCK_FILE, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _scheduler_lock = lock_file
+    return True
+
+def start_background_jobs():
+    """Set up logging and start the drip scheduler, if enabled, in this process.
+
+    Threads do not survive fork, so under gunicorn this runs in each worker
+    after it is forked (see gunicorn.conf.py), never at import. That keeps
+    the app safe to load once in the master with --preload. Every worker
+    tries, but only the one that wins the scheduler lock starts it; a
+    worker forked to replace it takes the lock over.
+    """
+    configure_logging()
+
+    if os.environ.get('ENABLE_DRIP_SCHEDULER', 'false').lower() != 'true':
+        return
+    if not acquire_scheduler_lock():
+        app_logger.info("Drip scheduler already running in another process")
+        return
+    drip_scheduler.start()
+    app_logger.info(f"Drip scheduler started in process {os.getpid()}")
 
 # Get Tally signing secret from environment variables
 TALLY_SIGNING_SECRET = os.environ.get('TALLY_SIGNING_SECRET', '')
 
+def json_response(payload, status=200):
+    """Build a JSON response with the fast codec instead of jsonify."""
+    return Response(json_codec.dumps(payload), status=status, mimetype='application/json')
+
 def verify_tally_signature(request):
     """Verify that the request is coming from Tally."""
     # For development/testing, you can set this environment variable to bypass verification
@@ -212,6 +283,11 @@ def survey_webhook():
         except Exception as e:
             app_logger.error(f"Error sending confirmation email: {str(e)}")
 
+        # Enroll the member in their drip campaign; the running scheduler picks it up from the store
+        member = member_manager.get_member(member_id=result["member_id"])
+        if member:
+            drip_scheduler.enroll(member)
+
         return jsonify({"success": True, "message": "Survey processed successfully"}), 200
 
     except Exception as e:
@@ -223,7 +299,7 @@ def get_members():
     """Get all members."""
     try:
         members = member_manager.get_all_members()
-        return jsonify({"success": True, "members": members}), 200
+        return json_response({"success": True, "members": [member.to_dict() for member in members]})
     except Exception as e:
         app_logger.error(f"Error getting members: {str(e)}")
         return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
@@ -237,7 +313,7 @@ def get_member(member_id):
         if not member:
             return jsonify({"success": False, "message": "Member not found"}), 404
 
-        return jsonify({"success": True, "member": member}), 200
+        return json_response({"success": True, "member": member.to_dict()})
     except Exception as e:
         app_logger.error(f"Error getting member: {str(e)}")
         return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
@@ -255,7 +331,7 @@ def send_reminders():
         # Send reminder emails
         sent_count = 0
         for member in members:
-            result = email_sender.send_reminder_email(member["id"])
+            result = email_sender.send_reminder_email(member.id)
             if result["success"]:
                 sent_count += 1
 
@@ -264,6 +340,51 @@ def send_reminders():
         app_logger.error(f"Error sending reminders: {str(e)}")
         return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
 
+@app.route('/api/drip/due', methods=['GET'])
+def get_drip_due():
+    """Get members whose next drip email is due, optionally for one campaign."""
+    try:
+        members = member_manager.get_members_due_for_drip(campaign=request.args.get('campaign'))
+        return json_response({"success": True, "members": [member.to_dict() for member in members]})
+    except Exception as e:
+        app_logger.error(f"Error getting due drip members: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+@app.route('/api/drip/<member_id>/sent', methods=['POST'])
+def record_drip_sent(member_id):
+    """Record that a drip email was sent (e.g. by n8n) and advance the member's stage."""
+    try:
+        member = drip_scheduler.record_drip_sent(member_id)
+
+        if not member:
+            return jsonify({"success": False, "message": "Member not found or no drip email pending"}), 404
+
+        return json_response({"success": True, "member": member.to_dict()})
+    except Exception as e:
+        app_logger.error(f"Error recording drip email: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+@app.route('/api/sync-sheets', methods=['POST'])
+def sync_sheets():
+    """Push changed members to the Subscribers Google Sheet."""
+    try:
+        result = get_sheets_sync().sync()
+        return jsonify(result), 200 if result["success"] else 500
+    except Exception as e:
+        app_logger.error(f"Error syncing sheet: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
+@app.route('/api/compact-email-history', methods=['POST'])
+def compact_email_history():
+    """Move old email history entries into the archive file."""
+    try:
+        data = request.get_json(silent=True) or {}
+        result = member_manager.compact_email_history(max_age_days=int(data.get("max_age_days", 90)))
+        return jsonify(result), 200 if result["success"] else 500
+    except Exception as e:
+        app_logger.error(f"Error compacting email history: {str(e)}")
+        return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+
 @app.route('/', methods=['GET', 'POST'])
 def home():
     """Home page and fallback webhook handler."""
@@ -324,6 +445,10 @@ def home():
             <li><code>GET /api/members</code> - Get all members</li>
             <li><code>GET /api/members/{member_id}</code> - Get a specific member</li>
             <li><code>POST /api/send-reminders</code> - Send reminder emails</li>
+            <li><code>GET /api/drip/due?campaign=ally</code> - Get members due for their next drip email</li>
+            <li><code>POST /api/drip/{member_id}/sent</code> - Record a drip email sent by n8n</li>
+            <li><code>POST /api/sync-sheets</code> - Push changed members to the Subscribers Google Sheet</li>
+            <li><code>POST /api/compact-email-history</code> - Archive old email history entries</li>
         </ul>
 
         <h2>Example Signup Webhook Request</h2>
@@ -354,6 +479,8 @@ Content-Type: application/json
     """
 
 if __name__ == '__main__':
+    start_background_jobs()
+
     # Use debug mode only in development
     debug_mode = os.environ.get('FLASK_ENV', 'development') == 'development'
     port = int(os.environ.get('PORT', 5000))
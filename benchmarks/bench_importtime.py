@@ -0,0 +1,114 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+MCP_DIR = REPO_DIR / "mcp-server-app" / "mcp-server"
+
+ROUNDS = 5
+
+# name -> (module, directory it is imported from, module already loaded first, budget in ms)
+# MCP servers are measured on top of FastMCP, which every server pays for regardless.
+TARGETS = {
+    "app": ("app", REPO_DIR, None, 250),
+    "campaign_server": ("campaign_server", MCP_DIR / "campaign-server", "mcp.server.fastmcp", 60),
+    "sendfox_server": ("sendfox_server", MCP_DIR / "integration-server" / "sendfox", "mcp.server.fastmcp", 60),
+    "heartbeat_server": ("heartbeat_server", MCP_DIR / "integration-server" / "heartbeat", "mcp.server.fastmcp", 60),
+    "social_server": ("social_server", MCP_DIR / "integration-server" / "social-media", "mcp.server.fastmcp", 60),
+    "weather_server": ("weather_server", MCP_DIR, "mcp.server.fastmcp", 60),
+    "file_server": ("file_server", MCP_DIR, "mcp.server.fastmcp", 60),
+}
+
+# Modules that only rarely-used paths need; importing one at startup is a regression
+DEFERRED_MODULES = {
+    "app": ["requests", "smtplib", "email.mime.text", "sheets_sync"],
+    "campaign_server": ["httpcore"],
+    "sendfox_server": ["httpcore", "member_manager"],
+    "weather_server": ["httpcore"],
+}
+
+
+def import_profile(module, directory, preload=None):
+    """Import module in a fresh interpreter with -X importtime.
+
+    Returns (cumulative microseconds for module, set of modules imported after preload,
+    files the import created). The import runs in a scratch working directory, which
+    should still be empty afterwards: importing a module must not write to disk.
+    """
+    code = f"import {preload}; import {module}" if preload else f"import {module}"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(directory), os.environ.get("PYTHONPATH", "")]))
+    with tempfile.TemporaryDirectory() as scratch:
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                cwd=scratch, env=env, capture_output=True, text=True)
+        created = sorted(str(path.relative_to(scratch)) for path in Path(scratch).rglob("*") if path.is_file())
+    if result.returncode != 0:
+        errors = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"Importing {module} failed:\n{errors[-2000:]}")
+
+    cumulative = None
+    imported = set()
+    seen_preload = preload is None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        name = name.strip()
+        if seen_preload:
+            imported.add(name)
+        if name == preload:
+            seen_preload = True
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported, created
+
+
+def best_of(module, directory, preload):
+    """Return the fastest of ROUNDS imports, in ms, the modules the import pulled in and the files it wrote."""
+    timings = []
+    imported = set()
+    created = []
+    for _ in range(ROUNDS):
+        cumulative, imported, created = import_profile(module, directory, preload)
+        timings.append(cumulative / 1000)
+    return min(timings), imported, created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check cold-start import time against a per-module budget.")
+    parser.add_argument("targets", nargs="*", help=f"Modules to check (default: all of {', '.join(TARGETS)})")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply every budget, e.g. 2 on a slow machine")
+    args = parser.parse_args()
+
+    failures = 0
+    for name in args.targets or TARGETS:
+        module, directory, preload, budget = TARGETS[name]
+        budget *= args.budget_scale
+        try:
+            ms, imported, created = best_of(module, directory, preload)
+        except RuntimeError as e:
+            # A module that no longer imports is the worst regression of all
+            failures += 1
+            print(f"{name:<18} IMPORT FAILED")
+            print("\n".join(f"{'':<18} {line}" for line in str(e).splitlines()[1:]))
+            continue
+
+        eager = [deferred for deferred in DEFERRED_MODULES.get(name, []) if deferred in imported]
+        status = "ok"
+        if ms > budget or eager or created:
+            failures += 1
+            status = "OVER BUDGET" if ms > budget else "REGRESSION"
+        print(f"{name:<18} {ms:8.1f} ms  (budget {budget:.0f} ms)  {status}")
+        if eager:
+            print(f"{'':<18} imported at startup: {', '.join(eager)}")
+        if created:
+            print(f"{'':<18} wrote at import: {', '.join(created)}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
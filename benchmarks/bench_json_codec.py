@@ -0,0 +1,70 @@
+import datetime
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add the repository root to the path so we can import the backend modules
+parent_dir = str(Path(__file__).resolve().parents[1])
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+import json_codec
+
+MEMBER_COUNT = 100_000
+ROUNDS = 3
+
+
+def build_document(count):
+    """Build a members document shaped like data/members.json."""
+    now = datetime.datetime.now().isoformat()
+    members = []
+    for i in range(count):
+        members.append({
+            "id": str(uuid.uuid4()),
+            "name": f"Member {i}",
+            "email": f"member{i}@example.com",
+            "member_type": "Ally",
+            "status": "welcomed",
+            "date_added": now,
+            "last_email_sent": now,
+            "email_history": [
+                {"type": "welcome", "subject": "Welcome to BLKOUT NXT!", "sent_at": now}
+            ],
+            "survey_completed": False,
+            "survey_data": None
+        })
+    return {"members": members}
+
+
+def best_of(func):
+    """Return the fastest of ROUNDS runs of func, in seconds."""
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    document = build_document(MEMBER_COUNT)
+    stdlib_raw = json.dumps(document, indent=2)
+    codec_raw = json_codec.dumps(document)
+
+    results = [
+        ("stdlib dumps (indent=2)", best_of(lambda: json.dumps(document, indent=2))),
+        (f"{json_codec.BACKEND} dumps", best_of(lambda: json_codec.dumps(document))),
+        ("stdlib loads", best_of(lambda: json.loads(stdlib_raw))),
+        (f"{json_codec.BACKEND} loads", best_of(lambda: json_codec.loads(codec_raw))),
+    ]
+
+    print(f"Members: {MEMBER_COUNT}, codec backend: {json_codec.BACKEND}")
+    print(f"Document size: stdlib {len(stdlib_raw) / 1e6:.1f} MB, codec {len(codec_raw) / 1e6:.1f} MB")
+    for label, seconds in results:
+        print(f"{label:<28} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
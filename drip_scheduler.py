@@ -0,0 +1,312 @@
+import datetime
+import heapq
+import itertools
+import logging
+import os
+import threading
+
+logger = logging.getLogger('blkout_nxt')
+
+from models import MemberStatus
+
+# Jobs are either "reminder" or "drip:<campaign>"
+REMINDER_JOB = "reminder"
+
+# Failures that retrying cannot fix; the job is dropped instead
+PERMANENT_FAILURES = ("Member not found", "Could not generate survey link", "No drip email for")
+
+
+class DripScheduler:
+    """Send survey reminders and drip campaign emails when they fall due.
+
+    Each member has at most one pending job, kept in a min-heap ordered by
+    due time. The worker thread sleeps until the earliest job is due (or a
+    member is rescheduled), so members are only looked at when they have
+    something to send. Members are added and changed by every worker
+    process, so the thread also checks the member file every poll_seconds
+    and rebuilds the queue when it has changed.
+    """
+
+    def __init__(self, member_manager, email_sender, retry_delay_minutes=60, max_attempts=5, poll_seconds=30):
+        """Initialize the scheduler with the managers used to read members and send emails."""
+        self.member_manager = member_manager
+        self.email_sender = email_sender
+
+        # Timing settings come from the shared config file
+        config = email_sender.config
+        self.reminder_wait = datetime.timedelta(days=config.get("surveys", {}).get("reminder_wait_days", 3))
+        drip_config = config.get("drip_campaigns", {})
+        self.drip_initial_delay = datetime.timedelta(days=drip_config.get("initial_delay_days", 1))
+        self.drip_frequency = datetime.timedelta(days=drip_config.get("email_frequency_days", 7))
+        self.retry_delay = datetime.timedelta(minutes=retry_delay_minutes)
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+
+        self._heap = []
+        self._scheduled = {}
+        self._attempts = {}
+        self._counter = itertools.count()
+        self._store_key = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def next_job(self, member):
+        """Work out a member's next job and when it is due, or None if nothing is pending."""
+        if member.status == MemberStatus.UNSUBSCRIBED:
+            return None
+
+        if not member.survey_completed:
+            # Member types without a survey (Other) are never reminded
+            if not member.member_type.survey_key or member.has_received("reminder") or not member.date_added:
+                return None
+            date_added = datetime.datetime.fromisoformat(member.date_added)
+            return date_added + self.reminder_wait, REMINDER_JOB
+
+        if not member.drip_campaign or not member.drip_next_due:
+            return None
+        return datetime.datetime.fromisoformat(member.drip_next_due), f"drip:{member.drip_campaign}"
+
+    def enroll(self, member):
+        """Enroll a member who completed the survey in their drip campaign.
+
+        Members who already received drip emails before the drip fields
+        existed resume from their email counters. Returns the updated member.
+        """
+        campaign = member.member_type.drip_campaign
+        if member.drip_campaign or not member.survey_completed or not campaign:
+            return member
+
+        email_type = f"drip_{campaign}"
+        stage = member.count_by_type.get(email_type, 0)
+        last_sent = member.last_sent_by_type.get(email_type)
+        if stage >= self.email_sender.get_drip_length(campaign):
+            next_due = None
+        elif last_sent:
+            next_due = (datetime.datetime.fromisoformat(last_sent) + self.drip_frequency).isoformat()
+        else:
+            started = member.survey_completed_at or member.date_added
+            next_due = (datetime.datetime.fromisoformat(started) + self.drip_initial_delay).isoformat()
+
+        return self._update_drip_state(member.id, {
+            "drip_campaign": campaign,
+            "drip_stage": stage,
+            "drip_next_due": next_due,
+            "drip_last_sent": last_sent
+        })
+
+    def record_drip_sent(self, member_id, sent_at=None):
+        """Advance a member to the next drip stage after an email went out.
+
+        Used by the scheduler itself and by n8n workflows that send the
+        email on our behalf. Returns the updated member, or None if the
+        member has no drip email pending.
+        """
+        member = self.member_manager.get_member(member_id=member_id)
+        if not member or not member.drip_campaign or not member.drip_next_due:
+            # Unknown member, not enrolled, or campaign already finished
+            return None
+
+        sent_at = sent_at or datetime.datetime.now()
+        stage = member.drip_stage + 1
+        if stage < self.email_sender.get_drip_length(member.drip_campaign):
+            next_due = (sent_at + self.drip_frequency).isoformat()
+        else:
+            next_due = None
+
+        return self._update_drip_state(member_id, {
+            "drip_stage": stage,
+            "drip_next_due": next_due,
+            "drip_last_sent": sent_at.isoformat()
+        })
+
+    def schedule_member(self, member):
+        """(Re)schedule a member's next job, waking the worker if it is now the earliest."""
+        try:
+            entry = self.next_job(member)
+        except ValueError as e:
+            logger.error(f"Cannot schedule member {member.id}: {str(e)}")
+            return
+
+        self._set_entry(member.id, entry)
+
+    def rebuild(self):
+        """Rebuild the queue from the member store."""
+        with self._lock:
+            # Jobs waiting out a retry backoff keep their retry time
+            retries = {member_id: self._scheduled[member_id] for member_id in self._attempts
+                       if member_id in self._scheduled}
+            self._heap = []
+            self._scheduled = {}
+
+        # Read the file's stat first, so a change made while loading triggers another rebuild
+        self._store_key = self._read_store_key()
+        for member in self.member_manager.get_all_members():
+            if member.survey_completed and not member.drip_campaign:
+                try:
+                    member = self.enroll(member)
+                except ValueError as e:
+                    logger.error(f"Cannot enroll member {member.id}: {str(e)}")
+                    continue
+                if not member:
+                    continue
+            retry = retries.get(member.id)
+            if retry:
+                try:
+                    current = self.next_job(member)
+                except ValueError:
+                    current = None
+                if current and current[1] == retry[1]:
+                    self._set_entry(member.id, retry)
+                    continue
+                self._attempts.pop(member.id, None)
+            self.schedule_member(member)
+
+        logger.info(f"Drip scheduler loaded {len(self._scheduled)} pending jobs")
+
+    def store_changed(self):
+        """Whether the member file changed since the queue was last rebuilt."""
+        return self._read_store_key() != self._store_key
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the earliest job is due, or None when the queue is empty."""
+        now = now or datetime.datetime.now()
+        with self._lock:
+            self._discard_stale()
+            if not self._heap:
+                return None
+            return max((self._heap[0][0] - now).total_seconds(), 0)
+
+    def run_due(self, now=None):
+        """Dispatch every job that is due and return the number of emails sent."""
+        now = now or datetime.datetime.now()
+        sent_count = 0
+
+        while True:
+            with self._lock:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                due_at, _, member_id, job = heapq.heappop(self._heap)
+                del self._scheduled[member_id]
+
+            # The member may have changed since the job was queued: only send what is still due
+            member = self.member_manager.get_member(member_id=member_id)
+            if not member:
+                self._attempts.pop(member_id, None)
+                continue
+            try:
+                current = self.next_job(member)
+            except ValueError as e:
+                logger.error(f"Cannot schedule member {member_id}: {str(e)}")
+                current = None
+            if current is None or current[1] != job or current[0] > now:
+                self._attempts.pop(member_id, None)
+                self._set_entry(member_id, current)
+                continue
+
+            result = self._dispatch(member, job)
+
+            if result["success"]:
+                sent_count += 1
+                self._attempts.pop(member_id, None)
+                member = self.member_manager.get_member(member_id=member_id)
+                if member:
+                    self.schedule_member(member)
+                continue
+
+            attempts = self._attempts.get(member_id, 0) + 1
+            if result["message"].startswith(PERMANENT_FAILURES) or attempts >= self.max_attempts:
+                logger.error(f"Drip job {job} for member {member_id} dropped after {attempts} attempts: {result['message']}")
+                self._attempts.pop(member_id, None)
+                continue
+
+            # Back off: retry_delay, then twice that, and so on
+            self._attempts[member_id] = attempts
+            retry_at = now + self.retry_delay * 2 ** (attempts - 1)
+            logger.warning(f"Drip job {job} for member {member_id} failed, retrying at {retry_at.isoformat()}: {result['message']}")
+            self._set_entry(member_id, (retry_at, job))
+
+        return sent_count
+
+    def start(self):
+        """Start the background worker thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="drip-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background worker thread."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        """Worker loop: sleep until the next job is due or the poll interval passes, then dispatch."""
+        while not self._stopping.is_set():
+            try:
+                if self.store_changed():
+                    self.rebuild()
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Error running drip jobs: {str(e)}")
+
+            timeout = self.seconds_until_next()
+            self._wakeup.wait(self.poll_seconds if timeout is None else min(timeout, self.poll_seconds))
+            self._wakeup.clear()
+
+    def _dispatch(self, member, job):
+        """Send the email for a job."""
+        if job == REMINDER_JOB:
+            return self.email_sender.send_reminder_email(member.id)
+
+        result = self.email_sender.send_drip_email(member.id, member.drip_campaign, member.drip_stage)
+        if result["success"]:
+            self.record_drip_sent(member.id)
+        return result
+
+    def _update_drip_state(self, member_id, drip_state):
+        """Save drip state fields and return the updated member (None on failure)."""
+        result = self.member_manager.update_member(member_id, drip_state)
+        if not result["success"]:
+            logger.error(f"Failed to update drip state for member {member_id}: {result['message']}")
+            return None
+        return self.member_manager.get_member(member_id=member_id)
+
+    def _read_store_key(self):
+        """The member file's (mtime_ns, size), or None if it cannot be read."""
+        try:
+            stat = os.stat(self.member_manager.file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _set_entry(self, member_id, entry):
+        """Replace a member's pending job; superseded heap entries are dropped lazily."""
+        with self._lock:
+            if entry is None:
+                self._scheduled.pop(member_id, None)
+                return
+            if self._scheduled.get(member_id) == entry:
+                return
+
+            due_at, job = entry
+            self._scheduled[member_id] = entry
+            heapq.heappush(self._heap, (due_at, next(self._counter), member_id, job))
+            is_earliest = self._heap[0][2] == member_id
+
+        if is_earliest:
+            self._wakeup.set()
+
+    def _discard_stale(self):
+        """Pop heap entries that no longer match the member's pending job (lock held)."""
+        while self._heap:
+            due_at, _, member_id, job = self._heap[0]
+            if self._scheduled.get(member_id) == (due_at, job):
+                return
+            heapq.heappop(self._heap)
@@ -1,12 +1,10 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
 import datetime
 import time
 import logging
 import json
 from dotenv import load_dotenv
+from models import MemberStatus
 
 # Load environment variables
 load_dotenv()
@@ -16,8 +14,12 @@ logger = logging.getLogger('blkout_nxt')
 class EmailSender:
     """A class to send emails to members."""
 
-    def __init__(self):
-        """Initialize the EmailSender with SMTP settings from environment variables."""
+    def __init__(self, member_manager=None, survey_handler=None):
+        """Initialize the EmailSender with SMTP settings from environment variables.
+
+        Pass the app's member_manager and survey_handler to share them instead
+        of building new ones.
+        """
         self.smtp_server = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
         self.smtp_port = int(os.environ.get("SMTP_PORT", 587))
         self.smtp_username = os.environ.get("SMTP_USERNAME", "nxt@blkoutuk.com")
@@ -30,8 +32,8 @@ class EmailSender:
         from member_manager import MemberManager
         from survey_handler import SurveyHandler
 
-        self.member_manager = MemberManager()
-        self.survey_handler = SurveyHandler()
+        self.member_manager = member_manager or MemberManager()
+        self.survey_handler = survey_handler or SurveyHandler(self.member_manager)
 
     def _load_config(self):
         """Load configuration from the config file."""
@@ -72,10 +74,10 @@ class EmailSender:
                 body = f"""
                 <html>
                 <body>
-                    <h2>Welcome to BLKOUT NXT, {member['name']}!</h2>
+                    <h2>Welcome to BLKOUT NXT, {member.name}!</h2>
                     <p>Thank you for signing up for BLKOUT NXT. We're excited to have you join our community.</p>
                     <p>To help us better understand your interests and how we can support you, please complete our short survey:</p>
-                    <p><a href="{survey_link}">Complete the {member['member_type']} Survey</a></p>
+                    <p><a href="{survey_link}">Complete the {member.member_type.value} Survey</a></p>
                     <p>This will only take a few minutes and will help us tailor our communications to your interests.</p>
                     <p>Best regards,<br>The BLKOUT NXT Team</p>
                 </body>
@@ -83,14 +85,14 @@ class EmailSender:
                 """
 
                 # Send the email
-                result = self._send_email(member["email"], subject, body, is_html=True)
+                result = self._send_email(member.email, subject, body, is_html=True)
 
                 if result["success"]:
                     # Record that the email was sent
                     self.member_manager.record_email_sent(member_id, "welcome", subject)
 
                     # Update the member's status
-                    self.member_manager.update_member(member_id, {"status": "welcomed"})
+                    self.member_manager.update_member(member_id, {"status": MemberStatus.WELCOMED})
 
                     return {"success": True, "message": "Welcome email sent successfully"}
                 else:
@@ -127,10 +129,10 @@ class EmailSender:
             <html>
             <body>
                 <h2>Reminder: Complete Your BLKOUT NXT Survey</h2>
-                <p>Hello {member['name']},</p>
+                <p>Hello {member.name},</p>
                 <p>We noticed that you haven't completed your BLKOUT NXT survey yet. Your feedback is important to us and helps us tailor our communications to your interests.</p>
                 <p>Please take a few minutes to complete the survey:</p>
-                <p><a href="{survey_link}">Complete the {member['member_type']} Survey</a></p>
+                <p><a href="{survey_link}">Complete the {member.member_type.value} Survey</a></p>
                 <p>Thank you for your time.</p>
                 <p>Best regards,<br>The BLKOUT NXT Team</p>
             </body>
@@ -138,7 +140,7 @@ class EmailSender:
             """
 
             # Send the email
-            result = self._send_email(member["email"], subject, body, is_html=True)
+            result = self._send_email(member.email, subject, body, is_html=True)
 
             if result["success"]:
                 # Record that the email was sent
@@ -165,7 +167,7 @@ class EmailSender:
             <html>
             <body>
                 <h2>Thank You for Completing the BLKOUT NXT Survey</h2>
-                <p>Hello {member['name']},</p>
+                <p>Hello {member.name},</p>
                 <p>Thank you for completing the BLKOUT NXT survey. Your feedback is valuable to us and will help us tailor our communications to your interests.</p>
                 <p>You'll start receiving relevant updates and information based on your preferences soon.</p>
                 <p>Best regards,<br>The BLKOUT NXT Team</p>
@@ -174,7 +176,7 @@ class EmailSender:
             """
 
             # Send the email
-            result = self._send_email(member["email"], subject, body, is_html=True)
+            result = self._send_email(member.email, subject, body, is_html=True)
 
             if result["success"]:
                 # Record that the email was sent
@@ -186,8 +188,69 @@ class EmailSender:
             logger.error(f"Error sending confirmation email: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}"}
 
+    def _get_drip_links(self, campaign):
+        """Get the (name, url) resource links for a drip campaign, one per stage."""
+        links_key = "qtipoc_organiser" if campaign == "organiser" else campaign
+        links = self.config.get("drip_campaigns", {}).get("links", {}).get(links_key, {})
+        return list(links.items())
+
+    def get_drip_length(self, campaign):
+        """Get the number of emails in a drip campaign."""
+        return len(self._get_drip_links(campaign))
+
+    def send_drip_email(self, member_id, campaign, stage):
+        """Send the drip campaign email for the given (zero-based) stage."""
+        try:
+            # Get the member
+            member = self.member_manager.get_member(member_id=member_id)
+
+            if not member:
+                return {"success": False, "message": "Member not found"}
+
+            # Each stage features the matching resource link from the config
+            links = self._get_drip_links(campaign)
+
+            if stage >= len(links):
+                return {"success": False, "message": f"No drip email for {campaign} stage {stage}"}
+
+            link_name, link_url = links[stage]
+            link_title = link_name.replace("_link", "").replace("_", " ").title()
+
+            # Create the email content
+            subject = f"BLKOUT NXT - {member.member_type.value} Resources: {link_title}"
+            body = f"""
+            <html>
+            <body>
+                <h2>{link_title}</h2>
+                <p>Hello {member.name},</p>
+                <p>Here is this week's resource from BLKOUT NXT, picked for our {member.member_type.value} community:</p>
+                <p><a href="{link_url}">Explore {link_title}</a></p>
+                <p>This is email {stage + 1} of {len(links)} in the series.</p>
+                <p>Best regards,<br>The BLKOUT NXT Team</p>
+            </body>
+            </html>
+            """
+
+            # Send the email
+            result = self._send_email(member.email, subject, body, is_html=True)
+
+            if result["success"]:
+                # Record that the email was sent
+                self.member_manager.record_email_sent(member_id, f"drip_{campaign}", subject)
+                return {"success": True, "message": "Drip email sent successfully"}
+            else:
+                return result
+        except Exception as e:
+            logger.error(f"Error sending drip email: {str(e)}")
+            return {"success": False, "message": f"Error: {str(e)}"}
+
     def _send_email(self, to_email, subject, body, is_html=False):
         """Send an email."""
+        # Only needed when an email actually goes out, so kept off the import path
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
         try:
             # Create the email message
             msg = MIMEMultipart()
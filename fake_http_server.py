@@ -0,0 +1,45 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeJSONHandler(BaseHTTPRequestHandler):
+    """Base for the fake JSON APIs used by the sync tests.
+
+    Subclasses implement do_GET/do_POST/... with reply() and body(); every
+    request is recorded in server.calls as "METHOD /path".
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def record(self, path):
+        """Record a call on the server."""
+        self.server.calls.append(f"{self.command} {path}")
+
+    def reply(self, payload, status=200):
+        """Send a JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def body(self):
+        """Read the JSON request body."""
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+
+def start_fake_server(handler_class, **state):
+    """Start a fake API on a free local port; state becomes attributes of the server.
+
+    Returns the server, whose base_url points at it. Call shutdown() when done.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.calls = []
+    for name, value in state.items():
+        setattr(server, name, value)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
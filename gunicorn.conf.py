@@ -0,0 +1,14 @@
+# Gunicorn settings for the BLKOUT NXT backend (picked up automatically by `gunicorn app:app`).
+# Bind address and worker count still come from PORT and WEB_CONCURRENCY.
+
+# Import the app once in the master; workers fork with it already loaded
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Start background jobs after each fork; threads started in the master would not survive it.
+
+    Only the worker that wins the scheduler lock actually runs the drip scheduler.
+    """
+    from app import start_background_jobs
+    start_background_jobs()
@@ -0,0 +1,163 @@
+import copy
+import hashlib
+import json
+import sys
+from pathlib import Path
+from deploy_workflows import workflow_hash
+
+BASE_DIR = Path(__file__).resolve().parent
+BUILD_DIR = BASE_DIR / "build" / "workflows"
+
+# Segment-specific edits applied to the shared drip filter function
+SEGMENT_REPLACEMENTS = {
+    "Ally": {},
+    "BQM": {
+        "role.includes('ally')": "role.includes('black queer man')",
+        "DripCampaign: Ally": "DripCampaign: BQM",
+        "dripCampaign: 'Ally'": "dripCampaign: 'BQM'"
+    },
+    "QTIPOCOrganiser": {
+        "role.includes('ally')": "role.includes('qtipoc organiser')",
+        "DripCampaign: Ally": "DripCampaign: QTIPOCOrganiser",
+        "dripCampaign: 'Ally'": "dripCampaign: 'QTIPOCOrganiser'"
+    },
+    "Organisation": {
+        "role.includes('ally')": "role.includes('organisation')",
+        "DripCampaign: Ally": "DripCampaign: Organisation",
+        "dripCampaign: 'Ally'": "dripCampaign: 'Organisation'"
+    }
+}
+
+# Workflow template -> {node name: (script, segment)}
+BUILDS = {
+    "blkout_nxt_onboarding_workflow.json": {
+        "Filter & Segment Members": ("updated_functions/onboarding_filter_function.js", None)
+    },
+    "blkout_nxt_survey_workflow.json": {
+        "Filter for Survey Eligibility": ("updated_functions/survey_filter_function.js", None)
+    },
+    "ally_drip_workflow.json": {
+        "Filter for Drip Eligibility": ("updated_functions/drip_filter_function.js", "Ally")
+    },
+    "bqm_drip_workflow.json": {
+        "Filter for Drip Eligibility": ("updated_functions/drip_filter_function.js", "BQM")
+    },
+    "organiser_drip_workflow.json": {
+        "Filter for Drip Eligibility": ("updated_functions/drip_filter_function.js", "QTIPOCOrganiser")
+    },
+    "organisation_drip_workflow.json": {
+        "Filter for Drip Eligibility": ("updated_functions/drip_filter_function.js", "Organisation")
+    },
+    "onboarding_code_workflow.json": {
+        "Filter & Segment Members (Code)": ("code_nodes/onboarding_code.js", None)
+    },
+    "survey_code_workflow.json": {
+        "Filter for Survey Eligibility (Code)": ("code_nodes/survey_code.js", None)
+    },
+    "ally_drip_code_workflow.json": {
+        "Filter for Drip Eligibility (Code)": ("code_nodes/ally_drip_code.js", None)
+    },
+    "bqm_drip_code_workflow.json": {
+        "Filter for Drip Eligibility (Code)": ("code_nodes/bqm_drip_code.js", None)
+    },
+    "organiser_drip_code_workflow.json": {
+        "Filter for Drip Eligibility (Code)": ("code_nodes/organiser_drip_code.js", None)
+    },
+    "organisation_drip_code_workflow.json": {
+        "Filter for Drip Eligibility (Code)": ("code_nodes/organisation_drip_code.js", None)
+    }
+}
+
+# Where each node type keeps its script
+CODE_PARAMETERS = {
+    "n8n-nodes-base.code": "jsCode",
+    "n8n-nodes-base.function": "functionCode"
+}
+
+
+def file_hash(path):
+    """Hash a source file's contents."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def build_workflow(template, scripts, base_dir=BASE_DIR):
+    """Return a copy of a workflow template with each named node's script replaced."""
+    workflow = copy.deepcopy(template)
+    nodes = {node["name"]: node for node in workflow.get("nodes", [])}
+
+    for node_name, (script_path, segment) in scripts.items():
+        node = nodes.get(node_name)
+        if node is None:
+            raise ValueError(f"Node '{node_name}' not found in workflow '{workflow.get('name')}'")
+        parameter = CODE_PARAMETERS.get(node.get("type"))
+        if parameter is None:
+            raise ValueError(f"Node '{node_name}' is a {node.get('type')} node, not a Code or Function node")
+
+        code = (base_dir / script_path).read_text()
+        for old, new in SEGMENT_REPLACEMENTS.get(segment, {}).items():
+            code = code.replace(old, new)
+        node.setdefault("parameters", {})[parameter] = code
+
+    return workflow
+
+
+def build_all(builds=BUILDS, base_dir=BASE_DIR, build_dir=BUILD_DIR):
+    """Build every workflow artifact and write a manifest of content hashes.
+
+    Artifacts whose content hash has not changed are left untouched.
+    Returns the manifest: artifact file -> name, hash and source file hashes.
+    """
+    build_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = build_dir / "manifest.json"
+    try:
+        previous = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, ValueError):
+        previous = {}
+
+    manifest = {}
+    for template_name, scripts in builds.items():
+        with open(base_dir / template_name, "r") as f:
+            template = json.load(f)
+
+        workflow = build_workflow(template, scripts, base_dir)
+        content_hash = workflow_hash(workflow)
+        artifact = build_dir / template_name
+
+        sources = {template_name: file_hash(base_dir / template_name)}
+        for script_path, _ in scripts.values():
+            sources[script_path] = file_hash(base_dir / script_path)
+
+        changed = previous.get(template_name, {}).get("hash") != content_hash or not artifact.exists()
+        if changed:
+            artifact.write_text(json.dumps(workflow, indent=2))
+
+        manifest[template_name] = {
+            "name": workflow["name"],
+            "hash": content_hash,
+            "sources": sources,
+            "changed": changed
+        }
+
+    manifest_path.write_text(json.dumps(
+        {name: {key: value for key, value in entry.items() if key != "changed"} for name, entry in manifest.items()},
+        indent=2
+    ))
+    return manifest
+
+
+def main():
+    try:
+        manifest = build_all()
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    print(f"Built {len(manifest)} workflows into {BUILD_DIR}")
+    for template_name, entry in manifest.items():
+        status = "updated" if entry["changed"] else "unchanged"
+        print(f"  {template_name}: {status} ({entry['hash'][:12]})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
-import requests
+import asyncio
 import os
 import json
 from dotenv import load_dotenv
 from pathlib import Path
+from n8n_client import N8NClient, N8NError
 
 print("Deploying BLKOUT NXT Drip Campaigns...")
 
@@ -19,72 +20,60 @@ N8N_API_KEY = os.getenv("N8N_API_KEY")
 print(f"N8N_HOST_URL: {N8N_HOST_URL}")
 print(f"N8N_API_KEY: {N8N_API_KEY[:10]}..." if N8N_API_KEY else "N8N_API_KEY: None")
 
-# URL for workflow creation
-url = f"{N8N_HOST_URL}/workflows"
-
-# Headers
-headers = {
-    "X-N8N-API-KEY": N8N_API_KEY,
-    "Content-Type": "application/json"
-}
+# Shared n8n API client
+n8n = N8NClient(N8N_HOST_URL, N8N_API_KEY)
 
 # Function to create and activate a workflow
-def create_and_activate_workflow(file_path, workflow_name):
+async def create_and_activate_workflow(file_path, workflow_name):
     print(f"\nCreating {workflow_name} workflow...")
-    
+
     # Load the workflow
     with open(file_path, "r") as f:
         workflow_data = json.load(f)
-    
+
     try:
         # Create the workflow
-        response = requests.post(url, headers=headers, json=workflow_data)
-        
-        if response.status_code == 200:
-            created_workflow = response.json()
-            print(f"Workflow created successfully!")
-            print(f"Workflow ID: {created_workflow.get('id')}")
-            print(f"Workflow name: {created_workflow.get('name')}")
-            
-            # Activate the workflow
-            workflow_id = created_workflow.get('id')
-            activate_url = f"{N8N_HOST_URL}/workflows/{workflow_id}/activate"
-            
-            print(f"Activating workflow...")
-            activate_response = requests.post(activate_url, headers=headers)
-            
-            if activate_response.status_code == 200:
-                print("Workflow activated successfully!")
-                return True
-            else:
-                print(f"Error activating workflow: {activate_response.status_code}")
-                print(f"Response: {activate_response.text}")
-                return False
-        else:
-            print(f"Error creating workflow: {response.status_code}")
-            print(f"Response: {response.text}")
-            return False
-    except Exception as e:
-        print(f"Error: {str(e)}")
+        created_workflow = await n8n.create_workflow(workflow_data)
+        print(f"Workflow created successfully!")
+        print(f"Workflow ID: {created_workflow.get('id')}")
+        print(f"Workflow name: {created_workflow.get('name')}")
+    except N8NError as e:
+        print(f"Error creating workflow: {str(e)}")
         return False
 
-# Deploy the Ally Drip Campaign workflow
-ally_result = create_and_activate_workflow(
-    "ally_drip_workflow.json", 
-    "BLKOUT NXT Ally Drip Campaign"
-)
+    # Activate the workflow
+    workflow_id = created_workflow.get('id')
+    try:
+        print(f"Activating workflow...")
+        await n8n.activate_workflow(workflow_id)
+        print("Workflow activated successfully!")
+        return True
+    except N8NError as e:
+        print(f"Error activating workflow: {str(e)}")
+        return False
+
+async def deploy():
+    async with n8n:
+        # Deploy the Ally Drip Campaign workflow
+        ally_result = await create_and_activate_workflow(
+            "ally_drip_workflow.json", 
+            "BLKOUT NXT Ally Drip Campaign"
+        )
+
+        # Deploy the BQM Drip Campaign workflow
+        bqm_result = await create_and_activate_workflow(
+            "bqm_drip_workflow.json", 
+            "BLKOUT NXT Black Queer Men Drip Campaign"
+        )
 
-# Deploy the BQM Drip Campaign workflow
-bqm_result = create_and_activate_workflow(
-    "bqm_drip_workflow.json", 
-    "BLKOUT NXT Black Queer Men Drip Campaign"
-)
+        # Deploy the Organisation Drip Campaign workflow
+        org_result = await create_and_activate_workflow(
+            "organisation_drip_workflow.json", 
+            "BLKOUT NXT Organisation Drip Campaign"
+        )
+    return ally_result, bqm_result, org_result
 
-# Deploy the Organisation Drip Campaign workflow
-org_result = create_and_activate_workflow(
-    "organisation_drip_workflow.json", 
-    "BLKOUT NXT Organisation Drip Campaign"
-)
+ally_result, bqm_result, org_result = asyncio.run(deploy())
 
 # Summary
 print("\n=== Deployment Summary ===")
@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+from n8n_client import N8NClient, N8NError
+
+# Only these fields are accepted when creating or updating a workflow
+WORKFLOW_FIELDS = ("name", "nodes", "connections", "settings")
+
+# The live workflows: the Code node versions of onboarding, survey follow-up and the
+# four drip campaigns. Function node copies, test hooks and legacy flows are left out.
+DEPLOY_MANIFEST = [
+    "onboarding_code_workflow.json",
+    "survey_code_workflow.json",
+    "ally_drip_code_workflow.json",
+    "bqm_drip_code_workflow.json",
+    "organiser_drip_code_workflow.json",
+    "organisation_drip_code_workflow.json"
+]
+
+# Node fields n8n assigns itself, which would otherwise make every deploy look like a change
+SERVER_NODE_FIELDS = ("id", "webhookId")
+
+
+def workflow_payload(workflow):
+    """Strip a workflow (file or export) down to the fields the API accepts."""
+    return {field: workflow[field] for field in WORKFLOW_FIELDS if field in workflow}
+
+
+def workflow_hash(workflow):
+    """Hash the parts of a workflow that define its behaviour: nodes, connections and settings."""
+    nodes = sorted(
+        ({key: value for key, value in node.items() if key not in SERVER_NODE_FIELDS}
+         for node in workflow.get("nodes", [])),
+        key=lambda node: node.get("name", "")
+    )
+    content = {
+        "nodes": nodes,
+        "connections": workflow.get("connections", {}),
+        "settings": workflow.get("settings", {})
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def load_workflow_files(paths):
+    """Load workflow definitions from JSON files, keyed by file path."""
+    workflows = {}
+    for path in paths:
+        with open(path, "r") as f:
+            workflows[str(path)] = json.load(f)
+    return workflows
+
+
+def plan_deploy(workflows, existing, activate=False):
+    """Work out what each workflow file needs: create, update, activate or nothing.
+
+    workflows maps file paths to definitions; existing maps workflow names
+    to the workflows already in n8n. Workflows are only activated when
+    activate is set. Returns a list of plan dicts.
+    """
+    plans = []
+    for path, workflow in workflows.items():
+        current = existing.get(workflow["name"])
+        wants_active = activate and workflow.get("active", True)
+        plan = {"file": path, "name": workflow["name"], "payload": workflow_payload(workflow)}
+
+        if current is None:
+            plan["actions"] = ["create", "activate"] if wants_active else ["create"]
+            plan["id"] = None
+        else:
+            plan["id"] = current["id"]
+            plan["actions"] = []
+            if workflow_hash(workflow) != workflow_hash(current):
+                plan["actions"].append("update")
+            if wants_active and not current.get("active"):
+                plan["actions"].append("activate")
+        plans.append(plan)
+    return plans
+
+
+async def fetch_existing(n8n, names, concurrency):
+    """Get the deployed workflows with the given names, with their nodes and connections."""
+    existing = {}
+    for workflow in await n8n.list_workflows():
+        if workflow.get("name") not in names:
+            continue
+        if workflow["name"] in existing:
+            print(f"Warning: several workflows are named '{workflow['name']}'; using ID {existing[workflow['name']]['id']}")
+            continue
+        existing[workflow["name"]] = workflow
+
+    # Some n8n versions leave nodes out of the listing; fetch those workflows in full
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(name):
+        async with semaphore:
+            existing[name] = await n8n.get_workflow(existing[name]["id"])
+
+    await asyncio.gather(*(fetch(name) for name, workflow in existing.items() if "nodes" not in workflow))
+    return existing
+
+
+async def apply_plan(n8n, plan, semaphore):
+    """Carry out one workflow's plan and record the result on it."""
+    async with semaphore:
+        try:
+            if "create" in plan["actions"]:
+                plan["id"] = (await n8n.create_workflow(plan["payload"])).get("id")
+            elif "update" in plan["actions"]:
+                await n8n.update_workflow(plan["id"], plan["payload"])
+            if "activate" in plan["actions"]:
+                await n8n.activate_workflow(plan["id"])
+            plan["success"] = True
+        except N8NError as e:
+            plan["success"] = False
+            plan["error"] = str(e)
+
+
+async def deploy(paths, activate=False, concurrency=4, dry_run=False, n8n=None):
+    """Deploy workflow files, only sending what differs from n8n. Returns the plans."""
+    workflows = load_workflow_files(paths)
+    n8n = n8n or N8NClient()
+
+    async with n8n:
+        existing = await fetch_existing(n8n, {workflow["name"] for workflow in workflows.values()}, concurrency)
+        plans = plan_deploy(workflows, existing, activate)
+
+        if not dry_run:
+            semaphore = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*(apply_plan(n8n, plan, semaphore) for plan in plans if plan["actions"]))
+
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy n8n workflow JSON files, updating only what changed.")
+    parser.add_argument("files", nargs="*", help="Workflow files (default: the files in DEPLOY_MANIFEST)")
+    parser.add_argument("--activate", action="store_true", help="Activate the deployed workflows (default: leave them inactive)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum parallel API calls (default: 4)")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would change without deploying")
+    parser.add_argument("--build", action="store_true",
+                        help="Bundle code_nodes/ and updated_functions/ into the templates first and deploy the built artifacts")
+    args = parser.parse_args()
+
+    # Load environment variables from .env file
+    env_path = Path(__file__).resolve().parent / "mcp-server" / "config" / ".env"
+    load_dotenv(dotenv_path=env_path)
+
+    if args.build:
+        from build_workflows import BUILD_DIR, build_all
+
+        manifest = build_all()
+        print(f"Built {len(manifest)} workflows into {BUILD_DIR}")
+        paths = args.files or [BUILD_DIR / template_name for template_name in DEPLOY_MANIFEST]
+    else:
+        paths = args.files or [Path(__file__).resolve().parent / template_name for template_name in DEPLOY_MANIFEST]
+    print(f"Deploying {len(paths)} workflows to {os.getenv('N8N_HOST_URL')}...")
+
+    try:
+        plans = asyncio.run(deploy(paths, args.activate, args.concurrency, args.dry_run))
+    except N8NError as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    # Summary
+    print("\n=== Deployment Summary ===")
+    failed = 0
+    for plan in plans:
+        actions = ", ".join(plan["actions"]) or "unchanged"
+        if plan.get("success") is False:
+            failed += 1
+            print(f"{plan['name']}: FAILED ({actions})\n  {plan['error']}")
+        else:
+            prefix = "would " if args.dry_run and plan["actions"] else ""
+            print(f"{plan['name']}: {prefix}{actions}" + (f" (ID: {plan['id']})" if plan["id"] else ""))
+
+    print("\nDone.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
-import requests
+import asyncio
 import os
 import json
 from dotenv import load_dotenv
 from pathlib import Path
+from n8n_client import N8NClient, N8NError
 
 print("Importing n8n Workflow Templates...")
 
@@ -19,11 +20,8 @@ N8N_API_KEY = os.getenv("N8N_API_KEY")
 print(f"N8N_HOST_URL: {N8N_HOST_URL}")
 print(f"N8N_API_KEY: {N8N_API_KEY[:10]}..." if N8N_API_KEY else "N8N_API_KEY: None")
 
-# Headers for API requests
-headers = {
-    "X-N8N-API-KEY": N8N_API_KEY,
-    "Content-Type": "application/json"
-}
+# Shared n8n API client
+n8n = N8NClient(N8N_HOST_URL, N8N_API_KEY)
 
 # List of workflow files to import
 workflow_files = [
@@ -37,7 +35,7 @@ workflow_files = [
 ]
 
 # Function to import a workflow
-def import_workflow(file_path):
+async def import_workflow(file_path):
     print(f"\nImporting workflow from {file_path}...")
 
     try:
@@ -46,33 +44,33 @@ def import_workflow(file_path):
             workflow_data = json.load(f)
 
         # Import the workflow
-        url = f"{N8N_HOST_URL}/workflows"
-        response = requests.post(url, headers=headers, json=workflow_data)
-
-        if response.status_code == 200:
-            created_workflow = response.json()
-            print(f"Workflow imported successfully!")
-            print(f"Workflow ID: {created_workflow.get('id')}")
-            print(f"Workflow name: {created_workflow.get('name')}")
-            return True, created_workflow.get('id'), created_workflow.get('name')
-        else:
-            print(f"Error importing workflow: {response.status_code}")
-            print(f"Response: {response.text}")
-            return False, None, None
+        created_workflow = await n8n.create_workflow(workflow_data)
+        print(f"Workflow imported successfully!")
+        print(f"Workflow ID: {created_workflow.get('id')}")
+        print(f"Workflow name: {created_workflow.get('name')}")
+        return True, created_workflow.get('id'), created_workflow.get('name')
+    except N8NError as e:
+        print(f"Error importing workflow: {str(e)}")
+        return False, None, None
     except Exception as e:
         print(f"Error: {str(e)}")
         return False, None, None
 
 # Import each workflow
-results = []
-for file_path in workflow_files:
-    success, workflow_id, workflow_name = import_workflow(file_path)
-    results.append({
-        "file": file_path,
-        "success": success,
-        "id": workflow_id,
-        "name": workflow_name
-    })
+async def import_all():
+    results = []
+    async with n8n:
+        for file_path in workflow_files:
+            success, workflow_id, workflow_name = await import_workflow(file_path)
+            results.append({
+                "file": file_path,
+                "success": success,
+                "id": workflow_id,
+                "name": workflow_name
+            })
+    return results
+
+results = asyncio.run(import_all())
 
 # Print summary
 print("\n=== Import Summary ===")
@@ -1,10 +1,22 @@
 from mcp.server.fastmcp import FastMCP
 import os
 import json
-import requests
+import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+import sys
 from dotenv import load_dotenv
+from nocodb_client import NocoDBClient
+from phase_timeline import PhaseTimeline
+from record_schema import TableSchema
+
+# Add mcp-server-app to the path so we can import the shared HTTP pool
+parent_dir = str(Path(__file__).resolve().parents[2])
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from shared_http import get_transport
+from social_analytics import get_store as get_social_store
 
 # Load environment variables from .env file
 env_path = Path(__file__).resolve().parents[1] / "config" / ".env"
@@ -13,6 +25,9 @@ load_dotenv(dotenv_path=env_path)
 # Initialize FastMCP server
 mcp = FastMCP("blkout-campaign")
 
+# Log to stderr: stdout carries the MCP stdio protocol
+logger = logging.getLogger(__name__)
+
 # NocoDB API configuration
 NOCODB_API_URL = os.getenv("NOCODB_API_URL", "https://cloud.nocodb.com/api/v1")
 NOCODB_API_TOKEN = os.getenv("NOCODB_API_TOKEN", "your_nocodb_api_token_here")
@@ -29,6 +44,34 @@ NOCODB_METRICS_TABLE = "Campaign_Metrics"
 NOCODB_ACTIONS_TABLE = "Action_Items"
 NOCODB_CALENDAR_TABLE = "Events_Calendar"
 
+# Shared NocoDB client: one connection pool and a per-table cache for all tools.
+# Created on first use, so importing the server does not set up TLS and the pool.
+_nocodb = None
+
+def get_nocodb():
+    """Get the shared NocoDB client. Phases change rarely, so they are cached longer than metrics."""
+    global _nocodb
+    if _nocodb is None:
+        _nocodb = NocoDBClient(
+            NOCODB_API_URL,
+            NOCODB_API_TOKEN,
+            table_urls={
+                "CommunityMembers": NOCODB_API_URL_COMMUNITYMEMBERS,
+                "UserActivities": NOCODB_API_URL_USERACTIVITIES,
+                "UserRewards": NOCODB_API_URL_USERREWARDS
+            },
+            default_ttl=int(os.getenv("NOCODB_CACHE_TTL", "60")),
+            timeout=float(os.getenv("NOCODB_TIMEOUT", "10")),
+            page_size=int(os.getenv("NOCODB_PAGE_SIZE", "200")),
+            transport=get_transport(),
+            table_ttls={
+                NOCODB_PHASES_TABLE: 600,
+                NOCODB_ACTIONS_TABLE: 120,
+                NOCODB_CALENDAR_TABLE: 120
+            }
+        )
+    return _nocodb
+
 # Fallback campaign phases configuration (used if Airtable is not configured)
 FALLBACK_PHASES = [
     {
@@ -75,191 +118,189 @@ FALLBACK_PHASES = [
     }
 ]
 
-def get_nocodb_records(table_name):
-    """Get records from a NocoDB table"""
-    if NOCODB_API_TOKEN == "your_nocodb_api_token_here" or NOCODB_PROJECT_ID == "your_project_id_here":
-        print(f"Warning: NocoDB API token or Project ID not configured. Using fallback data.")
-        return []
-
-    # NocoDB API uses 'xc-token' for authentication
-    headers = {
-        "xc-token": NOCODB_API_TOKEN,
-        "Content-Type": "application/json"
+# Column spellings differ between bases ("PhaseID" vs "Phase ID"), so each
+# table's columns are declared once and resolved per fetch.
+PHASES_SCHEMA = TableSchema(
+    "Phase",
+    phase_id=(("PhaseID", "Phase ID"), 0),
+    name=(("Name",), "Unknown Phase"),
+    start_date=(("StartDate", "Start Date"), "2099-01-01"),
+    end_date=(("EndDate", "End Date"), "2099-01-01"),
+    hub_percentage=(("HubPercentage", "Hub Percentage"), 0),
+    website_percentage=(("WebsitePercentage", "Website Percentage"), 0),
+    social_percentage=(("SocialPercentage", "Social Percentage"), 0)
+)
+
+METRICS_SCHEMA = TableSchema(
+    "Metric",
+    name=(("Name",), "Unknown Metric"),
+    current_value=(("CurrentValue", "Current Value"), 0),
+    target_value=(("TargetValue", "Target Value"), 100)
+)
+
+ACTIONS_SCHEMA = TableSchema(
+    "Action",
+    phase_id=(("PhaseID", "Phase ID"), 0),
+    description=(("Description",), "Unknown action item"),
+    priority=(("Priority",), "Medium"),
+    status=(("Status",), "Not Started")
+)
+
+EVENTS_SCHEMA = TableSchema(
+    "Event",
+    title=(("Title",), "Unknown Event"),
+    date=(("Date", "EventDate"), None),
+    platform=(("Platform",), ""),
+    description=(("Description",), "")
+)
+
+FALLBACK_PHASE_RECORDS = [{
+    "fields": {
+        "PhaseID": phase["id"],
+        "Name": phase["name"],
+        "StartDate": phase["start_date"],
+        "EndDate": phase["end_date"],
+        "HubPercentage": phase["platforms"]["BLKOUTHUB"] * 100,
+        "WebsitePercentage": phase["platforms"]["BLKOUTUK.com"] * 100,
+        "SocialPercentage": phase["platforms"]["Social"] * 100
     }
+} for phase in FALLBACK_PHASES]
 
-    # Use table-specific URL if available, otherwise construct it
-    if table_name == "CommunityMembers" and NOCODB_API_URL_COMMUNITYMEMBERS:
-        url = NOCODB_API_URL_COMMUNITYMEMBERS
-    elif table_name == "UserActivities" and NOCODB_API_URL_USERACTIVITIES:
-        url = NOCODB_API_URL_USERACTIVITIES
-    elif table_name == "UserRewards" and NOCODB_API_URL_USERREWARDS:
-        url = NOCODB_API_URL_USERREWARDS
-    else:
-        # Use v2 API format
-        url = f"{NOCODB_API_URL}/tables/{table_name}/records"
+# Parsed phase timeline and the rows it was built from
+_phase_timeline = {"rows": None, "timeline": None}
 
-        # Format 3: v2/project_id/table_name
-        # url = f"{NOCODB_API_URL}/db/data/v2/{NOCODB_PROJECT_ID}/{table_name}"
+async def get_nocodb_records(table_name, where=None, sort=None, fields=None):
+    """Get records from a NocoDB table, optionally filtered and sorted server-side.
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-
-        # NocoDB v2 API returns data in a different format
-        # Convert to Airtable-like format for compatibility
-        data = response.json()
-
-        # v2 API returns a structure with 'list' property
-        if isinstance(data, list):
-            records = data
-        elif isinstance(data, dict) and "list" in data:
-            records = data.get("list", [])
-        else:
-            # For v2 API, the records might be in the 'list' property
-            records = data.get("list", [])
-
-        # Convert to Airtable-like format
-        return [{
-            "id": record.get("Id") or record.get("id"),
-            "fields": record
-        } for record in records]
-    except Exception as e:
-        print(f"Error fetching NocoDB data: {str(e)}")
-        if 'response' in locals() and hasattr(response, 'text'):
-            print(f"Response: {response.text[:200]}...")
-        return []
+    Returns None when NocoDB is not configured or unreachable, so callers can
+    tell "no data source" (use fallback data) from "no matching records".
+    """
+    if not nocodb_configured():
+        logger.warning("NocoDB API token or Project ID not configured. Using fallback data.")
+        return None
 
-@mcp.tool()
-async def get_current_phase() -> str:
-    """Get information about the current campaign phase.
+    return await get_nocodb().get_records(table_name, where=where, sort=sort, fields=fields)
 
-    Returns:
-        Details about the current phase of the BLKOUT NEXT campaign
+def nocodb_configured():
+    """Check whether the NocoDB token and project have been set."""
+    return NOCODB_API_TOKEN != "your_nocodb_api_token_here" and NOCODB_PROJECT_ID != "your_project_id_here"
+
+# Spelling of each filtered column in this base, keyed by (table, column)
+_filter_columns = {}
+
+async def get_filter_column(table_name, schema, column):
+    """Get the name a table's base uses for a schema column, from a one-record sample.
+
+    Server-side filters must use the base's own spelling ("PhaseID" or
+    "Phase ID"), or NocoDB rejects them. Returns None if the column cannot
+    be resolved, in which case callers fetch unfiltered and filter locally.
     """
-    # Get phases from NocoDB
-    phases = get_nocodb_records(NOCODB_PHASES_TABLE)
+    key = (table_name, column)
+    if key in _filter_columns:
+        return _filter_columns[key]
+    if not nocodb_configured():
+        return None
 
-    # If no phases found in NocoDB, use fallback data
-    if not phases:
-        phases = [{
-            "fields": {
-                "PhaseID": phase["id"],
-                "Name": phase["name"],
-                "StartDate": phase["start_date"],
-                "EndDate": phase["end_date"],
-                "HubPercentage": phase["platforms"]["BLKOUTHUB"] * 100,
-                "WebsitePercentage": phase["platforms"]["BLKOUTUK.com"] * 100,
-                "SocialPercentage": phase["platforms"]["Social"] * 100
-            }
-        } for phase in FALLBACK_PHASES]
+    try:
+        async for record in get_nocodb().iter_records(table_name, page_size=1):
+            _filter_columns[key] = schema.resolve_column([record], column)
+            break
+    except Exception as e:
+        logger.warning(f"Could not sample {table_name} to resolve {column}: {str(e)}")
+    return _filter_columns.get(key)
 
-    today = datetime.now()
+async def get_phase_timeline():
+    """Get the phase timeline, re-parsing the phases only when the cached records change."""
+    phases = await get_nocodb_records(NOCODB_PHASES_TABLE)
 
-    # Check for current phase
-    for phase in phases:
-        fields = phase.get("fields", {})
+    # If no phases found in NocoDB, use fallback data
+    if not phases:
+        phases = FALLBACK_PHASE_RECORDS
 
-        # Handle different field naming conventions
-        phase_id = fields.get("PhaseID", fields.get("Phase ID", 0))
-        name = fields.get("Name", "Unknown Phase")
-        start_date = fields.get("StartDate", fields.get("Start Date", "2099-01-01"))
-        end_date = fields.get("EndDate", fields.get("End Date", "2099-01-01"))
+    # The NocoDB client hands back the same list until its cache refreshes,
+    # and the schema reuses its projection for it, so this parses once per refresh
+    rows = PHASES_SCHEMA.project(phases)
+    if _phase_timeline["rows"] is not rows:
+        _phase_timeline["timeline"] = PhaseTimeline.from_rows(rows)
+        _phase_timeline["rows"] = rows
 
-        # Convert percentages to decimal
-        hub_percentage = fields.get("HubPercentage", fields.get("Hub Percentage", 0)) / 100
-        website_percentage = fields.get("WebsitePercentage", fields.get("Website Percentage", 0)) / 100
-        social_percentage = fields.get("SocialPercentage", fields.get("Social Percentage", 0)) / 100
+    return _phase_timeline["timeline"]
 
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-
-            if start <= today <= end:
-                days_remaining = (end - today).days
-                return json.dumps({
-                    "phase_id": phase_id,
-                    "name": name,
-                    "days_remaining": days_remaining,
-                    "platforms": {
-                        "BLKOUTHUB": hub_percentage,
-                        "BLKOUTUK.com": website_percentage,
-                        "Social": social_percentage
-                    }
-                })
-        except ValueError as e:
-            print(f"Error parsing dates: {e}")
-            continue
+async def get_phase_status():
+    """Get the current (or next upcoming) phase as a dict, or None if the campaign has concluded."""
+    timeline = await get_phase_timeline()
+    today = datetime.now()
 
-    # If no current phase, find the next upcoming phase
-    upcoming_phases = []
-    for phase in phases:
-        fields = phase.get("fields", {})
+    current = timeline.current(today)
+    if current:
+        _, end, phase = current
+        return {
+            "phase_id": phase["phase_id"],
+            "name": phase["name"],
+            "days_remaining": (end - today).days,
+            "platforms": phase["platforms"]
+        }
 
-        # Handle different field naming conventions
-        phase_id = fields.get("PhaseID", fields.get("Phase ID", 0))
-        name = fields.get("Name", "Unknown Phase")
-        start_date = fields.get("StartDate", fields.get("Start Date", "2099-01-01"))
+    upcoming = timeline.next(today)
+    if upcoming:
+        start, _, phase = upcoming
+        return {
+            "phase_id": phase["phase_id"],
+            "name": phase["name"],
+            "status": "upcoming",
+            "days_until_start": (start - today).days,
+            "platforms": phase["platforms"]
+        }
 
-        # Convert percentages to decimal
-        hub_percentage = fields.get("HubPercentage", fields.get("Hub Percentage", 0)) / 100
-        website_percentage = fields.get("WebsitePercentage", fields.get("Website Percentage", 0)) / 100
-        social_percentage = fields.get("SocialPercentage", fields.get("Social Percentage", 0)) / 100
+    return None
 
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-
-            if today < start:
-                upcoming_phases.append({
-                    "phase_id": phase_id,
-                    "name": name,
-                    "start": start,
-                    "days_until": (start - today).days,
-                    "platforms": {
-                        "BLKOUTHUB": hub_percentage,
-                        "BLKOUTUK.com": website_percentage,
-                        "Social": social_percentage
-                    }
-                })
-        except ValueError as e:
-            print(f"Error parsing dates: {e}")
-            continue
+@mcp.tool()
+async def get_current_phase() -> str:
+    """Get information about the current campaign phase.
 
-    if upcoming_phases:
-        # Sort by start date and get the closest upcoming phase
-        upcoming_phases.sort(key=lambda x: x["start"])
-        next_phase = upcoming_phases[0]
+    Returns:
+        Details about the current phase of the BLKOUT NEXT campaign
+    """
+    phase_status = await get_phase_status()
+    if phase_status is None:
+        return "Campaign has concluded"
 
-        return json.dumps({
-            "phase_id": next_phase["phase_id"],
-            "name": next_phase["name"],
-            "status": "upcoming",
-            "days_until_start": next_phase["days_until"],
-            "platforms": next_phase["platforms"]
-        })
+    return json.dumps(phase_status)
 
-    return "Campaign has concluded"
+def get_social_totals():
+    """Campaign-to-date social engagement and reach from the analytics store, or {} if nothing is recorded yet."""
+    summary = get_social_store().summary()
+    if not summary["platforms"]:
+        return {}
+    return {"total_engagements": summary["total_engagement"], "social_reach": summary["total_reach"]}
 
 @mcp.tool()
 async def campaign_metrics() -> str:
     """Get current campaign metrics.
 
+    Social engagement and reach come from the social analytics store once
+    it has data, so they match social_campaign_analytics.
+
     Returns:
         Summary of engagement metrics across all platforms
     """
     # Get metrics from NocoDB
-    metrics = get_nocodb_records(NOCODB_METRICS_TABLE)
+    metrics = await get_nocodb_records(NOCODB_METRICS_TABLE)
+    social = get_social_totals()
 
     # If no metrics found in NocoDB, use fallback data
     if not metrics:
+        engagements = social.get("total_engagements", 325)
+        social_reach = social.get("social_reach", 68500)
         return json.dumps({
-            "total_engagements": 325,
+            "total_engagements": engagements,
             "membership_conversions": 42,
-            "social_reach": 68500,
+            "social_reach": social_reach,
             "funding_proposals": 2,
             "target_progress": {
-                "engagements": "65%",  # 325/500
+                "engagements": f"{round(engagements / 500 * 100, 1):g}%",
                 "membership": "84%",   # 42/50 (assuming 5% of 1000)
-                "social_reach": "68.5%", # 68500/100000
+                "social_reach": f"{round(social_reach / 100000 * 100, 1):g}%",
                 "funding_proposals": "40%" # 2/5
             }
         })
@@ -268,21 +309,15 @@ async def campaign_metrics() -> str:
     result = {}
     target_progress = {}
 
-    for metric in metrics:
-        fields = metric.get("fields", {})
-
-        # Handle different field naming conventions
-        metric_name = fields.get("Name", "Unknown Metric")
-        current_value = fields.get("CurrentValue", fields.get("Current Value", 0))
-        target_value = fields.get("TargetValue", fields.get("Target Value", 100))
-
+    for metric in METRICS_SCHEMA.project(metrics):
         # Convert to snake_case for JSON keys
-        key = metric_name.lower().replace(" ", "_")
+        key = metric.name.lower().replace(" ", "_")
+        current_value = social.get(key, metric.current_value)
         result[key] = current_value
 
         # Calculate progress percentage
-        if target_value > 0:
-            progress = (current_value / target_value) * 100
+        if metric.target_value > 0:
+            progress = (current_value / metric.target_value) * 100
             target_progress[key] = f"{progress:.1f}%"
         else:
             target_progress[key] = "0%"
@@ -299,15 +334,21 @@ async def campaign_action_items() -> str:
     Returns:
         List of recommended actions based on current phase and metrics
     """
-    # Get current phase information
-    phase_info = json.loads(await get_current_phase())
+    # Get current phase information (phases are cached, so this is usually free)
+    phase_info = await get_phase_status()
+    if phase_info is None:
+        return json.dumps(["Campaign has concluded"])
     phase_id = phase_info.get("phase_id", 0)
 
-    # Get action items from NocoDB
-    all_actions = get_nocodb_records(NOCODB_ACTIONS_TABLE)
+    # Get this phase's action items from NocoDB
+    phase_column = await get_filter_column(NOCODB_ACTIONS_TABLE, ACTIONS_SCHEMA, "phase_id")
+    all_actions = await get_nocodb_records(
+        NOCODB_ACTIONS_TABLE,
+        where=f"({phase_column},eq,{phase_id})" if phase_column else None
+    )
 
-    # If no action items found in NocoDB, use fallback data
-    if not all_actions:
+    # If NocoDB is not available, use fallback data
+    if all_actions is None:
         # Define fallback action items for each phase
         fallback_items = {
             1: [
@@ -352,21 +393,13 @@ async def campaign_action_items() -> str:
 
     # Filter action items for the current phase
     phase_actions = []
-    for action in all_actions:
-        fields = action.get("fields", {})
-
-        # Handle different field naming conventions
-        action_phase_id = fields.get("PhaseID", fields.get("Phase ID", 0))
-        description = fields.get("Description", "Unknown action item")
-        priority = fields.get("Priority", "Medium")
-        status = fields.get("Status", "Not Started")
-
+    for action in ACTIONS_SCHEMA.project(all_actions):
         # Check if this action belongs to the current phase
-        if action_phase_id == phase_id:
+        if action.phase_id == phase_id:
             phase_actions.append({
-                "description": description,
-                "priority": priority,
-                "status": status
+                "description": action.description,
+                "priority": action.priority,
+                "status": action.status
             })
 
     # If no actions found for this phase, return a message
@@ -390,12 +423,21 @@ async def campaign_calendar(days: int = 14) -> str:
     Returns:
         List of upcoming events and deadlines
     """
-    # Get events from NocoDB
-    all_events = get_nocodb_records(NOCODB_CALENDAR_TABLE)
     today = datetime.now()
 
-    # If no events found in NocoDB, use fallback data
-    if not all_events:
+    # Get events in the window from NocoDB, filtered and sorted server-side
+    start_date = today.strftime("%Y-%m-%d")
+    end_date = (today + timedelta(days=days)).strftime("%Y-%m-%d")
+    date_column = await get_filter_column(NOCODB_CALENDAR_TABLE, EVENTS_SCHEMA, "date")
+    all_events = await get_nocodb_records(
+        NOCODB_CALENDAR_TABLE,
+        where=(f"({date_column},ge,exactDate,{start_date})~and({date_column},le,exactDate,{end_date})"
+               if date_column else None),
+        sort=date_column
+    )
+
+    # If NocoDB is not available, use fallback data
+    if all_events is None:
         # Sample events
         fallback_events = [
             {
@@ -434,14 +476,8 @@ async def campaign_calendar(days: int = 14) -> str:
 
     # Process events from Airtable
     events = []
-    for event in all_events:
-        fields = event.get("fields", {})
-
-        # Handle different field naming conventions
-        title = fields.get("Title", "Unknown Event")
-        event_date = fields.get("Date", fields.get("EventDate", None))
-        platform = fields.get("Platform", "")
-        description = fields.get("Description", "")
+    for event in EVENTS_SCHEMA.project(all_events):
+        event_date = event.date
 
         # Skip events without dates
         if not event_date:
@@ -460,13 +496,13 @@ async def campaign_calendar(days: int = 14) -> str:
             days_until = (event_datetime.date() - today.date()).days
             if 0 <= days_until <= days:  # Include today's events and future events within range
                 events.append({
-                    "title": title,
+                    "title": event.title,
                     "date": event_date_str,
-                    "platform": platform,
-                    "description": description
+                    "platform": event.platform,
+                    "description": event.description
                 })
         except (ValueError, TypeError) as e:
-            print(f"Error parsing event date: {e}")
+            logger.error(f"Error parsing event date: {e}")
             continue
 
     # Sort events by date
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class NocoDBClient:
+    """Async NocoDB client with per-table caching for the campaign tools.
+
+    Records are served from memory while they are younger than the table's
+    TTL. After that, stale records are still returned for up to stale_ttl
+    seconds while a single background refresh revalidates them. Results that
+    fit in one page are revalidated with their ETag, so an unchanged table
+    comes back as a cheap 304; longer results are always fetched in full,
+    since page 1's ETag says nothing about the later pages.
+    Concurrent requests for the same query share one in-flight fetch.
+    """
+
+    def __init__(self, api_url, api_token, table_urls=None, default_ttl=60, table_ttls=None,
+                 stale_ttl=300, timeout=10.0, page_size=200, transport=None):
+        self.api_url = api_url.rstrip("/")
+        self.api_token = api_token
+        self.table_urls = table_urls or {}
+        self.default_ttl = default_ttl
+        self.table_ttls = table_ttls or {}
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.page_size = page_size
+        self._transport = transport
+
+        self._client = None
+        self._cache = {}
+        self._inflight = {}
+
+    def table_url(self, table_name):
+        """Get the records URL for a table, preferring a configured table-specific URL."""
+        return self.table_urls.get(table_name) or f"{self.api_url}/tables/{table_name}/records"
+
+    async def get_records(self, table_name, where=None, sort=None, fields=None):
+        """Get all of a table's records (Airtable-like {"id", "fields"} dicts), from cache when possible.
+
+        where, sort and fields are passed to NocoDB as query parameters, so
+        filtering happens server-side. If NocoDB rejects the query (e.g. a
+        column name that does not exist), the unfiltered table is returned.
+        Returns None if the table could not be fetched and nothing is cached.
+        """
+        key = (table_name, where, sort, fields)
+        entry = self._cache.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry["fetched_at"]
+            ttl = self.table_ttls.get(table_name, self.default_ttl)
+            if age < ttl:
+                return entry["records"]
+            if age < ttl + self.stale_ttl:
+                # Serve stale data and revalidate in the background
+                self._refresh(key)
+                return entry["records"]
+
+        return await asyncio.shield(self._refresh(key))
+
+    async def iter_records(self, table_name, where=None, sort=None, fields=None, page_size=None):
+        """Yield every record of a table, fetching one page at a time (uncached)."""
+        async for _, rows in self._iter_pages(table_name, where, sort, fields, page_size):
+            for row in rows:
+                yield row
+
+    def invalidate(self, table_name=None):
+        """Drop cached records for one table, or for all tables."""
+        if table_name is None:
+            self._cache.clear()
+        else:
+            for key in [key for key in self._cache if key[0] == table_name]:
+                del self._cache[key]
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self):
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"xc-token": self.api_token, "Content-Type": "application/json"},
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                transport=self._transport
+            )
+        return self._client
+
+    def _refresh(self, key):
+        """Start (or join) the fetch for a query and return its task."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def _fetch(self, key):
+        """Fetch every page for a query, revalidating single-page results with their cached ETag."""
+        table_name, where, sort, fields = key
+        entry = self._cache.get(key)
+        headers = {}
+        if entry is not None and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        records = []
+        etag = None
+        pages = 0
+        try:
+            async for response, rows in self._iter_pages(table_name, where, sort, fields, headers=headers):
+                if response.status_code == 304:
+                    entry["fetched_at"] = time.monotonic()
+                    return entry["records"]
+                if pages == 0:
+                    etag = response.headers.get("ETag")
+                pages += 1
+                records.extend(rows)
+            if pages > 1:
+                # Only a single-page result can be revalidated by its (first page) ETag
+                etag = None
+        except httpx.HTTPStatusError as e:
+            if not (where or sort or fields) or not 400 <= e.response.status_code < 500:
+                logger.error(f"Error fetching NocoDB data for {table_name}: {str(e)}")
+                return entry["records"] if entry is not None else None
+            # Remember the unfiltered table for this query; callers filter it themselves
+            logger.warning(f"NocoDB rejected query on {table_name} ({e.response.status_code}); using unfiltered records")
+            records = await self.get_records(table_name)
+            if records is None:
+                return None
+            etag = None
+        except Exception as e:
+            logger.error(f"Error fetching NocoDB data for {table_name}: {str(e)}")
+            # Fall back to whatever we had rather than failing the tool call
+            return entry["records"] if entry is not None else None
+
+        self._cache[key] = {
+            "records": records,
+            "etag": etag,
+            "fetched_at": time.monotonic()
+        }
+        return records
+
+    async def _iter_pages(self, table_name, where, sort, fields, page_size=None, headers=None):
+        """Yield (response, records) for each page of a query, following pageInfo."""
+        page_size = page_size or self.page_size
+        params = {"limit": page_size, "offset": 0}
+        if where:
+            params["where"] = where
+        if sort:
+            params["sort"] = sort
+        if fields:
+            params["fields"] = fields
+
+        while True:
+            # Conditional headers only apply to the first page
+            response = await self._get_client().get(self.table_url(table_name), params=params,
+                                                    headers=headers if params["offset"] == 0 else None)
+            if response.status_code == 304:
+                yield response, []
+                return
+            response.raise_for_status()
+
+            data = response.json()
+            rows = self._to_records(data)
+            yield response, rows
+
+            # Plain lists are unpaginated; otherwise stop at the last page
+            page_info = data.get("pageInfo", {}) if isinstance(data, dict) else {}
+            if isinstance(data, list) or page_info.get("isLastPage", True) or len(rows) < page_size:
+                return
+            params["offset"] += len(rows)
+
+    @staticmethod
+    def _to_records(data):
+        """Convert a NocoDB response to the Airtable-like format the tools expect."""
+        # v2 API returns a structure with 'list' property
+        if isinstance(data, list):
+            rows = data
+        else:
+            rows = data.get("list", [])
+
+        return [{
+            "id": row.get("Id") or row.get("id"),
+            "fields": row
+        } for row in rows]
+
@@ -0,0 +1,56 @@
+import logging
+from bisect import bisect_right
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseTimeline:
+    """Campaign phases parsed once and sorted by start date for fast lookups.
+
+    Phases are assumed not to overlap, so the phase containing a moment is
+    the last one starting at or before it, and the next phase is the first
+    one starting after it. Both are found with a single bisect.
+    """
+
+    def __init__(self, phases):
+        """Build the timeline from (start, end, phase) tuples."""
+        self._phases = sorted(phases, key=lambda phase: phase[0])
+        self._starts = [start for start, _, _ in self._phases]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Parse projected phase rows, skipping rows with unparseable dates."""
+        phases = []
+        for row in rows:
+            try:
+                start = datetime.strptime(row.start_date, "%Y-%m-%d")
+                end = datetime.strptime(row.end_date, "%Y-%m-%d")
+            except (ValueError, TypeError) as e:
+                logger.error(f"Error parsing dates: {e}")
+                continue
+
+            phases.append((start, end, {
+                "phase_id": row.phase_id,
+                "name": row.name,
+                "platforms": {
+                    "BLKOUTHUB": row.hub_percentage / 100,
+                    "BLKOUTUK.com": row.website_percentage / 100,
+                    "Social": row.social_percentage / 100
+                }
+            }))
+        return cls(phases)
+
+    def current(self, now):
+        """Get (start, end, phase) for the phase running at now, or None."""
+        index = bisect_right(self._starts, now) - 1
+        if index >= 0 and now <= self._phases[index][1]:
+            return self._phases[index]
+        return None
+
+    def next(self, now):
+        """Get (start, end, phase) for the first phase starting after now, or None."""
+        index = bisect_right(self._starts, now)
+        if index < len(self._phases):
+            return self._phases[index]
+        return None
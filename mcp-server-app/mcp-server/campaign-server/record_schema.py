@@ -0,0 +1,56 @@
+from collections import namedtuple
+
+
+class TableSchema:
+    """Declarative column mapping for a NocoDB/Airtable table.
+
+    Each column lists the spellings it may have in a base ("PhaseID",
+    "Phase ID") and a default. The spelling actually used is resolved once
+    per fetch, and every record is projected into a named tuple, so the
+    tools read row.phase_id instead of chaining fields.get() fallbacks.
+    """
+
+    def __init__(self, row_name, /, **columns):
+        """Define a schema; each column is attr=(aliases, default)."""
+        self.row_type = namedtuple(f"{row_name}Row", ["id", *columns])
+        self.columns = [(tuple(aliases), default) for aliases, default in columns.values()]
+
+        self._records = None
+        self._rows = None
+
+    def resolve(self, records):
+        """Find which spelling of each column the records use (None if absent)."""
+        keys = [None] * len(self.columns)
+        # Airtable omits empty fields, so keep looking until every column is found
+        for record in records:
+            fields = record.get("fields", {})
+            for position, (aliases, _) in enumerate(self.columns):
+                if keys[position] is None:
+                    keys[position] = next((alias for alias in aliases if alias in fields), None)
+            if None not in keys:
+                break
+        return keys
+
+    def resolve_column(self, records, name):
+        """Find which spelling of one column (by attribute name) the records use, or None."""
+        return self.resolve(records)[self.row_type._fields.index(name) - 1]
+
+    def project(self, records):
+        """Project records into rows, reusing the last result while the records are unchanged."""
+        if records is self._records:
+            return self._rows
+
+        keys = self.resolve(records)
+        lookups = [(key, default) for key, (_, default) in zip(keys, self.columns)]
+        row_type = self.row_type
+        rows = []
+        for record in records:
+            fields = record.get("fields", {})
+            rows.append(row_type(record.get("id"), *[
+                fields.get(key, default) if key is not None else default
+                for key, default in lookups
+            ]))
+
+        self._records = records
+        self._rows = rows
+        return rows
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import json
+import re
+
+import httpx
+
+from nocodb_client import NocoDBClient
+
+
+def fake_nocodb(tables, calls):
+    """A MockTransport serving NocoDB v2 records pages, with ETags and 304s.
+
+    A where or sort naming a column the table does not have answers 422,
+    as NocoDB does.
+    """
+
+    async def handler(request):
+        params = request.url.params
+        table_name = request.url.path.split("/")[-2]
+        calls.append((table_name, dict(params)))
+        await asyncio.sleep(0.01)
+
+        rows = tables[table_name]
+        columns = set().union(*rows) if rows else set()
+        where = params.get("where")
+        if where:
+            conditions = re.findall(r"\(([^,]+),(\w+),([^)]+)\)", where)
+            if any(column not in columns for column, _, _ in conditions):
+                return httpx.Response(422, json={"msg": "Field not found"})
+            # Only eq is applied; other comparisons are accepted but not filtered on
+            rows = [row for row in rows
+                    if all(str(row.get(column)) == value for column, op, value in conditions if op == "eq")]
+        sort = params.get("sort")
+        if sort:
+            if sort not in columns:
+                return httpx.Response(422, json={"msg": "Field not found"})
+            rows = sorted(rows, key=lambda row: row[sort])
+
+        offset, limit = int(params["offset"]), int(params["limit"])
+        page = rows[offset:offset + limit]
+        etag = hashlib.md5(json.dumps(page).encode()).hexdigest()
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": etag}, json={
+            "list": page,
+            "pageInfo": {"isLastPage": offset + limit >= len(rows)}
+        })
+
+    return httpx.MockTransport(handler)
+
+
+def make_client(tables, calls, **options):
+    return NocoDBClient("https://nocodb.test/api/v2", "token", transport=fake_nocodb(tables, calls), **options)
+
+
+def run(coroutine_function):
+    return asyncio.run(coroutine_function())
+
+
+def test_ttl_and_stale_while_revalidate():
+    """Fresh records are served from memory; stale ones are served while one background refresh runs."""
+    tables = {"Campaign_Metrics": [{"Id": 1, "Name": "Members", "CurrentValue": 10}]}
+    calls = []
+    client = make_client(tables, calls, default_ttl=0.05, stale_ttl=0.2)
+
+    async def scenario():
+        first = await client.get_records("Campaign_Metrics")
+        assert await client.get_records("Campaign_Metrics") is first and len(calls) == 1
+
+        tables["Campaign_Metrics"][0]["CurrentValue"] = 20
+        await asyncio.sleep(0.06)
+        # Stale: the old records come back at once, and a refresh starts behind them
+        assert await client.get_records("Campaign_Metrics") is first
+        assert await client.get_records("Campaign_Metrics") is first
+        await asyncio.sleep(0.03)
+        assert len(calls) == 2
+        assert (await client.get_records("Campaign_Metrics"))[0]["fields"]["CurrentValue"] == 20
+
+        # Past the stale window the caller waits for fresh records
+        tables["Campaign_Metrics"][0]["CurrentValue"] = 30
+        await asyncio.sleep(0.26)
+        assert (await client.get_records("Campaign_Metrics"))[0]["fields"]["CurrentValue"] == 30
+        assert len(calls) == 3
+        await client.aclose()
+
+    run(scenario)
+
+
+def test_concurrent_requests_share_one_fetch():
+    """Callers asking for the same query at once share a single request."""
+    tables = {"Action_Items": [{"Id": 1, "PhaseID": 1}]}
+    calls = []
+    client = make_client(tables, calls)
+
+    async def scenario():
+        results = await asyncio.gather(*[client.get_records("Action_Items") for _ in range(5)])
+        assert len(calls) == 1 and all(result is results[0] for result in results)
+        # A different query is a different fetch
+        await client.get_records("Action_Items", where="(PhaseID,eq,1)")
+        assert len(calls) == 2
+        await client.aclose()
+
+    run(scenario)
+
+
+def test_etag_revalidation():
+    """A single-page result is revalidated with its ETag; a longer one is fetched in full."""
+    tables = {
+        "Campaign_Phases": [{"Id": 1, "PhaseID": 1}],
+        "Events_Calendar": [{"Id": i, "Date": f"2025-05-0{i}"} for i in range(1, 4)]
+    }
+    calls = []
+    client = make_client(tables, calls, default_ttl=0, stale_ttl=0, page_size=2)
+
+    async def scenario():
+        phases = await client.get_records("Campaign_Phases")
+        # Unchanged: a 304 keeps the very same list
+        assert await client.get_records("Campaign_Phases") is phases
+
+        tables["Campaign_Phases"].append({"Id": 2, "PhaseID": 2})
+        assert len(await client.get_records("Campaign_Phases")) == 2
+
+        calls.clear()
+        assert len(await client.get_records("Events_Calendar")) == 3 and len(calls) == 2
+        # Page 1's ETag says nothing about page 2, so no If-None-Match is sent
+        assert client._cache[("Events_Calendar", None, None, None)]["etag"] is None
+        tables["Events_Calendar"][2]["Date"] = "2025-05-09"
+        assert (await client.get_records("Events_Calendar"))[2]["fields"]["Date"] == "2025-05-09"
+        await client.aclose()
+
+    run(scenario)
+
+
+def test_rejected_query_falls_back_to_unfiltered():
+    """A query NocoDB rejects (a column this base does not have) returns the whole table."""
+    tables = {"Action_Items": [{"Id": 1, "Phase ID": 1}, {"Id": 2, "Phase ID": 2}]}
+    calls = []
+    client = make_client(tables, calls)
+
+    async def scenario():
+        records = await client.get_records("Action_Items", where="(PhaseID,eq,1)")
+        assert len(records) == 2
+        assert [params.get("where") for _, params in calls] == ["(PhaseID,eq,1)", None]
+
+        # The fallback is cached under the rejected query too
+        calls.clear()
+        assert await client.get_records("Action_Items", where="(PhaseID,eq,1)") is records and calls == []
+
+        # With the base's own spelling the filter is applied server-side
+        records = await client.get_records("Action_Items", where="(Phase ID,eq,1)")
+        assert [record["id"] for record in records] == [1]
+        await client.aclose()
+
+    run(scenario)
+
+
+def test_iter_records():
+    """iter_records pages through a table without caching it."""
+    tables = {"Events_Calendar": [{"Id": i} for i in range(1, 6)]}
+    calls = []
+    client = make_client(tables, calls)
+
+    async def scenario():
+        ids = [record["id"] async for record in client.iter_records("Events_Calendar", page_size=2)]
+        assert ids == [1, 2, 3, 4, 5] and len(calls) == 3 and client._cache == {}
+        await client.aclose()
+
+    run(scenario)
+
+
+def test_campaign_filters_use_the_base_columns():
+    """The campaign tools filter and sort on the column names this base actually uses."""
+    import campaign_server
+
+    tables = {
+        "Action_Items": [
+            {"Id": 1, "Phase ID": 1, "Description": "Phase one action", "Priority": "High"},
+            {"Id": 2, "Phase ID": 2, "Description": "Phase two action", "Priority": "High"}
+        ],
+        "Events_Calendar": [{"Id": 1, "Title": "Forum", "EventDate": "2099-01-01"}]
+    }
+    calls = []
+    campaign_server.NOCODB_API_TOKEN = "token"
+    campaign_server.NOCODB_PROJECT_ID = "proj_1"
+    campaign_server._nocodb = make_client(tables, calls)
+
+    async def scenario():
+        column = await campaign_server.get_filter_column("Action_Items", campaign_server.ACTIONS_SCHEMA, "phase_id")
+        assert column == "Phase ID"
+        records = await campaign_server.get_nocodb_records("Action_Items", where=f"({column},eq,1)")
+        assert [record["id"] for record in records] == [1]
+
+        await campaign_server.get_filter_column("Events_Calendar", campaign_server.EVENTS_SCHEMA, "date")
+        calls.clear()
+        await campaign_server.campaign_calendar(days=7)
+        # One query, using EventDate, with no rejected round trip
+        assert len(calls) == 1 and calls[0][1]["sort"] == "EventDate"
+        assert calls[0][1]["where"].startswith("(EventDate,ge,exactDate,")
+        await campaign_server._nocodb.aclose()
+
+    try:
+        run(scenario)
+    finally:
+        campaign_server._nocodb = None
+        campaign_server._filter_columns.clear()
+
+
+if __name__ == "__main__":
+    test_ttl_and_stale_while_revalidate()
+    test_concurrent_requests_share_one_fetch()
+    test_etag_revalidation()
+    test_rejected_query_falls_back_to_unfiltered()
+    test_iter_records()
+    test_campaign_filters_use_the_base_columns()
+    print("NocoDB client tests passed")
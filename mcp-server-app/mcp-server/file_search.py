@@ -0,0 +1,300 @@
+import codecs
+import collections
+import fnmatch
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+# Directories never worth searching
+DEFAULT_EXCLUDES = [".git", "__pycache__", "node_modules", ".venv", "venv"]
+
+# Files are read and matched this many bytes at a time
+CHUNK_BYTES = 1024 * 1024
+
+# Matched and context lines longer than this are cut short in the results
+MAX_LINE_CHARS = 300
+
+# Larger files are not indexed; they are always searched directly
+MAX_INDEXED_BYTES = 2 * 1024 * 1024
+
+INDEX_DIR = os.getenv("FILE_SEARCH_INDEX_DIR", str(Path.home() / ".cache" / "blkout-mcp" / "search-index"))
+INDEX_VERSION = 1
+
+
+def matches_any(rel_path, patterns):
+    """True if a relative path, or its file name, matches any of the glob patterns."""
+    name = os.path.basename(rel_path)
+    return any(fnmatch.fnmatch(rel_path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def wanted(rel_path, include=None, exclude=None):
+    """True if a file passes the include globs and neither it nor any parent directory is excluded."""
+    parts = rel_path.split(os.sep)
+    if exclude and any(matches_any(os.sep.join(parts[:i]), exclude) for i in range(1, len(parts) + 1)):
+        return False
+    return not include or matches_any(rel_path, include)
+
+
+def iter_files(root, include=None, exclude=None):
+    """Yield (relative path, DirEntry) for every file under root that passes the globs.
+
+    Excluded directories are not descended into.
+    """
+    exclude = DEFAULT_EXCLUDES + list(exclude or [])
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir)) as entries:
+                for entry in entries:
+                    rel_path = os.path.join(rel_dir, entry.name)
+                    if matches_any(rel_path, exclude):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(rel_path)
+                    elif entry.is_file() and (not include or matches_any(rel_path, include)):
+                        yield rel_path, entry
+        except OSError:
+            continue
+
+
+def search_file(path, regex, context=0, limit=None):
+    """Stream a file chunk by chunk and return its matches.
+
+    Each match is (line number, line, lines before, lines after). A chunk
+    without any match is skipped without being split into lines. Binary
+    files (a NUL byte in the first chunk) are skipped.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    before = collections.deque(maxlen=context)
+    matches = []
+    waiting = []
+    line_number = 0
+    tail = ""
+
+    with open(path, "rb") as f:
+        first = True
+        while True:
+            data = f.read(CHUNK_BYTES)
+            if first and b"\0" in data[:8192]:
+                return []
+            first = False
+
+            text = tail + decoder.decode(data, final=not data)
+            if data:
+                # Hold back the last partial line until the next chunk completes it
+                cut = text.rfind("\n") + 1
+                text, tail = text[:cut], text[cut:]
+            if not text:
+                if not data:
+                    break
+                continue
+
+            lines = text.split("\n")[:-1] if text.endswith("\n") else text.split("\n")
+            if not waiting and regex.search(text) is None:
+                # Nothing here: just count the lines and remember the last few for context
+                line_number += len(lines)
+                before.extend(lines[-context:] if context else [])
+            else:
+                for line in lines:
+                    line_number += 1
+                    for match in waiting:
+                        match[3].append(line)
+                    waiting = [match for match in waiting if len(match[3]) < context]
+                    if regex.search(line):
+                        if limit is not None and len(matches) >= limit:
+                            return matches
+                        match = (line_number, line, list(before), [])
+                        matches.append(match)
+                        if context:
+                            waiting.append(match)
+                    before.append(line)
+            if not data:
+                break
+    return matches
+
+
+def required_trigrams(pattern):
+    """Lower-cased trigrams any match of the regex must contain; empty when none can be derived.
+
+    Only literal runs at the top level of the pattern are used, so the set
+    is a safe filter: a file lacking any of them cannot match.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return set()
+
+    literals = []
+    run = []
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        literals.append("".join(run))
+        run = []
+    literals.append("".join(run))
+    return {literal[i:i + 3].lower() for literal in literals for i in range(len(literal) - 2)}
+
+
+def file_trigrams(path):
+    """Sorted, concatenated lower-case trigrams of a text file, or None if it is binary or too large."""
+    with open(path, "rb") as f:
+        data = f.read(MAX_INDEXED_BYTES + 1)
+    if len(data) > MAX_INDEXED_BYTES or b"\0" in data[:8192]:
+        return None
+    text = data.decode("utf-8", errors="replace").lower()
+    return "".join(sorted({text[i:i + 3] for i in range(len(text) - 2)}))
+
+
+class TrigramIndex:
+    """A per-root trigram index, persisted as JSON and refreshed by mtime and size.
+
+    Each file maps to [mtime_ns, size, trigrams], where trigrams is the
+    file's sorted trigrams concatenated into one string (None for files
+    that are binary or too large, which are always searched). Looking a
+    trigram up with `in` on that string can only give false positives,
+    never false negatives, so it is a safe pre-filter.
+    """
+
+    def __init__(self, root, index_dir=INDEX_DIR):
+        self.root = os.path.abspath(root)
+        key = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:16]
+        self.path = Path(index_dir) / f"{key}.json"
+        self.files = self._load()
+
+    def refresh(self, files):
+        """Bring the index up to date with (relative path, DirEntry) pairs; returns how many files were re-indexed."""
+        seen = set()
+        changed = 0
+        for rel_path, entry in files:
+            seen.add(rel_path)
+            stats = entry.stat()
+            known = self.files.get(rel_path)
+            if known and known[0] == stats.st_mtime_ns and known[1] == stats.st_size:
+                continue
+            try:
+                self.files[rel_path] = [stats.st_mtime_ns, stats.st_size, file_trigrams(entry.path)]
+            except OSError:
+                continue
+            changed += 1
+
+        removed = [rel_path for rel_path in self.files if rel_path not in seen]
+        for rel_path in removed:
+            del self.files[rel_path]
+        if changed or removed:
+            self._save()
+        return changed
+
+    def candidates(self, trigrams):
+        """Relative paths of indexed files that may contain every trigram."""
+        return [rel_path for rel_path, (_, _, indexed) in self.files.items()
+                if indexed is None or all(trigram in indexed for trigram in trigrams)]
+
+    def _load(self):
+        """Load the index from disk, starting afresh if it is missing or from another version."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return {}
+        return data.get("files", {})
+
+    def _save(self):
+        """Save the index atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_suffix(".tmp")
+        with open(temp_file, "w") as f:
+            json.dump({"version": INDEX_VERSION, "root": self.root, "files": self.files}, f)
+        os.replace(temp_file, self.path)
+
+
+# Loaded indexes, kept between searches so the JSON is only read once per process
+_indexes = {}
+
+
+def get_index(root, index_dir=INDEX_DIR):
+    """Get the trigram index for root, loading it on first use."""
+    key = (os.path.abspath(root), str(index_dir))
+    if key not in _indexes:
+        _indexes[key] = TrigramIndex(root, index_dir)
+    return _indexes[key]
+
+
+def search(root, pattern, include=None, exclude=None, context=0, ignore_case=False, max_results=100,
+           use_index=False, index_dir=INDEX_DIR):
+    """Search the files under root for a regex.
+
+    Returns (results, files searched, truncated), where results is a list
+    of (relative path, matches) in path order.
+    """
+    regex = re.compile(pattern, re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+
+    if use_index:
+        # The index covers every file under root, whatever this search's globs are
+        everything = sorted(iter_files(root), key=lambda item: item[0])
+        index = get_index(root, index_dir)
+        index.refresh(everything)
+        files = [(rel_path, entry) for rel_path, entry in everything if wanted(rel_path, include, exclude)]
+        trigrams = required_trigrams(pattern)
+        if trigrams:
+            candidates = set(index.candidates(trigrams))
+            files = [(rel_path, entry) for rel_path, entry in files if rel_path in candidates]
+    else:
+        files = sorted(iter_files(root, include, exclude), key=lambda item: item[0])
+
+    results = []
+    found = 0
+    for rel_path, entry in files:
+        try:
+            matches = search_file(entry.path, regex, context, max_results - found + 1)
+        except OSError:
+            continue
+        if matches:
+            results.append((rel_path, matches))
+            found += len(matches)
+        if found > max_results:
+            break
+
+    truncated = found > max_results
+    if truncated:
+        path, matches = results[-1]
+        results[-1] = (path, matches[:len(matches) - (found - max_results)])
+    return results, len(files), truncated
+
+
+def clip(line):
+    """Cut a long line down to MAX_LINE_CHARS."""
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS] + "..."
+
+
+def format_results(results, files_searched, truncated, max_results):
+    """Format search results grep-style: path:line:text for matches, path-line-text for context."""
+    output = []
+    total = 0
+    for rel_path, matches in results:
+        for line_number, line, before, after in matches:
+            if (before or after) and output:
+                output.append("--")
+            for offset, context_line in enumerate(before):
+                output.append(f"{rel_path}-{line_number - len(before) + offset}-{clip(context_line)}")
+            output.append(f"{rel_path}:{line_number}:{clip(line)}")
+            for offset, context_line in enumerate(after):
+                output.append(f"{rel_path}-{line_number + 1 + offset}-{clip(context_line)}")
+            total += 1
+
+    if not output:
+        return f"No matches in {files_searched} files"
+    summary = f"{total} matches in {len(results)} files ({files_searched} searched)"
+    if truncated:
+        summary += f"; stopped at max_results={max_results}"
+    return "\n".join(output + [summary])
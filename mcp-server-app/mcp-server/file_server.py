@@ -1,46 +1,152 @@
+import codecs
+import heapq
+import mmap
 import os
+import re
 from typing import List, Dict, Any
 from mcp.server.fastmcp import FastMCP
+import file_search
 
 # Initialize FastMCP server
 mcp = FastMCP("file-system")
 
+# Files at least this large are read through mmap instead of seek/read
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Most bytes read_file returns in one call, and entries list_directory returns per page
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_PAGE_SIZE = 200
+
+# How much of a read is inspected to decide whether the file is binary
+BINARY_SAMPLE_BYTES = 8192
+
+def is_binary(sample: bytes) -> bool:
+    """Guess whether bytes are binary: any NUL byte, or mostly non-text control bytes."""
+    if b"\0" in sample:
+        return True
+    if not sample:
+        return False
+    control = sum(1 for byte in sample if byte < 32 and byte not in (9, 10, 12, 13, 27))
+    return control / len(sample) > 0.3
+
+def read_range(file_path: str, offset: int, count: int, size: int) -> bytes:
+    """Read count bytes at offset, through mmap for large files."""
+    with open(file_path, 'rb') as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[offset:offset + count]
+        f.seek(offset)
+        return f.read(count)
+
 @mcp.tool()
-def list_directory(path: str = ".") -> str:
-    """List files and directories at the specified path.
-    
+def list_directory(path: str = ".", offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> str:
+    """List files and directories at the specified path, sorted by name, one page at a time.
+
     Args:
         path: The directory path to list (default: current directory)
+        offset: Number of entries to skip (default: 0)
+        limit: Maximum number of entries to return (default: 200)
     """
     try:
-        items = os.listdir(path)
-        result = []
-        
-        for item in items:
-            full_path = os.path.join(path, item)
-            item_type = "Directory" if os.path.isdir(full_path) else "File"
-            size = os.path.getsize(full_path) if os.path.isfile(full_path) else "-"
-            
-            result.append(f"{item} ({item_type}, Size: {size} bytes)")
-        
-        return "\n".join(result) if result else "Directory is empty"
+        offset = max(0, offset)
+        limit = max(1, limit)
+        total = 0
+
+        def counted(entries):
+            nonlocal total
+            for entry in entries:
+                total += 1
+                yield entry
+
+        # Only the first offset + limit entries are held in memory, however large the directory
+        with os.scandir(path) as entries:
+            page = heapq.nsmallest(offset + limit, counted(entries), key=lambda entry: entry.name)[offset:]
+
+            result = []
+            for entry in page:
+                # DirEntry answers is_dir/is_file from the listing and caches its stat
+                item_type = "Directory" if entry.is_dir() else "File"
+                size = entry.stat().st_size if entry.is_file() else "-"
+                result.append(f"{entry.name} ({item_type}, Size: {size} bytes)")
+
+        if not result:
+            return "Directory is empty" if total == 0 else f"No entries after offset {offset} ({total} entries)"
+        if offset > 0 or offset + len(result) < total:
+            result.append(f"[Entries {offset + 1}-{offset + len(result)} of {total}; "
+                          f"call list_directory with offset={offset + len(result)} for more]")
+        return "\n".join(result)
     except Exception as e:
         return f"Error listing directory: {str(e)}"
 
 @mcp.tool()
-def read_file(file_path: str) -> str:
-    """Read the contents of a text file.
-    
+def read_file(file_path: str, offset: int = 0, length: int = 0, max_bytes: int = DEFAULT_MAX_BYTES) -> str:
+    """Read the contents of a text file, or a byte range of it.
+
+    Large files are read through mmap and binary files are reported rather
+    than returned. When only part of the file is returned, a last line
+    says which bytes were shown and where to continue.
+
     Args:
         file_path: Path to the file to read
+        offset: Byte offset to start reading from (default: 0)
+        length: Number of bytes to read (default: 0, meaning to the end of the file)
+        max_bytes: Most bytes to return in one call (default: 1 MB)
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        size = os.path.getsize(file_path)
+        offset = max(0, offset)
+        if offset >= size > 0:
+            return f"Offset {offset} is past the end of the file ({size} bytes)"
+
+        count = min(size - offset, length if length > 0 else size, max(1, max_bytes))
+        data = read_range(file_path, offset, count, size)
+        if is_binary(data[:BINARY_SAMPLE_BYTES]):
+            return f"Binary file: {file_path} ({size} bytes); not shown"
+
+        end = offset + len(data)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        content = decoder.decode(data, final=end == size)
+        # A multi-byte character cut off by the end of the range is left for the next read
+        end -= len(decoder.getstate()[0])
+        if offset > 0 or end < size:
+            content += f"\n[Showing bytes {offset}-{end} of {size}"
+            content += f"; call read_file with offset={end} to continue]" if end < size else "]"
         return content
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
+@mcp.tool()
+def search_files(pattern: str, path: str = ".", include: list = None, exclude: list = None, context: int = 0,
+                 ignore_case: bool = False, max_results: int = 100, use_index: bool = False) -> str:
+    """Search file contents under a directory for a regular expression, grep-style.
+
+    Files are streamed chunk by chunk, so large logs are never loaded whole.
+    With use_index, a trigram index of the directory (kept on disk and
+    refreshed by file modification time) skips files that cannot match,
+    which makes repeated searches over many files fast.
+
+    Args:
+        pattern: Regular expression to search for (matched line by line)
+        path: Directory to search (default: current directory)
+        include: Glob patterns of files to search, e.g. ["*.json", "data/*"] (optional)
+        exclude: Glob patterns of files or directories to skip (optional)
+        context: Number of lines to show before and after each match (default: 0)
+        ignore_case: Match case-insensitively (default: False)
+        max_results: Maximum number of matches to return (default: 100)
+        use_index: Use the persisted trigram index to skip files (default: False)
+    """
+    try:
+        if not os.path.isdir(path):
+            return f"Directory not found: {path}"
+        results, files_searched, truncated = file_search.search(
+            path, pattern, include, exclude, max(0, context), ignore_case, max(1, max_results), use_index
+        )
+        return file_search.format_results(results, files_searched, truncated, max_results)
+    except re.error as e:
+        return f"Invalid pattern: {str(e)}"
+    except Exception as e:
+        return f"Error searching files: {str(e)}"
+
 @mcp.tool()
 def file_info(file_path: str) -> str:
     """Get information about a file.
@@ -0,0 +1,71 @@
+import argparse
+import importlib
+import logging
+import sys
+
+from mcp.server.fastmcp import FastMCP
+
+from start_servers import SERVERS
+
+# Log to stderr: stdout carries the MCP stdio protocol
+logger = logging.getLogger(__name__)
+
+
+def server_namespace(server):
+    """Namespace for a server's tools, from its script name (campaign_server.py -> campaign)."""
+    return server["path"].stem.removesuffix("_server")
+
+
+def load_server(server):
+    """Import a server script as a module and return its FastMCP instance."""
+    directory = str(server["path"].parent)
+    # Each server imports its helper modules from its own directory
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return importlib.import_module(server["path"].stem).mcp
+
+
+def build_gateway(servers=SERVERS, only=None):
+    """Mount every server's tools on one FastMCP instance as <namespace>_<tool>.
+
+    The servers run in this process, so they share one event loop, the
+    connection pool from shared_http, and their caches across all clients.
+    """
+    gateway = FastMCP("blkout-gateway")
+    for server in servers:
+        namespace = server_namespace(server)
+        if only and namespace not in only:
+            continue
+        try:
+            source = load_server(server)
+        except Exception as e:
+            logger.error(f"Error loading {server['name']}: {str(e)}")
+            continue
+
+        tools = source._tool_manager.list_tools()
+        for tool in tools:
+            gateway.add_tool(tool.fn, name=f"{namespace}_{tool.name}", description=tool.description)
+        logger.info(f"Mounted {len(tools)} tools from {server['name']} as {namespace}_*")
+    return gateway
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve every BLKOUT MCP server's tools from one process.")
+    parser.add_argument("--only", action="append", metavar="NAMESPACE",
+                        help="Only mount these servers (repeatable), e.g. --only campaign --only sendfox")
+    parser.add_argument("--list", action="store_true", help="List the mounted tool names and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    gateway = build_gateway(only=args.only)
+
+    if args.list:
+        for tool in gateway._tool_manager.list_tools():
+            print(tool.name)
+        return
+
+    gateway.run(transport='stdio')
+
+
+if __name__ == "__main__":
+    main()
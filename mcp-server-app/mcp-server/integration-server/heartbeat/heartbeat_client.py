@@ -0,0 +1,224 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import httpx
+
+from shared_http import APIError, parse_timeframe, request_json
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_API_URL = "https://api.heartbeat.chat/v1"
+
+# Engagement counters that add up across days
+SUMMED_STATS = ("total_messages", "reactions", "replies")
+
+
+class HeartbeatError(APIError):
+    """A Heartbeat API call failed; carries the HTTP status and response body when there was one."""
+
+
+class HeartbeatClient:
+    """Async client for the Heartbeat.chat API.
+
+    One pooled httpx client is reused for every call. Requests go through
+    shared_http.request_json, which retries 429 and 5xx responses for
+    idempotent methods only, so an announcement is never posted twice.
+    """
+
+    def __init__(self, api_key, workspace_id, base_url=HEARTBEAT_API_URL, timeout=30.0, max_retries=3,
+                 backoff=0.5, transport=None):
+        self.api_key = api_key
+        self.workspace_id = workspace_id
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._transport = transport
+        self._client = None
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def create_channel(self, name, description, is_private=False):
+        """Create a channel and return it."""
+        return await self._request("POST", "/channels", json={
+            "workspace_id": self.workspace_id,
+            "name": name,
+            "description": description,
+            "is_private": is_private
+        })
+
+    async def list_channels(self):
+        """List the workspace's channels."""
+        return await self._request("GET", "/channels", params={"workspace_id": self.workspace_id})
+
+    async def post_message(self, channel_id, message, pin=False):
+        """Post a message to a channel, pinning it if asked, and return the message.
+
+        The message has gone out once the post succeeds, so a failed pin
+        does not raise; it is returned in the message's pin_error instead.
+        """
+        posted = await self._request("POST", "/messages", json={
+            "channel_id": channel_id,
+            "message": message,
+            "pin": pin
+        })
+        if pin and posted.get("id"):
+            try:
+                await self._request("POST", f"/messages/{posted['id']}/pin")
+            except HeartbeatError as e:
+                logger.error(f"Posted message {posted['id']} to {channel_id} but could not pin it: {str(e)}")
+                posted["pin_error"] = str(e)
+        return posted
+
+    async def post_announcements(self, channel_ids, message, pin=False, concurrency=5):
+        """Post the same announcement to several channels concurrently.
+
+        Returns one result per channel, in order: the posted message, or
+        the error for channels that failed. A channel whose message went
+        out but could not be pinned counts as posted, with its pin_error.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def post(channel_id):
+            async with semaphore:
+                try:
+                    posted = await self.post_message(channel_id, message, pin)
+                except HeartbeatError as e:
+                    logger.error(f"Error posting announcement to {channel_id}: {str(e)}")
+                    return {"channel_id": channel_id, "success": False, "error": str(e)}
+                result = {"channel_id": channel_id, "success": True, "message": posted}
+                if "pin_error" in posted:
+                    result["pin_error"] = posted.pop("pin_error")
+                return result
+
+        return await asyncio.gather(*(post(channel_id) for channel_id in channel_ids))
+
+    async def get_engagement(self, channel_id=None, day=None):
+        """Get one day's engagement stats for a channel, or the whole workspace."""
+        params = {"workspace_id": self.workspace_id, "timeframe": "1d"}
+        if channel_id:
+            params["channel_id"] = channel_id
+        if day:
+            params["date"] = day.isoformat()
+        return await self._request("GET", "/analytics/engagement", params=params)
+
+    def _get_client(self):
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                transport=self._transport
+            )
+        return self._client
+
+    async def _request(self, method, path, **kwargs):
+        """Call the API, retrying transient failures, and return the decoded JSON body."""
+        return await request_json(self._get_client(), method, path, service="Heartbeat", error_class=HeartbeatError,
+                                  max_retries=self.max_retries, backoff=self.backoff, **kwargs)
+
+
+class EngagementSnapshots:
+    """A local time series of daily engagement snapshots per channel (or the whole workspace).
+
+    Timeframe queries are answered by adding up the cached days, so only
+    days that were never fetched, and today (at most every today_ttl
+    seconds), go to the API. A past day's snapshot is final once it was
+    taken after the day ended. Snapshots are kept for keep_days days in a
+    JSON file written atomically.
+    """
+
+    def __init__(self, client, path, today_ttl=900, keep_days=90, concurrency=5, clock=time.time):
+        self.client = client
+        self.path = Path(path)
+        self.today_ttl = today_ttl
+        self.keep_days = keep_days
+        self.concurrency = concurrency
+        self.clock = clock
+        self.series = self._load()
+
+    async def engagement(self, channel_id=None, timeframe="7d"):
+        """Engagement for the last timeframe days (today included), aggregated from daily snapshots."""
+        days = parse_timeframe(timeframe)
+        scope = channel_id or "workspace"
+        today = datetime.datetime.fromtimestamp(self.clock(), datetime.timezone.utc).date()
+        wanted = [today - datetime.timedelta(days=offset) for offset in range(days)]
+
+        series = self.series.setdefault(scope, {})
+        stale = [day for day in wanted if not self._fresh(series.get(day.isoformat()), day, today)]
+        if stale:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(day):
+                async with semaphore:
+                    stats = await self.client.get_engagement(channel_id, None if day == today else day)
+                    fetched_at = self.clock()
+                    series[day.isoformat()] = {
+                        "fetched_at": fetched_at,
+                        # Taken after the day ended, so it cannot change any more
+                        "final": day < datetime.datetime.fromtimestamp(fetched_at, datetime.timezone.utc).date(),
+                        "stats": stats
+                    }
+
+            try:
+                await asyncio.gather(*(fetch(day) for day in stale))
+            finally:
+                self._prune(today)
+                self._save()
+
+        snapshots = [series[day.isoformat()]["stats"] for day in wanted]
+        result = {"timeframe": timeframe, "days": days, "fetched_days": len(stale)}
+        result["channel_id" if channel_id else "workspace_id"] = channel_id or self.client.workspace_id
+        for stat in SUMMED_STATS:
+            result[stat] = sum(snapshot.get(stat, 0) or 0 for snapshot in snapshots)
+        # Distinct users cannot be added up across days; report the busiest day
+        result["peak_daily_active_users"] = max((snapshot.get("active_users", 0) or 0 for snapshot in snapshots), default=0)
+        result["daily"] = [{"date": day.isoformat(), **{stat: snapshot.get(stat, 0) for stat in (*SUMMED_STATS, "active_users")}}
+                           for day, snapshot in zip(wanted, snapshots)]
+        return result
+
+    def _fresh(self, entry, day, today):
+        """True if a cached snapshot can answer for the day without asking the API."""
+        if entry is None:
+            return False
+        if entry.get("final"):
+            return True
+        # Today's numbers are still moving; earlier days just need one fetch after they ended
+        return day == today and self.clock() - entry["fetched_at"] < self.today_ttl
+
+    def _prune(self, today):
+        """Drop snapshots older than keep_days."""
+        cutoff = (today - datetime.timedelta(days=self.keep_days)).isoformat()
+        for series in self.series.values():
+            for day in [day for day in series if day < cutoff]:
+                del series[day]
+
+    def _load(self):
+        """Load the snapshot series from disk."""
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.error(f"Error loading engagement snapshots: {str(e)}")
+            return {}
+
+    def _save(self):
+        """Save the snapshot series atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.path.with_suffix(".tmp")
+        with open(temp_file, "w") as f:
+            json.dump(self.series, f)
+        os.replace(temp_file, self.path)
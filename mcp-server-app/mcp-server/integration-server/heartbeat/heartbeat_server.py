@@ -1,8 +1,6 @@
 from mcp.server.fastmcp import FastMCP
-import httpx
 import json
 import os
-from datetime import datetime
 from pathlib import Path
 import sys
 
@@ -11,6 +9,9 @@ parent_dir = str(Path(__file__).resolve().parents[3])
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
+from heartbeat_client import EngagementSnapshots, HeartbeatClient, HeartbeatError
+from shared_http import get_transport
+
 # Initialize FastMCP server
 mcp = FastMCP("heartbeat-integration")
 
@@ -20,10 +21,36 @@ HEARTBEAT_API_KEY = os.getenv("HEARTBEAT_API_KEY", "your_api_key_here")
 HEARTBEAT_API_URL = "https://api.heartbeat.chat/v1"
 WORKSPACE_ID = os.getenv("HEARTBEAT_WORKSPACE_ID", "your_workspace_id_here")
 
+# Where daily engagement snapshots are kept, and how often today's snapshot is refreshed (seconds)
+HEARTBEAT_SNAPSHOTS = os.getenv("HEARTBEAT_SNAPSHOTS", str(Path(parent_dir) / "data" / "heartbeat_snapshots.json"))
+HEARTBEAT_TODAY_TTL = int(os.getenv("HEARTBEAT_TODAY_TTL", "900"))
+
+# Most channels an announcement is posted to at once
+HEARTBEAT_CONCURRENCY = int(os.getenv("HEARTBEAT_CONCURRENCY", "5"))
+
+# Shared pooled client and snapshot cache, created on first use
+_client = None
+_snapshots = None
+
+def get_client():
+    """Get the shared Heartbeat API client."""
+    global _client
+    if _client is None:
+        _client = HeartbeatClient(HEARTBEAT_API_KEY, WORKSPACE_ID, HEARTBEAT_API_URL, transport=get_transport())
+    return _client
+
+def get_snapshots():
+    """Get the shared engagement snapshot cache."""
+    global _snapshots
+    if _snapshots is None:
+        _snapshots = EngagementSnapshots(get_client(), HEARTBEAT_SNAPSHOTS, today_ttl=HEARTBEAT_TODAY_TTL,
+                                         concurrency=HEARTBEAT_CONCURRENCY)
+    return _snapshots
+
 @mcp.tool()
 async def create_channel(name: str, description: str, is_private: bool = False) -> str:
     """Create a new channel in Heartbeat.chat.
-    
+
     Args:
         name: Channel name
         description: Channel description
@@ -31,49 +58,16 @@ async def create_channel(name: str, description: str, is_private: bool = False)
     """
     if HEARTBEAT_API_KEY == "your_api_key_here":
         return "Error: Heartbeat API key not configured. Please set the HEARTBEAT_API_KEY environment variable."
-    
-    headers = {
-        "Authorization": f"Bearer {HEARTBEAT_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "workspace_id": WORKSPACE_ID,
-        "name": name,
-        "description": description,
-        "is_private": is_private
-    }
-    
-    # For demonstration purposes, we'll simulate the API call
-    # In production, uncomment the actual API call
-    """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{HEARTBEAT_API_URL}/channels", 
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            return json.dumps(response.json())
-        except Exception as e:
-            return f"Error creating channel: {str(e)}"
-    """
-    
-    # Simulated response
-    return json.dumps({
-        "id": "channel_" + datetime.now().strftime("%Y%m%d%H%M%S"),
-        "name": name,
-        "description": description,
-        "is_private": is_private,
-        "created_at": datetime.now().isoformat(),
-        "message": "Channel created successfully (simulated)"
-    })
+
+    try:
+        return json.dumps(await get_client().create_channel(name, description, is_private))
+    except HeartbeatError as e:
+        return f"Error creating channel: {str(e)}"
 
 @mcp.tool()
 async def post_announcement(channel_id: str, message: str, pin: bool = False) -> str:
     """Post an announcement to a Heartbeat.chat channel.
-    
+
     Args:
         channel_id: ID of the channel
         message: Announcement message
@@ -81,185 +75,67 @@ async def post_announcement(channel_id: str, message: str, pin: bool = False) ->
     """
     if HEARTBEAT_API_KEY == "your_api_key_here":
         return "Error: Heartbeat API key not configured. Please set the HEARTBEAT_API_KEY environment variable."
-    
-    headers = {
-        "Authorization": f"Bearer {HEARTBEAT_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "channel_id": channel_id,
-        "message": message,
-        "pin": pin
-    }
-    
-    # For demonstration purposes, we'll simulate the API call
-    # In production, uncomment the actual API call
-    """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{HEARTBEAT_API_URL}/messages", 
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            
-            if pin:
-                message_id = response.json().get("id")
-                await client.post(
-                    f"{HEARTBEAT_API_URL}/messages/{message_id}/pin",
-                    headers=headers
-                )
-                
-            return json.dumps(response.json())
-        except Exception as e:
-            return f"Error posting announcement: {str(e)}"
+
+    try:
+        return json.dumps(await get_client().post_message(channel_id, message, pin))
+    except HeartbeatError as e:
+        return f"Error posting announcement: {str(e)}"
+
+@mcp.tool()
+async def post_announcements(channel_ids: list, message: str, pin: bool = False) -> str:
+    """Post the same announcement to several Heartbeat.chat channels at once.
+
+    Channels are posted to concurrently; a failure in one channel does not
+    stop the others.
+
+    Args:
+        channel_ids: IDs of the channels
+        message: Announcement message
+        pin: Whether to pin the message
+
+    Returns:
+        One result per channel, with counts of channels posted and failed
     """
-    
-    # Simulated response
-    message_id = "msg_" + datetime.now().strftime("%Y%m%d%H%M%S")
-    return json.dumps({
-        "id": message_id,
-        "channel_id": channel_id,
-        "content": message,
-        "pinned": pin,
-        "created_at": datetime.now().isoformat(),
-        "message": "Announcement posted successfully (simulated)"
-    })
+    if HEARTBEAT_API_KEY == "your_api_key_here":
+        return "Error: Heartbeat API key not configured. Please set the HEARTBEAT_API_KEY environment variable."
+
+    results = await get_client().post_announcements(channel_ids, message, pin, HEARTBEAT_CONCURRENCY)
+    posted = sum(1 for result in results if result["success"])
+    return json.dumps({"posted": posted, "failed": len(results) - posted, "results": results})
 
 @mcp.tool()
 async def get_engagement_stats(channel_id: str = None, timeframe: str = "7d") -> str:
     """Get engagement statistics from Heartbeat.chat.
-    
+
+    Stats are built from locally cached daily snapshots, so only days not
+    seen before (and today, every few minutes) are fetched from Heartbeat.
+
     Args:
         channel_id: Optional specific channel (all channels if None)
-        timeframe: Time period for stats (1d, 7d, 30d, etc.)
+        timeframe: Time period for stats in days (1d, 7d, 30d, etc.)
     """
     if HEARTBEAT_API_KEY == "your_api_key_here":
         return "Error: Heartbeat API key not configured. Please set the HEARTBEAT_API_KEY environment variable."
-    
-    headers = {
-        "Authorization": f"Bearer {HEARTBEAT_API_KEY}"
-    }
-    
-    params = {
-        "workspace_id": WORKSPACE_ID,
-        "timeframe": timeframe
-    }
-    
-    if channel_id:
-        params["channel_id"] = channel_id
-    
-    # For demonstration purposes, we'll simulate the API call
-    # In production, uncomment the actual API call
-    """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{HEARTBEAT_API_URL}/analytics/engagement", 
-                headers=headers,
-                params=params
-            )
-            response.raise_for_status()
-            return json.dumps(response.json())
-        except Exception as e:
-            return f"Error getting engagement stats: {str(e)}"
-    """
-    
-    # Simulated response
-    if channel_id:
-        return json.dumps({
-            "channel_id": channel_id,
-            "timeframe": timeframe,
-            "total_messages": 325,
-            "active_users": 42,
-            "reactions": 156,
-            "replies": 78,
-            "peak_hours": ["14:00", "19:00"],
-            "message": "Channel engagement statistics retrieved successfully (simulated)"
-        })
-    else:
-        return json.dumps({
-            "workspace_id": WORKSPACE_ID,
-            "timeframe": timeframe,
-            "total_messages": 1250,
-            "active_users": 150,
-            "reactions": 625,
-            "replies": 312,
-            "top_channels": [
-                {"id": "channel_1", "name": "general", "messages": 325},
-                {"id": "channel_2", "name": "events", "messages": 275},
-                {"id": "channel_3", "name": "resources", "messages": 225}
-            ],
-            "peak_hours": ["14:00", "19:00"],
-            "message": "Workspace engagement statistics retrieved successfully (simulated)"
-        })
+
+    try:
+        return json.dumps(await get_snapshots().engagement(channel_id, timeframe))
+    except (HeartbeatError, ValueError) as e:
+        return f"Error getting engagement stats: {str(e)}"
 
 @mcp.tool()
 async def list_channels() -> str:
     """List all channels in the Heartbeat.chat workspace.
-    
+
     Returns:
         List of channels with IDs and member counts
     """
     if HEARTBEAT_API_KEY == "your_api_key_here":
         return "Error: Heartbeat API key not configured. Please set the HEARTBEAT_API_KEY environment variable."
-    
-    headers = {
-        "Authorization": f"Bearer {HEARTBEAT_API_KEY}"
-    }
-    
-    params = {
-        "workspace_id": WORKSPACE_ID
-    }
-    
-    # For demonstration purposes, we'll simulate the API call
-    # In production, uncomment the actual API call
-    """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{HEARTBEAT_API_URL}/channels", 
-                headers=headers,
-                params=params
-            )
-            response.raise_for_status()
-            return json.dumps(response.json())
-        except Exception as e:
-            return f"Error listing channels: {str(e)}"
-    """
-    
-    # Simulated response
-    return json.dumps({
-        "channels": [
-            {
-                "id": "channel_1",
-                "name": "general",
-                "description": "General discussion for all members",
-                "member_count": 150,
-                "is_private": False,
-                "created_at": "2025-01-15T12:00:00Z"
-            },
-            {
-                "id": "channel_2",
-                "name": "events",
-                "description": "Upcoming events and activities",
-                "member_count": 125,
-                "is_private": False,
-                "created_at": "2025-01-15T12:00:00Z"
-            },
-            {
-                "id": "channel_3",
-                "name": "resources",
-                "description": "Shared resources and knowledge base",
-                "member_count": 100,
-                "is_private": False,
-                "created_at": "2025-01-15T12:00:00Z"
-            }
-        ],
-        "message": "Channels retrieved successfully (simulated)"
-    })
+
+    try:
+        return json.dumps(await get_client().list_channels())
+    except HeartbeatError as e:
+        return f"Error listing channels: {str(e)}"
 
 if __name__ == "__main__":
     # Initialize and run the server
@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+
+# shared_http lives in mcp-server-app, shared with the other clients
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from heartbeat_client import EngagementSnapshots, HeartbeatClient
+
+# Noon UTC on 2025-05-10
+NOON = datetime.datetime(2025, 5, 10, 12, tzinfo=datetime.timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def fake_heartbeat(calls):
+    """A MockTransport posting messages (channel_3 fails, channel_2 cannot pin) and answering daily engagement."""
+
+    async def handler(request):
+        calls.append((request.method, request.url.path, dict(request.url.params)))
+        await asyncio.sleep(0.01)
+        if request.url.path == "/v1/messages":
+            body = json.loads(request.content)
+            if body["channel_id"] == "channel_3":
+                return httpx.Response(403, json={"error": "Not a member"})
+            return httpx.Response(201, json={"id": f"msg_{body['channel_id']}", "channel_id": body["channel_id"]})
+        if request.url.path.endswith("/pin"):
+            if "channel_2" in request.url.path:
+                return httpx.Response(500, json={"error": "Pin failed"})
+            return httpx.Response(200, json={"pinned": True})
+        if request.url.path == "/v1/analytics/engagement":
+            day = int(request.url.params.get("date", "2025-05-10")[-2:])
+            return httpx.Response(200, json={"total_messages": day, "active_users": day % 4, "reactions": 1, "replies": 2})
+        return httpx.Response(404, json={"error": "Not found"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_post_announcements():
+    """Channels are posted to concurrently over one client, and a failed channel does not stop the rest."""
+    calls = []
+    client = HeartbeatClient("key", "workspace_1", transport=fake_heartbeat(calls), backoff=0)
+
+    async def run():
+        try:
+            return await client.post_announcements(["channel_1", "channel_2", "channel_3"], "Hello", pin=True)
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+    assert [result["success"] for result in results] == [True, True, False]
+    assert "403" in results[2]["error"]
+    # channel_2's message went out, so it counts as posted even though the pin failed
+    assert "pin_error" not in results[0] and "500" in results[1]["pin_error"]
+    # Failed POSTs are not retried, so nothing is posted or pinned twice
+    assert sum(1 for call in calls if call[1] == "/v1/messages") == 3
+    assert sorted(call[1] for call in calls if call[1].endswith("/pin")) == ["/v1/messages/msg_channel_1/pin",
+                                                                            "/v1/messages/msg_channel_2/pin"]
+
+
+def test_engagement_snapshots():
+    """Timeframes add up cached daily snapshots; only new days and a stale today are fetched again."""
+    calls = []
+    clock = FakeClock(NOON)
+    client = HeartbeatClient("key", "workspace_1", transport=fake_heartbeat(calls), backoff=0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snapshots.json")
+        snapshots = EngagementSnapshots(client, path, today_ttl=900, clock=clock)
+
+        async def run():
+            week = await snapshots.engagement(timeframe="7d")
+            fetched = len(calls)
+            # 1d and a repeat 7d come straight from the cache
+            today = await snapshots.engagement(timeframe="1d")
+            again = await snapshots.engagement(timeframe="7d")
+            assert len(calls) == fetched
+            # A month only fetches the 23 days not yet seen
+            month = await snapshots.engagement(timeframe="30d")
+            assert len(calls) == fetched + 23
+            # Once today's snapshot is stale, only today is fetched again
+            clock.now += 1000
+            await snapshots.engagement(timeframe="30d")
+            assert len(calls) == fetched + 24 and "date" not in calls[-1][2]
+            return week, today, again, month
+
+        try:
+            week, today, again, month = asyncio.run(run())
+        finally:
+            asyncio.run(client.aclose())
+
+        assert week["fetched_days"] == 7 and again["fetched_days"] == 0
+        assert {**week, "fetched_days": 0} == again
+        assert week["total_messages"] == sum(range(4, 11)) and week["replies"] == 14
+        assert week["peak_daily_active_users"] == 3
+        assert today["total_messages"] == 10 and today["daily"][0]["date"] == "2025-05-10"
+        assert month["days"] == 30 and len(month["daily"]) == 30
+
+        # Snapshots survive a restart; past days were taken after they ended, so they are final
+        reloaded = EngagementSnapshots(client, path, clock=clock)
+        assert reloaded.series["workspace"]["2025-05-09"]["final"]
+        assert not reloaded.series["workspace"]["2025-05-10"]["final"]
+
+
+if __name__ == "__main__":
+    test_post_announcements()
+    test_engagement_snapshots()
+    print("Heartbeat client tests passed")
@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from sendfox_cache import iter_pages
+
+logger = logging.getLogger(__name__)
+
+SENDFOX_API_URL = "https://api.sendfox.com"
+
+# The backend (app.py, member_manager.py, models.py) lives at the repository root
+BACKEND_DIR = Path(__file__).resolve().parents[4]
+DEFAULT_MEMBERS_FILE = BACKEND_DIR / "data" / "members.json"
+
+# Members with this status are unsubscribed in SendFox rather than added
+UNSUBSCRIBED_STATUS = "unsubscribed"
+
+
+class TokenBucket:
+    """Async token bucket: allows bursts of up to capacity calls, refilled at rate per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def contact_for_member(member):
+    """Build the SendFox contact fields for a member record."""
+    first_name, _, last_name = (member.get("name") or "").strip().partition(" ")
+    return {
+        "email": member["email"].strip().lower(),
+        "first_name": first_name,
+        "last_name": last_name.strip(),
+        "unsubscribed": member.get("status") == UNSUBSCRIBED_STATUS
+    }
+
+
+def contact_from_row(row):
+    """Build the synced contact fields from a SendFox contact record."""
+    return {
+        "email": row["email"].strip().lower(),
+        "first_name": row.get("first_name") or "",
+        "last_name": row.get("last_name") or "",
+        "unsubscribed": bool(row.get("unsubscribed_at"))
+    }
+
+
+def contact_hash(contact):
+    """Hash the contact fields we sync, to spot members that changed since the last push."""
+    return hashlib.sha1(json.dumps(contact, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ContactSync:
+    """Push the member list to SendFox, sending only new or changed contacts.
+
+    A local state file holds a snapshot of what SendFox has (email -> hash
+    of the fields we last pushed). It is seeded from the paginated
+    /contacts listing on the first run (or with refresh=True) and updated
+    as each contact is pushed, so an interrupted sync resumes where it
+    stopped. Pushes run concurrently, paced by a token bucket.
+
+    SendFox has no call to update a contact, so a member whose email it
+    already holds is looked up instead and the snapshot records what
+    SendFox actually has. If that differs from the member, the contact is
+    counted as a conflict and recorded with the member's hash, and it is
+    left alone until the member changes again (or a refresh).
+    """
+
+    def __init__(self, client, state_path, list_ids=None, concurrency=5, rate=2.0, checkpoint_every=25):
+        self.client = client
+        self.state_path = Path(state_path)
+        self.list_ids = list_ids or []
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, capacity=concurrency)
+        self.checkpoint_every = checkpoint_every
+        self.state = self._load_state()
+        self._pending_writes = 0
+
+    async def sync(self, members, refresh=False, dry_run=False):
+        """Sync members to SendFox and return a summary."""
+        try:
+            if refresh or self.state.get("fetched_at") is None:
+                await self.refresh_snapshot()
+
+            contacts = self.state["contacts"]
+            conflicts = self.state.setdefault("conflicts", {})
+            changes = []
+            for member in members:
+                if not member.get("email"):
+                    continue
+                contact = contact_for_member(member)
+                known = contacts.get(contact["email"])
+                if contact["unsubscribed"] and known is None:
+                    # Never in SendFox, nothing to unsubscribe
+                    continue
+                wanted = contact_hash(contact)
+                if known != wanted and conflicts.get(contact["email"]) != wanted:
+                    changes.append(contact)
+
+            summary = {"success": True, "checked": len(members), "pushed": 0, "unsubscribed": 0, "failed": 0,
+                       "conflicts": 0}
+            if dry_run:
+                summary["pending"] = len(changes)
+                summary["message"] = f"{len(changes)} contacts would be pushed"
+                return summary
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def push(contact):
+                async with semaphore:
+                    await self.bucket.acquire()
+                    try:
+                        pushed_hash = await self._push_contact(contact)
+                    except httpx.HTTPError as e:
+                        logger.error(f"Error syncing contact {contact['email']}: {str(e)}")
+                        summary["failed"] += 1
+                        return
+                    wanted = contact_hash(contact)
+                    if pushed_hash != wanted:
+                        logger.warning(f"SendFox already has {contact['email']} with different details")
+                        summary["conflicts"] += 1
+                        conflicts[contact["email"]] = wanted
+                    else:
+                        summary["unsubscribed" if contact["unsubscribed"] else "pushed"] += 1
+                        conflicts.pop(contact["email"], None)
+                    self._checkpoint(contact["email"], pushed_hash)
+
+            try:
+                await asyncio.gather(*(push(contact) for contact in changes))
+            finally:
+                self._save_state()
+
+            summary["message"] = (f"Synced {summary['pushed']} contacts, unsubscribed {summary['unsubscribed']}, "
+                                  f"{summary['failed']} failed, {summary['conflicts']} conflicts")
+            return summary
+        except httpx.HTTPError as e:
+            logger.error(f"Error syncing contacts: {str(e)}")
+            return {"success": False, "message": f"Error: {str(e)}"}
+
+    async def refresh_snapshot(self):
+        """Rebuild the snapshot from SendFox's paginated contact listing."""
+        contacts = {}
+        async for row in iter_pages(self.client, "/contacts"):
+            contact = contact_from_row(row)
+            contacts[contact["email"]] = contact_hash(contact)
+
+        # A fresh snapshot gives known conflicts another try
+        self.state = {"fetched_at": time.time(), "contacts": contacts, "conflicts": {}}
+        self._save_state()
+        logger.info(f"Fetched {len(contacts)} SendFox contacts")
+
+    async def _push_contact(self, contact):
+        """Create a contact, or unsubscribe it, and return the hash of what SendFox now has."""
+        if contact["unsubscribed"]:
+            response = await self.client.patch("/unsubscribe", json={"email": contact["email"]})
+        else:
+            payload = {key: contact[key] for key in ("email", "first_name", "last_name")}
+            if self.list_ids:
+                payload["lists"] = self.list_ids
+            response = await self.client.post("/contacts", json=payload)
+            # SendFox answers 422 for a contact it already has; the snapshot just didn't know yet
+            if response.status_code == 422:
+                return await self._existing_contact_hash(contact["email"])
+        response.raise_for_status()
+        return contact_hash(contact)
+
+    async def _existing_contact_hash(self, email):
+        """Look up a contact SendFox already has and return the hash of its current fields."""
+        response = await self.client.get("/contacts", params={"email": email})
+        response.raise_for_status()
+        data = response.json()
+        rows = data.get("data", []) if isinstance(data, dict) else data
+        for row in rows:
+            if row.get("email", "").strip().lower() == email:
+                return contact_hash(contact_from_row(row))
+        raise httpx.HTTPStatusError(f"SendFox rejected {email} but has no such contact",
+                                    request=response.request, response=response)
+
+    def _checkpoint(self, email, pushed_hash):
+        """Record a pushed contact, saving the state every checkpoint_every pushes."""
+        self.state["contacts"][email] = pushed_hash
+        self._pending_writes += 1
+        if self._pending_writes >= self.checkpoint_every:
+            self._save_state()
+
+    def _load_state(self):
+        """Load the snapshot/checkpoint state from disk."""
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"fetched_at": None, "contacts": {}}
+        except ValueError as e:
+            logger.error(f"Error loading SendFox sync state: {str(e)}")
+            return {"fetched_at": None, "contacts": {}}
+
+    def _save_state(self):
+        """Save the state atomically."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.state_path.with_suffix(".tmp")
+        with open(temp_file, "w") as f:
+            json.dump(self.state, f)
+        os.replace(temp_file, self.state_path)
+        self._pending_writes = 0
+
+
+def create_client(api_key, base_url=SENDFOX_API_URL, timeout=30.0, transport=None):
+    """Create a pooled SendFox API client, optionally on a shared transport."""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        transport=transport
+    )
+
+
+def load_members(members_file=DEFAULT_MEMBERS_FILE):
+    """Load members from the backend's member store as dicts."""
+    # mcp-server-app has an older member_manager of its own, so put the backend first
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    from member_manager import MemberManager
+
+    return [member.to_dict() for member in MemberManager(file_path=str(members_file)).get_all_members()]
+
+
+async def run_sync(args):
+    """Run one sync from the command line."""
+    async with create_client(os.getenv("SENDFOX_API_KEY", ""), args.api_url) as client:
+        sync = ContactSync(client, args.state_file, args.list_id, args.concurrency, args.rate)
+        return await sync.sync(load_members(args.members_file), refresh=args.refresh, dry_run=args.dry_run)
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=Path(__file__).resolve().parents[2] / "config" / ".env")
+
+    parser = argparse.ArgumentParser(description="Sync BLKOUT NXT members to SendFox contacts.")
+    parser.add_argument("--members-file", default=os.getenv("MEMBERS_FILE", str(DEFAULT_MEMBERS_FILE)))
+    parser.add_argument("--state-file", default=str(BACKEND_DIR / "data" / "sendfox_sync_state.json"))
+    parser.add_argument("--list-id", type=int, action="append", help="SendFox list to add contacts to (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum API calls per second")
+    parser.add_argument("--refresh", action="store_true", help="Re-read all contacts from SendFox first")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many contacts would be pushed")
+    parser.add_argument("--api-url", default=SENDFOX_API_URL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(run_sync(args))
+    print(json.dumps(result, indent=2))
+    return 0 if result["success"] and not result.get("failed") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds each kind of read stays fresh; None means it never expires
+DEFAULT_TTLS = {
+    "lists": 300,
+    "campaign": 60,
+    "stats": 60,
+    # Stats for a campaign that has already sent are final
+    "sent_stats": None
+}
+
+
+async def iter_pages(client, path, params=None):
+    """Yield every row of a paginated SendFox listing, one page request at a time."""
+    params = dict(params or {})
+    page = 1
+    while True:
+        params["page"] = page
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+        data = response.json()
+        for row in data.get("data", []):
+            yield row
+        if page >= data.get("last_page", page):
+            return
+        page += 1
+
+
+class SendFoxCache:
+    """Cached reads from the SendFox API for the MCP tools.
+
+    Each resource type has its own TTL. Concurrent reads of the same key
+    share one in-flight request instead of each calling the API, and
+    failed reads are never cached. Listings are read in full, following
+    SendFox's page-based pagination.
+    """
+
+    def __init__(self, client, ttls=None, clock=time.monotonic):
+        self.client = client
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.clock = clock
+        self._entries = {}
+        self._inflight = {}
+
+    async def get_lists(self):
+        """Get every email list."""
+        return await self._cached(("lists",), self.ttls["lists"], lambda: self._fetch_all("/lists"))
+
+    async def get_campaign(self, campaign_id):
+        """Get a campaign, kept for good once it has sent."""
+        key = ("campaign", str(campaign_id))
+        campaign = await self._cached(key, self.ttls["campaign"], lambda: self._fetch(f"/campaigns/{campaign_id}"))
+        if campaign.get("sent_at"):
+            self._entries[key] = (campaign, None)
+        return campaign
+
+    async def get_campaign_stats(self, campaign_id):
+        """Get a campaign's statistics, kept for good once the campaign has sent."""
+        campaign = await self.get_campaign(campaign_id)
+        ttl = self.ttls["sent_stats"] if campaign.get("sent_at") else self.ttls["stats"]
+        return await self._cached(("stats", str(campaign_id)), ttl,
+                                  lambda: self._fetch(f"/campaigns/{campaign_id}/stats"))
+
+    def invalidate(self, kind=None, key=None):
+        """Drop cached entries: everything, one resource type, or one resource."""
+        for cached_key in list(self._entries):
+            if kind is None or (cached_key[0] == kind and (key is None or cached_key[1:] == (str(key),))):
+                del self._entries[cached_key]
+
+    async def _cached(self, key, ttl, fetch):
+        """Return a fresh cached value, or fetch it once however many callers are waiting."""
+        entry = self._entries.get(key)
+        if entry is not None and (entry[1] is None or entry[1] > self.clock()):
+            return entry[0]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shielded so one caller giving up does not cancel the read for the others
+        value = await asyncio.shield(task)
+        self._entries[key] = (value, None if ttl is None else self.clock() + ttl)
+        return value
+
+    async def _fetch(self, path):
+        """Get one resource."""
+        response = await self.client.get(path)
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_all(self, path):
+        """Get every row of a paginated listing."""
+        rows = [row async for row in iter_pages(self.client, path)]
+        logger.info(f"Fetched {len(rows)} rows from SendFox {path}")
+        return rows
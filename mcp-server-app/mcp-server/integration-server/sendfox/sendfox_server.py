@@ -13,6 +13,10 @@ parent_dir = str(Path(__file__).resolve().parents[3])
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
+from contact_sync import BACKEND_DIR, DEFAULT_MEMBERS_FILE, ContactSync, create_client, load_members
+from sendfox_cache import SendFoxCache
+from shared_http import get_transport
+
 # Initialize FastMCP server
 mcp = FastMCP("sendfox-integration")
 
@@ -21,6 +25,36 @@ mcp = FastMCP("sendfox-integration")
 SENDFOX_API_KEY = os.getenv("SENDFOX_API_KEY", "your_api_key_here")
 SENDFOX_API_URL = "https://api.sendfox.com"
 
+# Member store to sync from, and where the SendFox contact snapshot is kept
+MEMBERS_FILE = os.getenv("MEMBERS_FILE", str(DEFAULT_MEMBERS_FILE))
+SENDFOX_SYNC_STATE = os.getenv("SENDFOX_SYNC_STATE", str(BACKEND_DIR / "data" / "sendfox_sync_state.json"))
+
+# Cache lifetimes in seconds for list and campaign reads
+SENDFOX_LISTS_TTL = int(os.getenv("SENDFOX_LISTS_TTL", "300"))
+SENDFOX_STATS_TTL = int(os.getenv("SENDFOX_STATS_TTL", "60"))
+
+# Shared pooled client and read cache, created on first use
+_client = None
+_cache = None
+
+def get_client():
+    """Get the shared SendFox API client."""
+    global _client
+    if _client is None:
+        _client = create_client(SENDFOX_API_KEY, SENDFOX_API_URL, transport=get_transport())
+    return _client
+
+def get_cache():
+    """Get the shared SendFox read cache."""
+    global _cache
+    if _cache is None:
+        _cache = SendFoxCache(get_client(), ttls={
+            "lists": SENDFOX_LISTS_TTL,
+            "campaign": SENDFOX_STATS_TTL,
+            "stats": SENDFOX_STATS_TTL
+        })
+    return _cache
+
 @mcp.tool()
 async def create_email_campaign(name: str, subject: str, content: str, list_ids: list) -> str:
     """Create a new email campaign in Sendfox.
@@ -107,6 +141,7 @@ async def schedule_email_campaign(campaign_id: str, schedule_time: str) -> str:
                 json=payload
             )
             response.raise_for_status()
+            get_cache().invalidate("campaign", campaign_id)
             return json.dumps(response.json())
         except Exception as e:
             error_message = f"Error scheduling campaign: {str(e)}"
@@ -128,32 +163,25 @@ async def schedule_email_campaign(campaign_id: str, schedule_time: str) -> str:
 async def get_campaign_stats(campaign_id: str) -> str:
     """Get statistics for a Sendfox campaign.
 
+    Stats are cached briefly while a campaign is still to send, and kept
+    for good once it has sent.
+
     Args:
         campaign_id: ID of the campaign
     """
     if SENDFOX_API_KEY == "your_api_key_here":
         return "Error: Sendfox API key not configured. Please set the SENDFOX_API_KEY environment variable."
 
-    headers = {
-        "Authorization": f"Bearer {SENDFOX_API_KEY}"
-    }
-
     # For demonstration purposes, we'll use the actual API call
     # If you want to use simulated responses, uncomment the code below
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SENDFOX_API_URL}/campaigns/{campaign_id}/stats",
-                headers=headers
-            )
-            response.raise_for_status()
-            return json.dumps(response.json())
-        except Exception as e:
-            error_message = f"Error getting campaign stats: {str(e)}"
-            if hasattr(e, 'response') and e.response is not None:
-                error_message += f"\nResponse: {e.response.text}"
-            return error_message
+    try:
+        return json.dumps(await get_cache().get_campaign_stats(campaign_id))
+    except Exception as e:
+        error_message = f"Error getting campaign stats: {str(e)}"
+        if hasattr(e, 'response') and e.response is not None:
+            error_message += f"\nResponse: {e.response.text}"
+        return error_message
 
     """
     # Simulated response
@@ -173,32 +201,25 @@ async def get_campaign_stats(campaign_id: str) -> str:
 async def list_email_lists() -> str:
     """Get all email lists from Sendfox.
 
+    Every page of lists is fetched; the result is cached for SENDFOX_LISTS_TTL seconds.
+
     Returns:
         List of email lists with IDs and subscriber counts
     """
     if SENDFOX_API_KEY == "your_api_key_here":
         return "Error: Sendfox API key not configured. Please set the SENDFOX_API_KEY environment variable."
 
-    headers = {
-        "Authorization": f"Bearer {SENDFOX_API_KEY}"
-    }
-
     # For demonstration purposes, we'll use the actual API call
     # If you want to use simulated responses, uncomment the code below
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{SENDFOX_API_URL}/lists",
-                headers=headers
-            )
-            response.raise_for_status()
-            return json.dumps(response.json())
-        except Exception as e:
-            error_message = f"Error listing email lists: {str(e)}"
-            if hasattr(e, 'response') and e.response is not None:
-                error_message += f"\nResponse: {e.response.text}"
-            return error_message
+    try:
+        lists = await get_cache().get_lists()
+        return json.dumps({"data": lists, "total": len(lists)})
+    except Exception as e:
+        error_message = f"Error listing email lists: {str(e)}"
+        if hasattr(e, 'response') and e.response is not None:
+            error_message += f"\nResponse: {e.response.text}"
+        return error_message
 
     """
     # Simulated response
@@ -240,11 +261,6 @@ async def create_contact(email: str, first_name: str = "", last_name: str = "",
     if SENDFOX_API_KEY == "your_api_key_here":
         return "Error: Sendfox API key not configured. Please set the SENDFOX_API_KEY environment variable."
 
-    headers = {
-        "Authorization": f"Bearer {SENDFOX_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
     payload = {
         "email": email,
         "first_name": first_name,
@@ -254,25 +270,46 @@ async def create_contact(email: str, first_name: str = "", last_name: str = "",
     if lists:
         payload["lists"] = lists
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SENDFOX_API_URL}/contacts",
-                headers=headers,
-                json=payload
-            )
+    try:
+        response = await get_client().post("/contacts", json=payload)
 
-            # Note: 422 might mean the contact already exists, which is fine
-            if response.status_code == 422:
-                return "Contact already exists (422 error). This is expected if the contact was already added."
+        # Note: 422 might mean the contact already exists, which is fine
+        if response.status_code == 422:
+            return "Contact already exists (422 error). This is expected if the contact was already added."
 
-            response.raise_for_status()
-            return json.dumps(response.json())
-        except Exception as e:
-            error_message = f"Error creating contact: {str(e)}"
-            if hasattr(e, 'response') and e.response is not None:
-                error_message += f"\nResponse: {e.response.text}"
-            return error_message
+        response.raise_for_status()
+        get_cache().invalidate("lists")
+        return json.dumps(response.json())
+    except Exception as e:
+        error_message = f"Error creating contact: {str(e)}"
+        if hasattr(e, 'response') and e.response is not None:
+            error_message += f"\nResponse: {e.response.text}"
+        return error_message
+
+@mcp.tool()
+async def sync_contacts(list_ids: list = None, refresh: bool = False, dry_run: bool = False) -> str:
+    """Sync the BLKOUT NXT member list to SendFox contacts.
+
+    Only members that are new or changed since the last sync are pushed;
+    unsubscribed members are unsubscribed in SendFox.
+
+    Args:
+        list_ids: List IDs to add new contacts to (optional)
+        refresh: Re-read all contacts from SendFox before diffing (optional)
+        dry_run: Only report how many contacts would be pushed (optional)
+
+    Returns:
+        JSON summary of the sync
+    """
+    if SENDFOX_API_KEY == "your_api_key_here":
+        return "Error: Sendfox API key not configured. Please set the SENDFOX_API_KEY environment variable."
+
+    members = load_members(MEMBERS_FILE)
+    sync = ContactSync(get_client(), SENDFOX_SYNC_STATE, list_ids=list_ids)
+    result = await sync.sync(members, refresh=refresh, dry_run=dry_run)
+    if result.get("pushed") or result.get("unsubscribed"):
+        get_cache().invalidate("lists")
+    return json.dumps(result)
 
 if __name__ == "__main__":
     # Initialize and run the server
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# The shared fake API server and the backend's member store live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[4]))
+
+from contact_sync import ContactSync, TokenBucket, create_client, load_members
+from fake_http_server import FakeJSONHandler, start_fake_server
+
+PAGE_SIZE = 2
+
+
+class FakeSendFoxHandler(FakeJSONHandler):
+    """A minimal stand-in for the SendFox contacts API, backed by an in-memory dict.
+
+    POSTs for emails in server.failing answer 500. Each POST notes how many
+    contacts the sync's state file held at that moment, in server.saved.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        contacts = list(self.server.contacts.values())
+        if "email" in query:
+            self.record(f"{url.path}?email")
+            self.reply({"data": [contact for contact in contacts if contact["email"] == query["email"][0]]})
+            return
+
+        self.record(url.path)
+        page = int(query.get("page", ["1"])[0])
+        last_page = max(1, -(-len(contacts) // PAGE_SIZE))
+        self.reply({
+            "current_page": page,
+            "last_page": last_page,
+            "data": contacts[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        })
+
+    def do_POST(self):
+        self.record("/contacts")
+        contact = self.body()
+        if os.path.exists(self.server.state_path):
+            with open(self.server.state_path) as f:
+                self.server.saved.append(len(json.load(f)["contacts"]))
+        if contact["email"] in self.server.failing:
+            self.reply({"message": "Server Error"}, status=500)
+            return
+        if contact["email"] in self.server.contacts:
+            self.reply({"message": "The email has already been taken."}, status=422)
+            return
+        contact["id"] = len(self.server.contacts) + 1
+        contact["unsubscribed_at"] = None
+        self.server.contacts[contact["email"]] = contact
+        self.reply(contact)
+
+    def do_PATCH(self):
+        self.record("/unsubscribe")
+        contact = self.server.contacts[self.body()["email"]]
+        contact["unsubscribed_at"] = "2025-05-01T00:00:00Z"
+        self.reply(contact)
+
+
+def fake_sendfox(data_dir, contacts=1):
+    """Start a fake SendFox holding existing contacts, with the sync's state file in data_dir."""
+    existing = {}
+    for i in range(contacts):
+        email = f"existing{i}@example.com"
+        existing[email] = {"id": i + 1, "email": email, "first_name": "Existing", "last_name": f"Member{i}",
+                           "unsubscribed_at": None}
+    return start_fake_server(FakeSendFoxHandler, contacts=existing, failing=set(), saved=[],
+                             state_path=os.path.join(data_dir, "sendfox_sync_state.json"))
+
+
+def new_members(count, start=0):
+    return [{"name": f"Member {i}", "email": f"member{i}@example.com", "status": "new"}
+            for i in range(start, start + count)]
+
+
+def run_sync(server, members, refresh=False, **options):
+    """Run one sync against the fake, as a fresh process would (state loaded from disk)."""
+    options = {"concurrency": 3, "rate": 100, **options}
+
+    async def run():
+        async with create_client("test-key", server.base_url) as client:
+            return await ContactSync(client, server.state_path, **options).sync(members, refresh=refresh)
+    return asyncio.run(run())
+
+
+def test_snapshot_pages():
+    """The contact snapshot is read page by page on the first run, and not again until a refresh."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = fake_sendfox(data_dir, contacts=3)
+        try:
+            members = [{"name": "Existing Member0", "email": "existing0@example.com", "status": "welcomed"}]
+            result = run_sync(server, members + new_members(2))
+            assert result["pushed"] == 2
+            assert server.calls == ["GET /contacts", "GET /contacts", "POST /contacts", "POST /contacts"]
+
+            server.calls.clear()
+            assert run_sync(server, members + new_members(2))["pushed"] == 0 and server.calls == []
+            run_sync(server, members + new_members(2), refresh=True)
+            assert server.calls == ["GET /contacts"] * 3
+        finally:
+            server.shutdown()
+
+
+def test_unsubscribe():
+    """Opted-out members are unsubscribed in SendFox, unless SendFox never had them."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = fake_sendfox(data_dir)
+        try:
+            members = new_members(2)
+            run_sync(server, members)
+            server.calls.clear()
+
+            members[1]["status"] = "unsubscribed"
+            members.append({"name": "Never Added", "email": "never@example.com", "status": "unsubscribed"})
+            result = run_sync(server, members)
+            assert result["unsubscribed"] == 1 and server.calls == ["PATCH /unsubscribe"]
+            assert server.contacts["member1@example.com"]["unsubscribed_at"]
+        finally:
+            server.shutdown()
+
+
+def test_conflict_is_skipped_until_the_member_changes():
+    """A contact SendFox already holds with other details is recorded as a conflict and not pushed again."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = fake_sendfox(data_dir)
+        try:
+            members = new_members(1)
+            run_sync(server, members)
+            # Added to SendFox by someone else after the snapshot, under an older name
+            server.contacts["late@example.com"] = {"id": 9, "email": "late@example.com", "first_name": "Old",
+                                                   "last_name": "Name", "unsubscribed_at": None}
+            members.append({"name": "Late Member", "email": "late@example.com", "status": "new"})
+            server.calls.clear()
+
+            result = run_sync(server, members)
+            assert result["pushed"] == 0 and result["conflicts"] == 1
+            assert server.calls == ["POST /contacts", "GET /contacts?email"]
+
+            # Nothing changed locally: the conflict costs no calls
+            server.calls.clear()
+            assert run_sync(server, members)["conflicts"] == 0 and server.calls == []
+
+            # The member changed, so it is tried again
+            members[1]["name"] = "Later Member"
+            assert run_sync(server, members)["conflicts"] == 1 and server.calls[0] == "POST /contacts"
+
+            # A refresh sees SendFox was fixed to match, and forgets the conflict
+            server.contacts["late@example.com"].update(first_name="Later", last_name="Member")
+            server.calls.clear()
+            assert run_sync(server, members, refresh=True)["conflicts"] == 0
+            assert "POST /contacts" not in server.calls
+        finally:
+            server.shutdown()
+
+
+def test_token_bucket_pacing():
+    """Calls burst up to the bucket's capacity, then are spaced at the refill rate."""
+    async def acquire_all(bucket, count):
+        started = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(acquire_all(TokenBucket(rate=20, capacity=3), 3)) < 0.05
+    assert asyncio.run(acquire_all(TokenBucket(rate=20, capacity=3), 7)) >= 0.19
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = fake_sendfox(data_dir)
+        try:
+            run_sync(server, [])
+            started = time.monotonic()
+            result = run_sync(server, new_members(6), concurrency=2, rate=20)
+            assert result["pushed"] == 6 and time.monotonic() - started >= 0.19
+        finally:
+            server.shutdown()
+
+
+def test_checkpoint_resume():
+    """Progress is saved every checkpoint_every pushes, and a rerun pushes only what did not go through."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        server = fake_sendfox(data_dir, contacts=0)
+        try:
+            members = new_members(6)
+            server.failing = {"member4@example.com", "member5@example.com"}
+            result = run_sync(server, members, concurrency=1, checkpoint_every=2)
+            assert result["pushed"] == 4 and result["failed"] == 2
+            # The state file grew by two contacts every two pushes, not only at the end
+            assert server.saved == [0, 0, 2, 2, 4, 4]
+
+            server.failing = set()
+            server.calls.clear()
+            result = run_sync(server, members, concurrency=1, checkpoint_every=2)
+            assert result["pushed"] == 2 and server.calls == ["POST /contacts", "POST /contacts"]
+            assert sorted(server.contacts) == [member["email"] for member in members]
+        finally:
+            server.shutdown()
+
+
+def test_load_members():
+    """Members are read from the backend's member store."""
+    from member_manager import MemberManager
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        members_file = os.path.join(data_dir, "members.json")
+        MemberManager(file_path=members_file).add_member("Member One", "one@example.com", "Ally")
+        members = load_members(members_file)
+        assert [(member["name"], member["email"], member["status"]) for member in members] == [
+            ("Member One", "one@example.com", "new")
+        ]
+
+
+if __name__ == "__main__":
+    test_snapshot_pages()
+    test_unsubscribe()
+    test_conflict_is_skipped_until_the_member_changes()
+    test_token_bucket_pacing()
+    test_checkpoint_resume()
+    test_load_members()
+    print("Contact sync tests passed")
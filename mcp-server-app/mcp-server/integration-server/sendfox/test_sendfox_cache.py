@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+
+from sendfox_cache import SendFoxCache
+
+LISTS = [{"id": i, "name": f"List {i}"} for i in range(1, 6)]
+CAMPAIGNS = {
+    "1": {"id": 1, "name": "Welcome", "sent_at": "2025-05-01T09:00:00Z"},
+    "2": {"id": 2, "name": "Launch", "sent_at": None}
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_sendfox(calls):
+    """A MockTransport answering /lists two rows per page, and campaigns with their stats."""
+
+    async def handler(request):
+        calls.append(f"{request.url.path}?{request.url.query.decode()}".rstrip("?"))
+        await asyncio.sleep(0.01)
+        parts = request.url.path.strip("/").split("/")
+        if parts == ["lists"]:
+            page = int(request.url.params.get("page", "1"))
+            return httpx.Response(200, json={
+                "current_page": page,
+                "last_page": 3,
+                "data": LISTS[(page - 1) * 2:page * 2]
+            })
+        if parts[0] == "campaigns" and len(parts) == 2:
+            return httpx.Response(200, json=CAMPAIGNS[parts[1]])
+        if parts[0] == "campaigns" and parts[2:] == ["stats"]:
+            return httpx.Response(200, json={"id": int(parts[1]), "opened": 10})
+        return httpx.Response(404, json={"message": "Not found"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_sendfox_cache():
+    """Lists are read in full, concurrent reads share one request, and sent campaign stats never expire."""
+    calls = []
+    clock = FakeClock()
+
+    async def run():
+        async with httpx.AsyncClient(base_url="https://sendfox.test", transport=fake_sendfox(calls)) as client:
+            cache = SendFoxCache(client, ttls={"lists": 300, "campaign": 60, "stats": 60}, clock=clock)
+
+            # Five concurrent callers: one paginated read of all three pages
+            results = await asyncio.gather(*(cache.get_lists() for _ in range(5)))
+            assert all(result == LISTS for result in results)
+            assert calls == ["/lists?page=1", "/lists?page=2", "/lists?page=3"]
+
+            # Fresh: served from the cache; expired: read again
+            await cache.get_lists()
+            assert len(calls) == 3
+            clock.now = 301
+            await cache.get_lists()
+            assert len(calls) == 6
+
+            # A sent campaign's stats are fetched once and kept
+            calls.clear()
+            await cache.get_campaign_stats(1)
+            clock.now += 10_000
+            await cache.get_campaign_stats(1)
+            assert calls == ["/campaigns/1", "/campaigns/1/stats"]
+
+            # An unsent campaign's stats expire with the stats TTL
+            calls.clear()
+            await cache.get_campaign_stats(2)
+            clock.now += 61
+            await cache.get_campaign_stats(2)
+            assert calls == ["/campaigns/2", "/campaigns/2/stats"] * 2
+
+            # Invalidating one campaign forces only that campaign to be re-read
+            calls.clear()
+            cache.invalidate("campaign", 2)
+            await cache.get_campaign_stats(2)
+            await cache.get_campaign_stats(1)
+            assert calls == ["/campaigns/2"]
+
+    asyncio.run(run())
+    print("SendFox cache test passed")
+
+
+if __name__ == "__main__":
+    test_sendfox_cache()
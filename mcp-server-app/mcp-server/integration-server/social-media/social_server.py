@@ -1,5 +1,4 @@
 from mcp.server.fastmcp import FastMCP
-import httpx
 import json
 import os
 from datetime import datetime
@@ -11,6 +10,8 @@ parent_dir = str(Path(__file__).resolve().parents[3])
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
+from social_analytics import get_store
+
 # Initialize FastMCP server
 mcp = FastMCP("social-media-integration")
 
@@ -58,75 +59,77 @@ async def social_content_schedule(platform: str, content: str, media_urls: list
         "message": f"Content {'scheduled' if schedule_time else 'posted'} successfully on {platform.capitalize()} (simulated)"
     })
 
+@mcp.tool()
+async def social_record_engagement(events: list) -> str:
+    """Record engagement for published posts in the local analytics store.
+
+    Each event gives a post's current totals, as the platform reports them;
+    only the change since the post was last recorded is added to the daily
+    rollups, so the same numbers can safely be recorded twice.
+
+    Args:
+        events: Events like {"platform": "instagram", "post_id": "123", "likes": 40, "comments": 5,
+            "shares": 3, "reach": 900, "impressions": 1200, "posted_at": "2025-05-01T18:00:00Z",
+            "content": "..."}; posted_at, observed_at (default now) and content are optional
+    """
+    for event in events:
+        if str(event.get("platform", "")).lower() not in SOCIAL_API_KEYS:
+            return f"Error: Unsupported platform '{event.get('platform')}'. Supported platforms: {', '.join(SOCIAL_API_KEYS.keys())}"
+        if not event.get("post_id"):
+            return "Error: Every event needs a post_id."
+
+    try:
+        recorded = get_store().ingest(events)
+    except (ValueError, TypeError) as e:
+        return f"Error recording engagement: {str(e)}"
+    return json.dumps({"recorded": recorded, "message": f"Recorded engagement for {recorded} posts"})
+
 @mcp.tool()
 async def social_campaign_analytics(platform: str = None, timeframe: str = "7d") -> str:
     """Get analytics for social media campaign.
-    
+
+    Answered from the daily rollups of the local analytics store, which
+    social_record_engagement keeps up to date.
+
     Args:
         platform: Optional specific platform (all platforms if None)
-        timeframe: Time period for analytics (1d, 7d, 30d, etc.)
+        timeframe: Time period for analytics in days (1d, 7d, 30d, etc.)
     """
     if platform and platform.lower() not in SOCIAL_API_KEYS:
         return f"Error: Unsupported platform '{platform}'. Supported platforms: {', '.join(SOCIAL_API_KEYS.keys())}"
-    
-    if platform and SOCIAL_API_KEYS[platform.lower()] == f"your_{platform.lower()}_api_key_here":
-        return f"Error: {platform.capitalize()} API key not configured. Please set the {platform.upper()}_API_KEY environment variable."
-    
-    # For demonstration purposes, we'll simulate the API call
-    # In production, implement the actual API calls for each platform
-    
-    # Simulated response
+
+    try:
+        summary = get_store().summary(platform, timeframe)
+    except ValueError as e:
+        return f"Error getting analytics: {str(e)}"
+
     if platform:
+        totals = summary["platforms"][platform.lower()]
         return json.dumps({
             "platform": platform.lower(),
             "timeframe": timeframe,
-            "total_posts": 15,
-            "total_engagement": 2500,
-            "likes": 1500,
-            "comments": 250,
-            "shares": 750,
-            "reach": 25000,
-            "impressions": 35000,
-            "top_posts": [
-                {"id": "post_1", "engagement": 500, "content": "The Signal: We're Here..."},
-                {"id": "post_2", "engagement": 350, "content": "Join us for our weekly..."},
-                {"id": "post_3", "engagement": 300, "content": "BLKOUT NEXT: Community..."}
-            ],
-            "message": f"{platform.capitalize()} analytics retrieved successfully (simulated)"
+            "total_posts": totals["total_posts"],
+            "total_engagement": totals["total_engagement"],
+            "likes": totals["total_likes"],
+            "comments": totals["total_comments"],
+            "shares": totals["total_shares"],
+            "reach": totals["total_reach"],
+            "impressions": totals["total_impressions"],
+            "top_posts": totals["top_posts"]
         })
     else:
         return json.dumps({
             "timeframe": timeframe,
             "platforms": {
-                "instagram": {
-                    "total_posts": 15,
-                    "total_engagement": 2500,
-                    "reach": 25000
-                },
-                "facebook": {
-                    "total_posts": 12,
-                    "total_engagement": 1800,
-                    "reach": 20000
-                },
-                "twitter": {
-                    "total_posts": 25,
-                    "total_engagement": 1200,
-                    "reach": 15000
-                },
-                "linkedin": {
-                    "total_posts": 8,
-                    "total_engagement": 900,
-                    "reach": 8000
-                },
-                "youtube": {
-                    "total_posts": 3,
-                    "total_engagement": 1500,
-                    "reach": 5000
+                name: {
+                    "total_posts": totals["total_posts"],
+                    "total_engagement": totals["total_engagement"],
+                    "reach": totals["total_reach"]
                 }
+                for name, totals in summary["platforms"].items()
             },
-            "total_reach": 73000,
-            "total_engagement": 7900,
-            "message": "Social media analytics retrieved successfully (simulated)"
+            "total_reach": summary["total_reach"],
+            "total_engagement": summary["total_engagement"]
         })
 
 @mcp.tool()
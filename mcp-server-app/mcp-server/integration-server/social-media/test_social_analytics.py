@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+# social_analytics lives in mcp-server-app, shared with the campaign server
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+
+from social_analytics import SocialAnalytics
+
+
+def test_incremental_rollups():
+    """Running totals become daily deltas, re-ingesting is harmless, and timeframes read the rollups."""
+    store = SocialAnalytics(":memory:")
+    store.ingest([
+        {"platform": "Instagram", "post_id": "p1", "likes": 10, "comments": 2, "reach": 100,
+         "posted_at": "2025-05-01T18:00:00Z", "observed_at": "2025-05-01T20:00:00Z", "content": "The Signal: We're Here"},
+        {"platform": "twitter", "post_id": "t1", "likes": 5, "shares": 5, "reach": 50,
+         "posted_at": "2025-05-08T09:00:00Z", "observed_at": "2025-05-08T10:00:00Z"}
+    ])
+    # A week later p1 has grown; the same t1 numbers again add nothing
+    store.ingest([
+        {"platform": "instagram", "post_id": "p1", "likes": 30, "comments": 2, "reach": 400,
+         "observed_at": "2025-05-08T20:00:00Z"},
+        {"platform": "twitter", "post_id": "t1", "likes": 5, "shares": 5, "reach": 50,
+         "observed_at": "2025-05-08T21:00:00Z"}
+    ])
+
+    all_time = store.summary()
+    assert all_time["total_posts"] == 2 and all_time["total_engagement"] == 42 and all_time["total_reach"] == 450
+
+    # Only the growth observed on 2025-05-08 falls in the last day; p1 was posted before it
+    day = store.summary("instagram", "1d", today="2025-05-08T23:00:00Z")
+    instagram = day["platforms"]["instagram"]
+    assert instagram["total_posts"] == 0 and instagram["total_likes"] == 20 and instagram["total_reach"] == 300
+    assert instagram["top_posts"] == []
+
+    week = store.summary(timeframe="8d", today="2025-05-08T23:00:00Z")
+    assert week["platforms"]["instagram"]["total_engagement"] == 32 and week["platforms"]["twitter"]["total_posts"] == 1
+    top = store.summary("instagram", "30d", today="2025-05-08T23:00:00Z")["platforms"]["instagram"]["top_posts"]
+    assert top == [{"id": "p1", "engagement": 32, "content": "The Signal: We're Here"}]
+
+    # Platforms with nothing recorded report zeros
+    assert store.summary("youtube", "7d")["platforms"]["youtube"]["total_posts"] == 0
+    store.close()
+
+
+if __name__ == "__main__":
+    test_incremental_rollups()
+    print("Social analytics tests passed")
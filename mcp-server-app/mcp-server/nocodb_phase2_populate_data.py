@@ -1,10 +1,9 @@
-import requests
-import json
+import logging
 import os
-import time
 from dotenv import load_dotenv
 from pathlib import Path
 from datetime import datetime, timedelta
+from nocodb_seed import NocoDBSeeder
 
 # Load environment variables from .env file
 env_path = Path(__file__).resolve().parent / "config" / ".env"
@@ -16,30 +15,8 @@ NOCODB_API_TOKEN = os.getenv("NOCODB_API_TOKEN")
 NOCODB_WORKSPACE_ID = os.getenv("NOCODB_WORKSPACE_ID")
 NOCODB_PROJECT_ID = os.getenv("NOCODB_PROJECT_ID")
 
-# Common headers for all requests
-headers = {
-    "xc-token": NOCODB_API_TOKEN,
-    "Content-Type": "application/json"
-}
-
-def add_record(table_name, data):
-    """Add a record to a table"""
-    url = f"{NOCODB_API_URL}/db/data/noco/{NOCODB_WORKSPACE_ID}/{NOCODB_PROJECT_ID}/{table_name}"
-
-    print(f"Adding record to {table_name} with URL: {url}")
-    print(f"Data: {data}")
-
-    try:
-        response = requests.post(url, headers=headers, json=data)
-        print(f"Response status code: {response.status_code}")
-        print(f"Response text: {response.text[:100]}...")  # Print just the beginning of the response
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Error adding record to {table_name}: {str(e)}")
-        if hasattr(response, 'text'):
-            print(f"Response: {response.text[:200]}...")  # Print just the beginning of the response
-        return None
+# One pooled, rate-limit aware client for all tables
+seeder = NocoDBSeeder(NOCODB_API_URL, NOCODB_API_TOKEN, NOCODB_PROJECT_ID)
 
 # Populate Campaign Phases table
 def populate_campaign_phases():
@@ -107,11 +84,9 @@ def populate_campaign_phases():
         }
     ]
 
-    for phase in phases:
-        result = add_record("Campaign_Phases", phase)
-        if result:
-            print(f"Added phase: {phase['Name']}")
-        time.sleep(0.5)  # Small delay to avoid rate limiting
+    # Rows are matched on PhaseID, so re-running updates instead of duplicating
+    result = seeder.upsert_records("Campaign_Phases", phases, key="PhaseID")
+    print(f"Campaign Phases: {result['inserted']} added, {result['updated']} updated, {result['unchanged']} unchanged")
 
 # Populate Campaign Metrics table
 def populate_campaign_metrics():
@@ -147,11 +122,9 @@ def populate_campaign_metrics():
         }
     ]
 
-    for metric in metrics:
-        result = add_record("Campaign_Metrics", metric)
-        if result:
-            print(f"Added metric: {metric['Name']}")
-        time.sleep(0.5)  # Small delay to avoid rate limiting
+    # Rows are matched on MetricID, so re-running updates instead of duplicating
+    result = seeder.upsert_records("Campaign_Metrics", metrics, key="MetricID")
+    print(f"Campaign Metrics: {result['inserted']} added, {result['updated']} updated, {result['unchanged']} unchanged")
 
 # Populate Action Items table
 def populate_action_items():
@@ -248,11 +221,9 @@ def populate_action_items():
         }
     ]
 
-    for item in action_items:
-        result = add_record("Action_Items", item)
-        if result:
-            print(f"Added action item: {item['Description']}")
-        time.sleep(0.5)  # Small delay to avoid rate limiting
+    # Rows are matched on ItemID, so re-running updates instead of duplicating
+    result = seeder.upsert_records("Action_Items", action_items, key="ItemID")
+    print(f"Action Items: {result['inserted']} added, {result['updated']} updated, {result['unchanged']} unchanged")
 
 # Populate Events Calendar table
 def populate_events_calendar():
@@ -292,11 +263,9 @@ def populate_events_calendar():
         }
     ]
 
-    for event in events:
-        result = add_record("Events_Calendar", event)
-        if result:
-            print(f"Added event: {event['Title']}")
-        time.sleep(0.5)  # Small delay to avoid rate limiting
+    # Rows are matched on EventID, so re-running updates instead of duplicating
+    result = seeder.upsert_records("Events_Calendar", events, key="EventID")
+    print(f"Events Calendar: {result['inserted']} added, {result['updated']} updated, {result['unchanged']} unchanged")
 
 # Populate all tables
 def populate_database():
@@ -306,20 +275,15 @@ def populate_database():
 
     # Populate tables
     populate_campaign_phases()
-    time.sleep(1)
-
     populate_campaign_metrics()
-    time.sleep(1)
-
     populate_action_items()
-    time.sleep(1)
-
     populate_events_calendar()
 
     print("\nDatabase population completed successfully!")
 
 # Run the script
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     print("Script started")
     print(f"NOCODB_API_URL: {NOCODB_API_URL}")
     print(f"NOCODB_API_TOKEN: {NOCODB_API_TOKEN[:5]}...")
@@ -0,0 +1,198 @@
+import logging
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+# Safe to repeat after a server error; a bulk POST may have committed some rows before failing
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+
+class NocoDBSeeder:
+    """Create NocoDB tables and seed their rows idempotently.
+
+    All calls go through one pooled session. Requests are paced by an
+    adaptive delay: a 429 response waits out its Retry-After header and
+    doubles the delay between calls, and each success shrinks it again, so
+    the seeder runs as fast as the server allows instead of sleeping a fixed
+    amount per row. Rows are written with the bulk endpoints, and rows that
+    already exist (matched on a key column) are updated rather than duplicated.
+    Writes are only retried when NocoDB cannot have applied them: after a
+    429, or a connection error before the request was sent.
+    """
+
+    def __init__(self, api_url, api_token, project_id, session=None, chunk_size=100,
+                 max_retries=5, max_delay=10.0):
+        self.api_url = api_url.rstrip("/")
+        self.project_id = project_id
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.max_delay = max_delay
+
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        session.headers.update({"xc-token": api_token, "Content-Type": "application/json"})
+        self.session = session
+
+        self._delay = 0.0
+        self._last_request = 0.0
+        self._tables = None
+
+    def ensure_table(self, table_name, title, columns):
+        """Create a table with its columns if it is missing, or add the columns an existing table lacks.
+
+        columns is a list of (column_name, uidt) or (column_name, uidt, options)
+        tuples. A new table is created with every column in one call. Returns
+        the table ID.
+        """
+        table = self._get_tables().get(table_name)
+        if table is None:
+            table = self._request("POST", f"/db/meta/projects/{self.project_id}/tables", json={
+                "table_name": table_name,
+                "title": title or table_name,
+                "columns": [self._column_payload(column) for column in columns]
+            })
+            self._tables[table_name] = table
+            logger.info(f"Created table {table_name} ({table['id']}) with {len(columns)} columns")
+            return table["id"]
+
+        meta = self._request("GET", f"/db/meta/tables/{table['id']}")
+        existing = {column.get("column_name") for column in meta.get("columns", [])}
+
+        added = 0
+        for column in columns:
+            if column[0] in existing:
+                continue
+            self._request("POST", f"/db/meta/tables/{table['id']}/columns", json=self._column_payload(column))
+            added += 1
+
+        logger.info(f"Table {table_name}: {added} columns added, {len(columns) - added} already present")
+        return table["id"]
+
+    def upsert_records(self, table_name, records, key):
+        """Insert new records and update changed ones, matching rows on the key column.
+
+        Returns a summary dict with the number of rows inserted, updated and unchanged.
+        """
+        existing = {row.get(key): row for row in self.list_records(table_name)}
+
+        inserts = []
+        updates = []
+        for record in records:
+            row = existing.get(record[key])
+            if row is None:
+                inserts.append(record)
+            elif any(row.get(field) != value for field, value in record.items()):
+                updates.append({"Id": row.get("Id") or row.get("id"), **record})
+
+        bulk_path = f"/db/data/bulk/noco/{self.project_id}/{table_name}"
+        for start in range(0, len(inserts), self.chunk_size):
+            self._request("POST", bulk_path, json=inserts[start:start + self.chunk_size])
+        for start in range(0, len(updates), self.chunk_size):
+            self._request("PATCH", bulk_path, json=updates[start:start + self.chunk_size])
+
+        summary = {
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "unchanged": len(records) - len(inserts) - len(updates)
+        }
+        logger.info(f"Table {table_name}: {summary}")
+        return summary
+
+    def list_records(self, table_name, page_size=1000):
+        """Get every row of a table, following pageInfo."""
+        rows = []
+        offset = 0
+        while True:
+            data = self._request("GET", f"/db/data/noco/{self.project_id}/{table_name}",
+                                 params={"limit": page_size, "offset": offset})
+            page = data.get("list", [])
+            rows.extend(page)
+            if data.get("pageInfo", {}).get("isLastPage", True) or len(page) < page_size:
+                return rows
+            offset += len(page)
+
+    @staticmethod
+    def _column_payload(column):
+        """The NocoDB column definition for a (column_name, uidt[, options]) tuple."""
+        column_name, uidt, *options = column
+        payload = {"column_name": column_name, "title": column_name, "uidt": uidt}
+        if options:
+            payload.update(options[0])
+        return payload
+
+    def _get_tables(self):
+        """Get the project's tables by name, listing them once."""
+        if self._tables is None:
+            data = self._request("GET", f"/db/meta/projects/{self.project_id}/tables")
+            self._tables = {table.get("table_name"): table for table in data.get("list", [])}
+        return self._tables
+
+    def _request(self, method, path, **kwargs):
+        """Call the NocoDB API, pacing requests and retrying rate-limited or failed calls.
+
+        Server errors and connection errors after the request went out are
+        only retried for idempotent methods.
+        """
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            wait = self._last_request + self._delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
+            try:
+                response = self.session.request(method, f"{self.api_url}{path}", timeout=30, **kwargs)
+            except requests.ConnectionError as e:
+                if attempt == self.max_retries or not (idempotent or self._never_sent(e)):
+                    raise
+                logger.warning(f"Connection error on {method} {path}: {str(e)}; retrying")
+                time.sleep(min(2 ** attempt, self.max_delay))
+                continue
+
+            if response.status_code == 429 or (response.status_code >= 500 and idempotent):
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                if response.status_code == 429:
+                    # Slow down for the rest of the run, not just this call
+                    self._delay = min(max(self._delay * 2, 0.1), self.max_delay)
+                retry_after = self._retry_after(response) or min(2 ** attempt, self.max_delay)
+                logger.warning(f"{method} {path} returned {response.status_code}; retrying in {retry_after:.1f}s")
+                time.sleep(retry_after)
+                continue
+
+            response.raise_for_status()
+            self._delay *= 0.8
+            return response.json() if response.content else {}
+
+    @staticmethod
+    def _never_sent(error):
+        """True if a connection error happened before the request reached NocoDB."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    @staticmethod
+    def _retry_after(response):
+        """Seconds to wait from a Retry-After header (None if absent or not a number)."""
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return None
+
+
+# Run the table setup and the seed data in one go
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    from nocodb_phase1_create_tables import create_all_tables
+    from nocodb_phase2_populate_data import populate_database
+
+    create_all_tables()
+    populate_database()
@@ -1,12 +1,19 @@
-import subprocess
-import os
+import argparse
+import asyncio
+import json
+import logging
+import signal
 import sys
 import time
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 # Get the current directory
 CURRENT_DIR = Path(__file__).resolve().parent
 
+# Where each server's stdout/stderr is written, one rotating log per server
+LOG_DIR = CURRENT_DIR / "logs"
+
 # Define the servers to start
 SERVERS = [
     {
@@ -35,62 +42,271 @@ SERVERS = [
     }
 ]
 
-def start_server(server):
-    """Start an individual MCP server"""
-    server_path = server["path"]
-
-    if not server_path.exists():
-        print(f"Warning: {server['name']} script not found at {server_path}")
-        return None
-
-    print(f"Starting {server['name']}...")
-
-    # Start the server in a new process
-    process = subprocess.Popen(
-        [sys.executable, str(server_path)],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-
-    # Give it a moment to start
-    time.sleep(1)
-
-    # Check if it's still running
-    if process.poll() is None:
-        print(f"{server['name']} started successfully (PID: {process.pid})")
-        return process
-    else:
-        stdout, stderr = process.communicate()
-        print(f"Error starting {server['name']}:")
-        print(f"STDOUT: {stdout}")
-        print(f"STDERR: {stderr}")
-        return None
+# MCP protocol version sent in the health-check handshake
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+# Longest line read from a server; longer output is logged in pieces
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def server_logger(server, log_dir=LOG_DIR, max_bytes=1024 * 1024, backup_count=3):
+    """Create a rotating file logger for one server's output."""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    slug = server["path"].stem
+    handler = RotatingFileHandler(log_dir / f"{slug}.log", maxBytes=max_bytes, backupCount=backup_count)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+    logger = logging.getLogger(f"mcp_supervisor.{slug}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [handler]
+    return logger
+
+
+class ServerProcess:
+    """One supervised MCP server running over stdio.
+
+    Its stdout and stderr are drained continuously into a rotating log,
+    so a chatty server can never block on a full pipe. The server is
+    health-checked with the MCP initialize handshake at startup and a
+    ping request after that; the supervisor keeps its stdin open, so the
+    server stays up until it is stopped.
+    """
+
+    def __init__(self, server, log_dir=LOG_DIR, startup_timeout=15.0, health_interval=30.0,
+                 health_timeout=10.0, backoff=1.0, max_backoff=60.0, stable_after=60.0):
+        self.name = server["name"]
+        self.path = server["path"]
+        self.log = server_logger(server, log_dir)
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.process = None
+        self.restarts = 0
+        self.started = asyncio.Event()
+        self._pending = {}
+        self._next_id = 0
+        self._stopping = False
+
+    async def start(self):
+        """Start the server and wait for it to answer the MCP handshake. Returns True if it did."""
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, str(self.path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=MAX_LINE_BYTES
+        )
+        self.log.info(f"Started {self.name} (PID: {self.process.pid})")
+        self._drains = [
+            asyncio.create_task(self._drain(self.process.stdout, self._handle_stdout)),
+            asyncio.create_task(self._drain(self.process.stderr, self._handle_stderr))
+        ]
+
+        try:
+            await self.request("initialize", {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "blkout-mcp-supervisor", "version": "1.0"}
+            }, timeout=self.startup_timeout)
+            await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        except (asyncio.TimeoutError, ConnectionError, RuntimeError) as e:
+            self.log.error(f"{self.name} did not complete the MCP handshake: {str(e) or type(e).__name__}")
+            await self.stop()
+            return False
+        return True
+
+    async def supervise(self):
+        """Keep the server running: restart it with exponential backoff whenever it exits or stops answering."""
+        failures = 0
+        while not self._stopping:
+            started_at = time.monotonic()
+            healthy = await self.start()
+            if healthy:
+                print(f"{self.name} started successfully (PID: {self.process.pid})")
+                self.started.set()
+                reason = await self._watch()
+            else:
+                reason = f"failed to start (exit code {self.process.returncode})"
+            if self._stopping:
+                break
+
+            # A server that stayed up for a while gets a fresh backoff
+            if time.monotonic() - started_at >= self.stable_after:
+                failures = 0
+            delay = min(self.max_backoff, self.backoff * 2 ** failures)
+            failures += 1
+            self.restarts += 1
+            message = f"{self.name} {reason}; restarting in {delay:.1f}s"
+            print(message)
+            self.log.warning(message)
+            self.started.set()
+            await asyncio.sleep(delay)
+
+    async def request(self, method, params=None, timeout=None):
+        """Send a JSON-RPC request to the server and wait for its result."""
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+            if params is not None:
+                message["params"] = params
+            await self._send(message)
+            response = await asyncio.wait_for(future, timeout or self.health_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in response:
+            raise RuntimeError(f"{method} failed: {response['error'].get('message')}")
+        return response.get("result")
+
+    async def stop(self, timeout=5.0):
+        """Stop the server: close its stdin, then terminate, then kill."""
+        if self.process is None or self.process.returncode is not None:
+            await self._finish_drains()
+            return
+        self.log.info(f"Stopping {self.name}")
+        try:
+            self.process.stdin.close()
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        await self._finish_drains()
+
+    async def shutdown(self):
+        """Stop the server for good."""
+        self._stopping = True
+        await self.stop()
+
+    async def _watch(self):
+        """Ping the server every health_interval seconds. Returns why it went down."""
+        while True:
+            try:
+                await asyncio.wait_for(self.process.wait(), self.health_interval)
+                return f"exited with code {self.process.returncode}"
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.request("ping")
+            except (asyncio.TimeoutError, ConnectionError, RuntimeError) as e:
+                if self._stopping:
+                    return "stopped"
+                await self.stop()
+                return f"failed its health check ({str(e) or type(e).__name__})"
+
+    async def _send(self, message):
+        """Write one JSON-RPC message to the server's stdin."""
+        if self.process.returncode is not None or self.process.stdin.is_closing():
+            raise ConnectionError(f"{self.name} is not running")
+        self.process.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+
+    async def _drain(self, stream, handle):
+        """Read a stream line by line until the process closes it."""
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Line longer than MAX_LINE_BYTES: log what is buffered and carry on
+                line = await stream.read(MAX_LINE_BYTES)
+            if not line:
+                break
+            handle(line.decode("utf-8", errors="replace").rstrip())
+
+        # The process is gone; nobody will answer outstanding requests
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"{self.name} closed its output"))
+
+    def _handle_stdout(self, line):
+        """Route JSON-RPC responses to waiting requests and log everything else."""
+        try:
+            message = json.loads(line)
+        except ValueError:
+            message = None
+        if isinstance(message, dict) and message.get("id") in self._pending:
+            future = self._pending[message["id"]]
+            if not future.done():
+                future.set_result(message)
+            return
+        if line:
+            self.log.info(line)
+
+    def _handle_stderr(self, line):
+        """Log a line of stderr (where the servers send their own logging)."""
+        if line:
+            self.log.info(line)
+
+    async def _finish_drains(self):
+        """Wait for the output readers to reach the end of the streams."""
+        drains = getattr(self, "_drains", [])
+        await asyncio.gather(*drains, return_exceptions=True)
+        self._drains = []
+
+
+async def supervise_all(servers=SERVERS, log_dir=LOG_DIR, **options):
+    """Start every server concurrently and keep them running until cancelled."""
+    supervised = []
+    for server in servers:
+        if not server["path"].exists():
+            print(f"Warning: {server['name']} script not found at {server['path']}")
+            continue
+        print(f"Starting {server['name']}...")
+        supervised.append(ServerProcess(server, log_dir, **options))
+
+    tasks = [asyncio.create_task(process.supervise()) for process in supervised]
+    try:
+        await asyncio.gather(*(process.started.wait() for process in supervised))
+        running = sum(1 for process in supervised if process.process and process.process.returncode is None)
+        print(f"\nStarted {running} out of {len(servers)} servers (logs in {log_dir})")
+        print("\nPress Ctrl+C to stop all servers")
+
+        await asyncio.gather(*tasks)
+    finally:
+        print("\nStopping all servers...")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*(process.shutdown() for process in supervised), return_exceptions=True)
+        print("All servers stopped")
+
 
 def main():
     """Start all MCP servers"""
-    print("Starting BLKOUT MCP Servers...")
+    parser = argparse.ArgumentParser(description="Start and supervise the BLKOUT MCP servers.")
+    parser.add_argument("--log-dir", type=Path, default=LOG_DIR, help="Directory for the per-server logs")
+    parser.add_argument("--health-interval", type=float, default=30.0, help="Seconds between health checks")
+    parser.add_argument("--max-backoff", type=float, default=60.0, help="Longest wait before a restart, in seconds")
+    args = parser.parse_args()
 
-    processes = []
-    for server in SERVERS:
-        process = start_server(server)
-        if process:
-            processes.append((server["name"], process))
+    print("Starting BLKOUT MCP Servers...")
 
-    print(f"\nStarted {len(processes)} out of {len(SERVERS)} servers")
-    print("\nPress Ctrl+C to stop all servers")
+    async def run():
+        task = asyncio.create_task(supervise_all(
+            log_dir=args.log_dir, health_interval=args.health_interval, max_backoff=args.max_backoff
+        ))
+        if sys.platform != "win32":
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
 
     try:
-        # Keep the script running
-        while True:
-            time.sleep(1)
+        asyncio.run(run())
     except KeyboardInterrupt:
-        print("\nStopping all servers...")
-        for name, process in processes:
-            print(f"Stopping {name}...")
-            process.terminate()
-            process.wait()
-        print("All servers stopped")
+        pass
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+import file_search
+import file_server
+from file_server import list_directory, read_file, search_files
+
+
+def test_read_file():
+    """Ranges, the max-bytes cap, mmap reads, split characters and binary files."""
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, "notes.txt")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write("hello world\n")
+
+        # Small files come back whole, exactly as before
+        assert read_file(text_path) == "hello world\n"
+
+        # A range reports where it sits and where to continue
+        assert read_file(text_path, offset=6, length=5) == "world\n[Showing bytes 6-11 of 12; call read_file with offset=11 to continue]"
+        assert read_file(text_path, max_bytes=5).startswith("hello\n[Showing bytes 0-5 of 12")
+        assert read_file(text_path, offset=99).startswith("Offset 99 is past the end")
+
+        # A multi-byte character split by the cap is left for the next read
+        accent_path = os.path.join(directory, "accent.txt")
+        with open(accent_path, "w", encoding="utf-8") as f:
+            f.write("café")
+        first = read_file(accent_path, max_bytes=4)
+        assert first.startswith("caf\n[Showing bytes 0-3 of 5; call read_file with offset=3")
+        assert read_file(accent_path, offset=3).startswith("é\n")
+
+        # Large files are read through mmap
+        large_path = os.path.join(directory, "large.log")
+        line = b"2025-05-01 INFO request handled\n"
+        with open(large_path, "wb") as f:
+            f.write(line * (file_server.MMAP_THRESHOLD // len(line) + 1))
+        content = read_file(large_path, offset=len(line), length=len(line))
+        assert content.startswith(line.decode())
+
+        binary_path = os.path.join(directory, "image.png")
+        with open(binary_path, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+        assert read_file(binary_path).startswith("Binary file:")
+
+
+def test_list_directory():
+    """Entries are sorted and paged, with sizes for files only."""
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(5):
+            with open(os.path.join(directory, f"file{i}.json"), "w") as f:
+                f.write("x" * i)
+        os.mkdir(os.path.join(directory, "backups"))
+
+        listing = list_directory(directory).splitlines()
+        assert listing[0] == "backups (Directory, Size: - bytes)"
+        assert listing[1:] == [f"file{i}.json (File, Size: {i} bytes)" for i in range(5)]
+
+        page = list_directory(directory, offset=2, limit=2).splitlines()
+        assert page == ["file1.json (File, Size: 1 bytes)", "file2.json (File, Size: 2 bytes)",
+                        "[Entries 3-4 of 6; call list_directory with offset=4 for more]"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        assert list_directory(directory) == "Directory is empty"
+
+
+def test_search_files():
+    """Matches stream across chunk boundaries, with context, globs and the trigram index."""
+    with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as index_dir:
+        os.mkdir(os.path.join(directory, "data"))
+        os.mkdir(os.path.join(directory, "logs"))
+        with open(os.path.join(directory, "logs", "app.log"), "w") as f:
+            for i in range(1, 201):
+                f.write(f"line {i} ERROR disk full\n" if i in (50, 150) else f"line {i} ok\n")
+        with open(os.path.join(directory, "data", "members.json"), "w") as f:
+            f.write('{"email": "member@example.com"}\n')
+
+        # Tiny chunks, so lines and matches straddle chunk boundaries
+        chunk_bytes = file_search.CHUNK_BYTES
+        file_search.CHUNK_BYTES = 7
+        try:
+            result = search_files("ERROR", directory, context=1).splitlines()
+        finally:
+            file_search.CHUNK_BYTES = chunk_bytes
+        log_path = os.path.join("logs", "app.log")
+        assert result == [
+            f"{log_path}-49-line 49 ok", f"{log_path}:50:line 50 ERROR disk full", f"{log_path}-51-line 51 ok",
+            "--",
+            f"{log_path}-149-line 149 ok", f"{log_path}:150:line 150 ERROR disk full", f"{log_path}-151-line 151 ok",
+            "2 matches in 1 files (2 searched)"
+        ]
+
+        # Globs, case folding and the result cap
+        assert search_files("error", directory, include=["*.json"], ignore_case=True).startswith("No matches in 1 files")
+        assert search_files("error", directory, exclude=["logs"], ignore_case=True) == "No matches in 1 files"
+        assert search_files("line", directory, max_results=3).splitlines()[-1].endswith("stopped at max_results=3")
+        assert search_files("(", directory).startswith("Invalid pattern")
+
+        # The index narrows the search to files that can contain the literal, and follows edits
+        results, searched, _ = file_search.search(directory, "example\\.com", use_index=True, index_dir=index_dir)
+        assert searched == 1 and results[0][0] == os.path.join("data", "members.json")
+        with open(os.path.join(directory, "logs", "app.log"), "a") as f:
+            f.write("contact admin@example.com\n")
+        results, searched, _ = file_search.search(directory, "example\\.com", use_index=True, index_dir=index_dir)
+        assert searched == 2 and len(results) == 2
+        assert os.listdir(index_dir)
+
+
+if __name__ == "__main__":
+    test_read_file()
+    test_list_directory()
+    test_search_files()
+    print("File server tests passed")
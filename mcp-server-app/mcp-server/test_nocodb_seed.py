@@ -0,0 +1,112 @@
+import socket
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+# The shared fake API server lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fake_http_server import FakeJSONHandler, start_fake_server
+from nocodb_seed import NocoDBSeeder
+
+
+class FakeNocoDBHandler(FakeJSONHandler):
+    """A minimal stand-in for the NocoDB meta and bulk data APIs.
+
+    server.responses maps "METHOD /path" to a list of statuses to answer
+    before succeeding.
+    """
+
+    def _status(self):
+        path = urlparse(self.path).path
+        self.record(path)
+        queued = self.server.responses.get(f"{self.command} {path}")
+        return queued.pop(0) if queued else 200
+
+    def do_GET(self):
+        status = self._status()
+        if "/tables" in self.path and "/meta/projects/" in self.path:
+            self.reply({"list": []}, status=status)
+        else:
+            self.reply({"list": [], "pageInfo": {"isLastPage": True}}, status=status)
+
+    def do_POST(self):
+        status = self._status()
+        body = self.body()
+        if self.path.endswith("/tables"):
+            self.server.created.append(body)
+            self.reply({"id": "tbl_1", "table_name": body["table_name"]}, status=status)
+        else:
+            self.reply([{"Id": i + 1} for i in range(len(body))], status=status)
+
+
+def make_seeder(**responses):
+    server = start_fake_server(FakeNocoDBHandler, responses=responses, created=[])
+    seeder = NocoDBSeeder(f"{server.base_url}/api/v1", "token", "proj_1", max_retries=2, max_delay=0.01)
+    return server, seeder
+
+
+def test_create_table_with_columns():
+    """A missing table is created with all of its columns in a single call."""
+    server, seeder = make_seeder()
+    try:
+        table_id = seeder.ensure_table("Campaign_Phases", "Campaign Phases", [
+            ("PhaseID", "SingleLineText"),
+            ("Status", "SingleSelect", {"dtxp": "'Planned','Active'"})
+        ])
+        assert table_id == "tbl_1"
+        assert server.calls == ["GET /api/v1/db/meta/projects/proj_1/tables",
+                                "POST /api/v1/db/meta/projects/proj_1/tables"]
+        assert server.created[0]["columns"] == [
+            {"column_name": "PhaseID", "title": "PhaseID", "uidt": "SingleLineText"},
+            {"column_name": "Status", "title": "Status", "uidt": "SingleSelect", "dtxp": "'Planned','Active'"}
+        ]
+    finally:
+        server.shutdown()
+
+
+def test_write_retries():
+    """Bulk inserts are retried after a 429 but never after a 5xx, which may have committed rows."""
+    bulk = "POST /api/v1/db/data/bulk/noco/proj_1/Action_Items"
+    server, seeder = make_seeder(**{bulk: [429]})
+    try:
+        seeder.upsert_records("Action_Items", [{"Title": "One"}], key="Title")
+        assert server.calls.count(bulk) == 2
+
+        server.calls.clear()
+        server.responses[bulk] = [502]
+        try:
+            seeder.upsert_records("Action_Items", [{"Title": "Two"}], key="Title")
+            assert False, "a 502 on a bulk insert should not be retried"
+        except requests.HTTPError as e:
+            assert e.response.status_code == 502
+        assert server.calls.count(bulk) == 1
+
+        # Reads are safe to repeat
+        server.calls.clear()
+        server.responses["GET /api/v1/db/data/noco/proj_1/Action_Items"] = [503]
+        assert seeder.list_records("Action_Items") == []
+        assert len(server.calls) == 2
+    finally:
+        server.shutdown()
+
+
+def test_connection_errors():
+    """Only a connection that was never made counts as unsent, so a write can be retried."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    try:
+        requests.post(f"http://127.0.0.1:{port}/", timeout=1)
+    except requests.ConnectionError as e:
+        assert NocoDBSeeder._never_sent(e)
+    assert not NocoDBSeeder._never_sent(requests.ConnectionError("Connection aborted"))
+
+
+if __name__ == "__main__":
+    test_create_table_with_columns()
+    test_write_retries()
+    test_connection_errors()
+    print("NocoDB seed tests passed")
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+
+import weather_server
+
+FORECAST = {"properties": {"periods": [{
+    "name": "Tonight", "temperature": 12, "temperatureUnit": "C",
+    "windSpeed": "5 mph", "windDirection": "SW", "detailedForecast": "Clear."
+}]}}
+
+
+def test_forecast_cache():
+    """Repeat forecasts reuse the /points lookup and honour the forecast's Cache-Control."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.startswith("/points/"):
+            return httpx.Response(200, json={"properties": {"forecast": "https://api.weather.gov/gridpoints/LWX/96,70/forecast"}},
+                                  headers={"Cache-Control": "public, max-age=60"})
+        return httpx.Response(200, json=FORECAST, headers={"Cache-Control": "public, max-age=0"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    get_http_client = weather_server.get_http_client
+    weather_server.get_http_client = lambda: client
+    weather_server._response_cache.clear()
+
+    async def run():
+        first = await weather_server.get_forecast(38.891234567, -77.0123456)
+        # Same venue, slightly different coordinates: the rounded /points entry is reused
+        second = await weather_server.get_forecast(38.89123, -77.01235)
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        weather_server.get_http_client = get_http_client
+    assert "Tonight" in first and first == second
+    assert calls == ["/points/38.8912,-77.0123", "/gridpoints/LWX/96,70/forecast", "/gridpoints/LWX/96,70/forecast"]
+
+
+def test_cache_lifetime():
+    """Cache-Control wins over Expires; no-store forbids caching."""
+    assert weather_server.cache_lifetime(httpx.Headers({"Cache-Control": "public, max-age=300"})) == 300
+    assert weather_server.cache_lifetime(httpx.Headers({"Cache-Control": "no-store"})) is None
+    assert weather_server.cache_lifetime(httpx.Headers({
+        "Date": "Thu, 01 May 2025 12:00:00 GMT", "Expires": "Thu, 01 May 2025 12:15:00 GMT"
+    })) == 900
+    assert weather_server.cache_lifetime(httpx.Headers({})) == 0
+
+
+if __name__ == "__main__":
+    test_forecast_cache()
+    test_cache_lifetime()
+    print("Weather server tests passed")
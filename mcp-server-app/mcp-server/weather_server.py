@@ -1,7 +1,18 @@
 from typing import Any
-import httpx
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+import sys
+import time
 from mcp.server.fastmcp import FastMCP
 
+# Add mcp-server-app to the path so we can import the shared HTTP pool
+parent_dir = str(Path(__file__).resolve().parents[1])
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from shared_http import get_http_client
+
 # Initialize FastMCP server
 mcp = FastMCP("weather")
 
@@ -9,19 +20,72 @@ mcp = FastMCP("weather")
 NWS_API_BASE = "https://api.weather.gov"
 USER_AGENT = "weather-app/1.0"
 
-async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
+# A point's forecast office and grid practically never change, so /points
+# lookups are kept at least this long (seconds), keyed by rounded lat/lon
+POINTS_TTL = 24 * 60 * 60
+# NWS accepts at most 4 decimal places (about 11 m); more precision gets a redirect
+COORDINATE_PLACES = 4
+
+# Cached NWS responses: cache key -> (monotonic expiry time, JSON body)
+_response_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+MAX_CACHE_ENTRIES = 256
+
+def cache_lifetime(headers) -> float | None:
+    """Seconds a response may be reused, from Cache-Control or Expires.
+
+    Returns None when the response must not be cached, and 0 when the
+    headers say nothing about it.
+    """
+    directives = {}
+    for part in headers.get("Cache-Control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+
+    if "no-store" in directives or "no-cache" in directives:
+        return None
+    if directives.get("max-age", "").isdigit():
+        return float(directives["max-age"])
+
+    try:
+        expires = parsedate_to_datetime(headers["Expires"])
+        date = parsedate_to_datetime(headers["Date"]) if "Date" in headers else datetime.now(timezone.utc)
+        return max(0.0, (expires - date).total_seconds())
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+async def make_nws_request(url: str, cache_key: str | None = None, min_ttl: float = 0) -> dict[str, Any] | None:
+    """Make a request to the NWS API with proper error handling.
+
+    Responses are reused for as long as their Cache-Control/Expires headers
+    allow, or at least min_ttl seconds unless the response forbids caching.
+    """
+    key = cache_key or url
+    cached = _response_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
     headers = {
         "User-Agent": USER_AGENT,
         "Accept": "application/geo+json"
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+    try:
+        response = await get_http_client().get(url, headers=headers, timeout=30.0)
+        response.raise_for_status()
+        data = response.json()
+    except Exception:
+        return None
+
+    ttl = cache_lifetime(response.headers)
+    if ttl is not None and max(ttl, min_ttl) > 0:
+        if len(_response_cache) >= MAX_CACHE_ENTRIES:
+            now = time.monotonic()
+            for stale_key in [k for k, (expires, _) in _response_cache.items() if expires <= now]:
+                del _response_cache[stale_key]
+            if len(_response_cache) >= MAX_CACHE_ENTRIES:
+                _response_cache.pop(next(iter(_response_cache)))
+        _response_cache[key] = (time.monotonic() + max(ttl, min_ttl), data)
+    return data
 
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
@@ -61,9 +125,10 @@ async def get_forecast(latitude: float, longitude: float) -> str:
         latitude: Latitude of the location
         longitude: Longitude of the location
     """
-    # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    # First get the forecast grid endpoint (cached per rounded location)
+    point = f"{round(latitude, COORDINATE_PLACES)},{round(longitude, COORDINATE_PLACES)}"
+    points_url = f"{NWS_API_BASE}/points/{point}"
+    points_data = await make_nws_request(points_url, cache_key=f"points:{point}", min_ttl=POINTS_TTL)
 
     if not points_data:
         return "Unable to fetch forecast data for this location."
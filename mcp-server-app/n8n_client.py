@@ -0,0 +1,121 @@
+import os
+
+import httpx
+
+from shared_http import APIError, request_json
+
+
+class N8NError(APIError):
+    """An n8n API call failed; carries the HTTP status and response body when there was one."""
+
+
+class N8NClient:
+    """Async client for the n8n public API, shared by the MCP server and the CLI scripts.
+
+    One pooled httpx client is reused for every call. Connection failures
+    are retried for every method (the request never reached n8n); timeouts,
+    429 and 5xx responses are retried with exponential backoff for
+    idempotent methods only, so a workflow is never created twice.
+    """
+
+    def __init__(self, host_url=None, api_key=None, timeout=30.0, max_retries=3, backoff=0.5, transport=None):
+        self.host_url = (host_url or os.getenv("N8N_HOST_URL", "http://localhost:5678/api/v1")).rstrip("/")
+        self.api_key = api_key if api_key is not None else os.getenv("N8N_API_KEY")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._transport = transport
+        self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def list_workflows(self, active=None):
+        """Get every workflow, following n8n's cursor pagination."""
+        params = {"limit": 250}
+        if active is not None:
+            params["active"] = "true" if active else "false"
+
+        workflows = []
+        while True:
+            data = await self._request("GET", "/workflows", params=params)
+            workflows.extend(data.get("data", []))
+            if not data.get("nextCursor"):
+                return workflows
+            params["cursor"] = data["nextCursor"]
+
+    async def get_workflow(self, workflow_id):
+        """Get a workflow by ID."""
+        return await self._request("GET", f"/workflows/{workflow_id}")
+
+    async def create_workflow(self, workflow):
+        """Create a workflow from its JSON definition and return the created workflow."""
+        return await self._request("POST", "/workflows", json=workflow)
+
+    async def update_workflow(self, workflow_id, workflow):
+        """Replace a workflow's definition and return the updated workflow."""
+        return await self._request("PUT", f"/workflows/{workflow_id}", json=workflow)
+
+    async def activate_workflow(self, workflow_id):
+        """Activate a workflow."""
+        return await self._request("POST", f"/workflows/{workflow_id}/activate")
+
+    async def deactivate_workflow(self, workflow_id):
+        """Deactivate a workflow."""
+        return await self._request("POST", f"/workflows/{workflow_id}/deactivate")
+
+    async def execute_workflow(self, workflow_id, data=None):
+        """Run a workflow with optional input data."""
+        return await self._request("POST", f"/workflows/{workflow_id}/execute", json=data or {})
+
+    async def delete_workflow(self, workflow_id):
+        """Delete a workflow."""
+        return await self._request("DELETE", f"/workflows/{workflow_id}")
+
+    async def list_executions(self, workflow_id=None, limit=20):
+        """Get the most recent executions, optionally for one workflow."""
+        params = {"limit": limit}
+        if workflow_id:
+            params["workflowId"] = workflow_id
+        data = await self._request("GET", "/executions", params=params)
+        return data.get("data", [])
+
+    async def get_execution(self, execution_id, include_data=False):
+        """Get an execution by ID."""
+        params = {"includeData": "true"} if include_data else None
+        return await self._request("GET", f"/executions/{execution_id}", params=params)
+
+    async def create_and_activate_workflow(self, workflow):
+        """Create a workflow and activate it, returning the created workflow."""
+        created = await self.create_workflow(workflow)
+        await self.activate_workflow(created.get("id"))
+        return created
+
+    def _get_client(self):
+        """Get the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.host_url,
+                headers={"X-N8N-API-KEY": self.api_key or "", "Content-Type": "application/json"},
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                transport=self._transport
+            )
+        return self._client
+
+    async def _request(self, method, path, **kwargs):
+        """Call the API, retrying transient failures, and return the decoded JSON body."""
+        if not self.api_key:
+            raise N8NError("n8n API key not configured. Please set the N8N_API_KEY environment variable.")
+
+        return await request_json(self._get_client(), method, path, service="n8n", error_class=N8NError,
+                                  max_retries=self.max_retries, backoff=self.backoff, **kwargs)
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Safe to repeat: a retried request cannot apply the change twice
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+# One connection pool per process. Every API client built on this transport
+# reuses the same keep-alive connections, which matters most when the MCP
+# gateway hosts every server in one process.
+_transport = None
+_client = None
+
+
+def get_transport():
+    """Get the process-wide HTTP transport that holds the shared connection pool.
+
+    Clients built with this transport must not be closed individually
+    (closing a client closes its transport); call aclose() at exit instead.
+    """
+    global _transport
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+    return _transport
+
+
+def get_http_client(timeout=30.0):
+    """Get a plain pooled client, for callers that pass full URLs and their own headers."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            transport=get_transport()
+        )
+    return _client
+
+
+async def aclose():
+    """Close the shared client and connection pool."""
+    global _client, _transport
+    if _client is not None:
+        await _client.aclose()
+    elif _transport is not None:
+        await _transport.aclose()
+    _client = None
+    _transport = None
+
+
+class APIError(Exception):
+    """An API call failed; carries the HTTP status and response body when there was one."""
+
+    def __init__(self, message, status_code=None, response_text=None):
+        self.status_code = status_code
+        self.response_text = response_text
+        if response_text:
+            message = f"{message}\nResponse: {response_text}"
+        super().__init__(message)
+
+
+async def request_json(client, method, path, service="API", error_class=APIError, max_retries=3, backoff=0.5,
+                       **kwargs):
+    """Call an API through client, retrying transient failures, and return the decoded JSON body.
+
+    Connection failures are retried for every method (the request never
+    reached the server); timeouts, 429 and 5xx responses are retried with
+    exponential backoff, or after Retry-After, for idempotent methods only,
+    so nothing is created twice. Failures raise error_class.
+    """
+    retry_transient = method in IDEMPOTENT_METHODS
+    for attempt in range(max_retries + 1):
+        delay = backoff * 2 ** attempt
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.ConnectError as e:
+            error = error_class(f"Could not connect to {service}: {str(e)}")
+        except httpx.TimeoutException as e:
+            if not retry_transient:
+                raise error_class(f"{service} request timed out: {str(e)}") from e
+            error = error_class(f"{service} request timed out: {str(e)}")
+        except httpx.HTTPError as e:
+            raise error_class(f"{service} request failed: {str(e)}") from e
+        else:
+            if response.status_code < 400:
+                return response.json() if response.content else {}
+
+            error = error_class(f"{method} {path} failed with status {response.status_code}",
+                                response.status_code, response.text)
+            transient = response.status_code == 429 or response.status_code >= 500
+            if not (transient and retry_transient):
+                raise error
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = int(retry_after)
+
+        if attempt == max_retries:
+            raise error
+        logger.warning(f"{str(error).splitlines()[0]}; retrying {method} {path} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+def parse_timeframe(timeframe):
+    """Turn a timeframe such as 1d, 7d or 30d into a number of days."""
+    if not timeframe.endswith("d") or not timeframe[:-1].isdigit() or int(timeframe[:-1]) < 1:
+        raise ValueError(f"Unsupported timeframe '{timeframe}'; use a number of days such as 1d, 7d or 30d")
+    return int(timeframe[:-1])
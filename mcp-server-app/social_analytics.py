@@ -0,0 +1,200 @@
+import datetime
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from shared_http import parse_timeframe
+
+# Engagement counters tracked per post and rolled up per platform per day
+METRICS = ("likes", "comments", "shares", "reach", "impressions")
+
+# The counters that make up a post's engagement
+ENGAGEMENT = ("likes", "comments", "shares")
+
+DEFAULT_DB = os.getenv("SOCIAL_ANALYTICS_DB", str(Path(__file__).resolve().parent / "data" / "social_analytics.db"))
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS posts (
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    posted_on TEXT NOT NULL,
+    content TEXT,
+    {", ".join(f"{metric} INTEGER NOT NULL DEFAULT 0" for metric in METRICS)},
+    engagement INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (platform, post_id)
+);
+CREATE INDEX IF NOT EXISTS posts_by_engagement ON posts (platform, posted_on, engagement);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    platform TEXT NOT NULL,
+    day TEXT NOT NULL,
+    posts INTEGER NOT NULL DEFAULT 0,
+    {", ".join(f"{metric} INTEGER NOT NULL DEFAULT 0" for metric in METRICS)},
+    PRIMARY KEY (platform, day)
+) WITHOUT ROWID;
+"""
+
+_ROLLUP_UPSERT = f"""
+INSERT INTO daily_rollups (platform, day, posts, {", ".join(METRICS)})
+VALUES (?, ?, ?, {", ".join("?" for _ in METRICS)})
+ON CONFLICT (platform, day) DO UPDATE SET
+    posts = posts + excluded.posts,
+    {", ".join(f"{metric} = {metric} + excluded.{metric}" for metric in METRICS)}
+"""
+
+
+def _day(value):
+    """The UTC day (YYYY-MM-DD) of an ISO timestamp, a datetime or None (today)."""
+    if value is None:
+        moment = datetime.datetime.now(datetime.timezone.utc)
+    elif isinstance(value, datetime.datetime):
+        moment = value
+    else:
+        moment = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc)
+    return moment.date().isoformat()
+
+
+class SocialAnalytics:
+    """A SQLite store of per-post social engagement with incremental daily rollups.
+
+    Events carry a post's running totals, as platform APIs report them.
+    Ingesting one adds only the change since the post was last seen to the
+    platform's rollup for the day it was observed, so re-ingesting the same
+    numbers is harmless and a timeframe query reads one rollup row per
+    platform per day, however many posts or events there were. A post
+    counts towards the day it was published.
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # The social and campaign servers may share the file from separate processes
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def ingest(self, events):
+        """Record engagement events and update the daily rollups; returns how many were ingested.
+
+        Each event is a dict with platform and post_id, the post's current
+        totals for any of METRICS, and optionally posted_at, observed_at
+        (ISO timestamps, default now) and content.
+        """
+        ingested = 0
+        with self._lock, self._conn:
+            # Take the write lock before reading, so another process cannot apply the same deltas in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            for event in events:
+                platform = event["platform"].lower()
+                post_id = str(event["post_id"])
+                observed_on = _day(event.get("observed_at"))
+                totals = {metric: int(event.get(metric) or 0) for metric in METRICS}
+
+                known = self._conn.execute(
+                    f"SELECT {', '.join(METRICS)} FROM posts WHERE platform = ? AND post_id = ?",
+                    (platform, post_id)
+                ).fetchone()
+                if known is None:
+                    posted_on = _day(event.get("posted_at") or event.get("observed_at"))
+                    self._conn.execute(
+                        f"INSERT INTO posts (platform, post_id, posted_on, content, {', '.join(METRICS)}, engagement) "
+                        f"VALUES (?, ?, ?, ?, {', '.join('?' for _ in METRICS)}, ?)",
+                        (platform, post_id, posted_on, event.get("content"), *totals.values(),
+                         sum(totals[metric] for metric in ENGAGEMENT))
+                    )
+                    self._conn.execute(_ROLLUP_UPSERT, (platform, posted_on, 1, *(0 for _ in METRICS)))
+                    deltas = totals
+                else:
+                    deltas = {metric: totals[metric] - known[metric] for metric in METRICS}
+                    if any(deltas.values()):
+                        self._conn.execute(
+                            f"UPDATE posts SET {', '.join(f'{metric} = ?' for metric in METRICS)}, engagement = ? "
+                            f"WHERE platform = ? AND post_id = ?",
+                            (*totals.values(), sum(totals[metric] for metric in ENGAGEMENT), platform, post_id)
+                        )
+                if any(deltas.values()):
+                    self._conn.execute(_ROLLUP_UPSERT, (platform, observed_on, 0, *deltas.values()))
+                ingested += 1
+        return ingested
+
+    def summary(self, platform=None, timeframe=None, today=None, top=3):
+        """Totals per platform for the last timeframe days (today included), or all time if timeframe is None.
+
+        Returns {"platforms": {platform: totals}, "total_*": ...}; with a
+        platform, its totals also carry its top posts for the period: the
+        posts published in it, ranked by their lifetime engagement.
+        """
+        since = None
+        if timeframe is not None:
+            end = datetime.date.fromisoformat(_day(today))
+            since = (end - datetime.timedelta(days=parse_timeframe(timeframe) - 1)).isoformat()
+
+        where, params = [], []
+        if platform:
+            where.append("platform = ?")
+            params.append(platform.lower())
+        if since:
+            where.append("day >= ?")
+            params.append(since)
+        query = (f"SELECT platform, SUM(posts) AS posts, {', '.join(f'SUM({metric}) AS {metric}' for metric in METRICS)} "
+                 f"FROM daily_rollups {'WHERE ' + ' AND '.join(where) if where else ''} GROUP BY platform ORDER BY platform")
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            platforms = {row["platform"]: self._totals(row) for row in rows}
+            if platform:
+                totals = platforms.setdefault(platform.lower(), self._totals(None))
+                totals["top_posts"] = self._top_posts(platform.lower(), since, top)
+
+        result = {"platforms": platforms}
+        for key in ("total_posts", "total_engagement", *(f"total_{metric}" for metric in METRICS)):
+            result[key] = sum(totals[key] for totals in platforms.values())
+        return result
+
+    def _totals(self, row):
+        """A platform's rollup row as a dict of totals."""
+        totals = {f"total_{metric}": (row[metric] if row else 0) or 0 for metric in METRICS}
+        totals["total_posts"] = (row["posts"] if row else 0) or 0
+        totals["total_engagement"] = sum(totals[f"total_{metric}"] for metric in ENGAGEMENT)
+        return totals
+
+    def _top_posts(self, platform, since, top):
+        """The posts published on a platform since a day with the most lifetime engagement.
+
+        Only platform rollups are kept per day, not per-post history, so a
+        post's engagement here is its latest total, not just the part gained
+        within the timeframe.
+        """
+        rows = self._conn.execute(
+            "SELECT post_id, engagement, content FROM posts WHERE platform = ? AND posted_on >= ? "
+            "ORDER BY engagement DESC LIMIT ?",
+            (platform, since or "", top)
+        ).fetchall()
+        return [{
+            "id": row["post_id"],
+            "engagement": row["engagement"],
+            "content": row["content"][:50] + "..." if row["content"] and len(row["content"]) > 50 else row["content"]
+        } for row in rows]
+
+
+# One store per process, opened on first use
+_store = None
+
+
+def get_store():
+    """Get the process-wide analytics store (SOCIAL_ANALYTICS_DB, default data/social_analytics.db)."""
+    global _store
+    if _store is None:
+        _store = SocialAnalytics(DEFAULT_DB)
+    return _store
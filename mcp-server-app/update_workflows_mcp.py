@@ -1,9 +1,10 @@
-import requests
+import asyncio
 import os
 import json
 import time
 from dotenv import load_dotenv
 from pathlib import Path
+from n8n_client import N8NClient, N8NError
 
 print("Updating n8n Workflows with Code Nodes via MCP Server...")
 
@@ -20,11 +21,8 @@ N8N_API_KEY = os.getenv("N8N_API_KEY")
 print(f"N8N_HOST_URL: {N8N_HOST_URL}")
 print(f"N8N_API_KEY: {N8N_API_KEY[:10]}..." if N8N_API_KEY else "N8N_API_KEY: None")
 
-# Headers for API requests
-headers = {
-    "X-N8N-API-KEY": N8N_API_KEY,
-    "Content-Type": "application/json"
-}
+# Shared n8n API client
+n8n = N8NClient(N8N_HOST_URL, N8N_API_KEY)
 
 # Load the Code node scripts
 code_files = {
@@ -47,46 +45,29 @@ for key, file_path in code_files.items():
         code_scripts[key] = ""
 
 # Function to get a workflow by ID
-def get_workflow(workflow_id):
-    url = f"{N8N_HOST_URL}/workflows/{workflow_id}"
-    
+async def get_workflow(workflow_id):
     try:
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error getting workflow {workflow_id}: {response.status_code}")
-            print(f"Response: {response.text}")
-            return None
-    except Exception as e:
-        print(f"Error: {str(e)}")
+        return await n8n.get_workflow(workflow_id)
+    except N8NError as e:
+        print(f"Error getting workflow {workflow_id}: {str(e)}")
         return None
 
 # Function to update a workflow
-def update_workflow(workflow_id, workflow_data):
-    url = f"{N8N_HOST_URL}/workflows/{workflow_id}"
-    
+async def update_workflow(workflow_id, workflow_data):
     try:
-        response = requests.put(url, headers=headers, json=workflow_data)
-        
-        if response.status_code == 200:
-            print(f"Workflow {workflow_id} updated successfully!")
-            return True
-        else:
-            print(f"Error updating workflow {workflow_id}: {response.status_code}")
-            print(f"Response: {response.text}")
-            return False
-    except Exception as e:
-        print(f"Error: {str(e)}")
+        await n8n.update_workflow(workflow_id, workflow_data)
+        print(f"Workflow {workflow_id} updated successfully!")
+        return True
+    except N8NError as e:
+        print(f"Error updating workflow {workflow_id}: {str(e)}")
         return False
 
 # Function to add a Code node to a workflow
-def add_code_node_to_workflow(workflow_id, workflow_name, code_script, google_sheets_node_name, old_function_node_name, next_node_name=None):
+async def add_code_node_to_workflow(workflow_id, workflow_name, code_script, google_sheets_node_name, old_function_node_name, next_node_name=None):
     print(f"\nUpdating {workflow_name} (ID: {workflow_id})...")
     
     # Get the current workflow
-    workflow = get_workflow(workflow_id)
+    workflow = await get_workflow(workflow_id)
     if not workflow:
         return False
     
@@ -191,7 +172,7 @@ def add_code_node_to_workflow(workflow_id, workflow_name, code_script, google_sh
             })
     
     # Update the workflow
-    return update_workflow(workflow_id, workflow)
+    return await update_workflow(workflow_id, workflow)
 
 # Workflow configurations
 workflows = [
@@ -246,21 +227,26 @@ workflows = [
 ]
 
 # Update each workflow
-results = []
-for workflow in workflows:
-    print(f"\n=== Updating {workflow['name']} ===")
-    success = add_code_node_to_workflow(
-        workflow["id"],
-        workflow["name"],
-        workflow["code_script"],
-        workflow["google_sheets_node"],
-        workflow["function_node"],
-        workflow["next_node"]
-    )
-    results.append({
-        "workflow": workflow["name"],
-        "success": success
-    })
+async def update_all():
+    results = []
+    async with n8n:
+        for workflow in workflows:
+            print(f"\n=== Updating {workflow['name']} ===")
+            success = await add_code_node_to_workflow(
+                workflow["id"],
+                workflow["name"],
+                workflow["code_script"],
+                workflow["google_sheets_node"],
+                workflow["function_node"],
+                workflow["next_node"]
+            )
+            results.append({
+                "workflow": workflow["name"],
+                "success": success
+            })
+    return results
+
+results = asyncio.run(update_all())
 
 # Print summary
 print("\n=== Update Summary ===")
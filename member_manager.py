@@ -1,20 +1,41 @@
-import json
 import os
+import bisect
 import datetime
 import uuid
 import time
 import shutil
 import logging
+from contextlib import contextmanager
+from models import Member, MemberType, MemberStatus, encode_members, decode_members
+import json_codec
 
 logger = logging.getLogger('blkout_nxt')
 
 class MemberManager:
-    """A class to manage member data in a JSON file."""
+    """A class to manage member data in a JSON file.
 
-    def __init__(self, file_path="data/members.json"):
-        """Initialize the MemberManager with the path to the JSON file."""
+    Every load-modify-save cycle holds an flock on the file's .lock
+    companion, so request threads, the drip scheduler and other worker
+    processes cannot overwrite each other's changes.
+    """
+
+    def __init__(self, file_path="data/members.json", history_limit=20):
+        """Initialize the MemberManager with the path to the JSON file.
+
+        Only the latest history_limit email history entries are kept on each
+        member; older entries are moved to the email history archive file.
+        Nothing is written until the first save, so creating a manager (as
+        importing the app does) has no side effects on disk.
+        """
         self.file_path = file_path
-        self.ensure_file_exists()
+        self.history_limit = history_limit
+        self.archive_path = os.path.join(os.path.dirname(self.file_path), "email_history_archive.jsonl")
+        # Members sorted by drip_next_due, cached against the file's stat
+        self._drip_index = None
+        self._drip_index_key = None
+        # Keys of archived email history entries, and how far into the archive they were read
+        self._archive_keys = None
+        self._archive_offset = 0
 
     def ensure_file_exists(self):
         """Ensure the JSON file exists, creating it if necessary."""
@@ -25,31 +46,57 @@ class MemberManager:
         if not os.path.exists(self.file_path):
             logger.info(f"Creating new members file: {self.file_path}")
             # Create an empty JSON file
-            with open(self.file_path, 'w') as f:
-                json.dump({"members": []}, f)
+            with open(self.file_path, 'wb') as f:
+                f.write(encode_members([]))
         else:
             logger.info(f"Members file already exists: {self.file_path}")
 
-    def load_data(self):
-        """Load the member data from the JSON file."""
+    @contextmanager
+    def _store_lock(self):
+        """Hold an exclusive lock on the member store for a load-modify-save cycle."""
+        try:
+            import fcntl
+        except ImportError:
+            # No flock on Windows, where the backend runs as a single process
+            yield
+            return
+
+        with open(f"{self.file_path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load_members(self):
+        """Load the members from the JSON file.
+
+        A missing file is an empty store. Raises if the file cannot be read
+        or parsed, so callers never save an empty list over a store they
+        failed to load.
+        """
         try:
-            with open(self.file_path, 'r') as f:
-                return json.load(f)
+            with open(self.file_path, 'rb') as f:
+                return decode_members(f.read())
+        except FileNotFoundError:
+            return []
         except Exception as e:
             logger.error(f"Error loading data: {str(e)}")
-            # Return empty data structure if file can't be read
-            return {"members": []}
+            raise
 
-    def save_data(self, data):
-        """Save the member data to the JSON file."""
+    def save_members(self, members):
+        """Save the members to the JSON file."""
         try:
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+
             # First write to a temporary file
             temp_file = f"{self.file_path}.tmp"
-            with open(temp_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with open(temp_file, 'wb') as f:
+                f.write(encode_members(members))
 
             # Then rename to the actual file (atomic operation)
             os.replace(temp_file, self.file_path)
+            self._build_drip_index(members)
             return True
         except Exception as e:
             logger.error(f"Error saving data: {str(e)}")
@@ -62,42 +109,39 @@ class MemberManager:
 
         while retry_count < max_retries:
             try:
-                # Load the current data
-                data = self.load_data()
-
-                # Check if the member already exists
-                for member in data["members"]:
-                    if member["email"].lower() == email.lower():
-                        return {"success": False, "message": "Member already exists", "member_id": member["id"]}
-
-                # Generate a unique ID for the member
-                member_id = str(uuid.uuid4())
-
-                # Create the member object
-                member = {
-                    "id": member_id,
-                    "name": name,
-                    "email": email,
-                    "member_type": member_type,
-                    "status": "new",
-                    "date_added": datetime.datetime.now().isoformat(),
-                    "last_email_sent": None,
-                    "email_history": [],
-                    "survey_completed": False,
-                    "survey_data": None
-                }
-
-                # Add the member to the data
-                data["members"].append(member)
-
-                # Save the data
-                if self.save_data(data):
-                    # Create a backup
-                    self.backup_data()
-                    return {"success": True, "message": "Member added successfully", "member_id": member_id}
-                else:
-                    retry_count += 1
-                    time.sleep(1)  # Wait before retrying
+                with self._store_lock():
+                    # Load the current data
+                    members = self.load_members()
+
+                    # Check if the member already exists
+                    for member in members:
+                        if member.email.lower() == email.lower():
+                            return {"success": False, "message": "Member already exists", "member_id": member.id}
+
+                    # Generate a unique ID for the member
+                    member_id = str(uuid.uuid4())
+
+                    # Create the member object
+                    member = Member(
+                        id=member_id,
+                        name=name,
+                        email=email,
+                        member_type=MemberType.parse(member_type),
+                        status=MemberStatus.NEW,
+                        date_added=datetime.datetime.now().isoformat()
+                    )
+
+                    # Add the member to the data
+                    members.append(member)
+
+                    # Save the data
+                    if self.save_members(members):
+                        # Create a backup
+                        self.backup_data()
+                        return {"success": True, "message": "Member added successfully", "member_id": member_id}
+
+                retry_count += 1
+                time.sleep(1)  # Wait before retrying
             except Exception as e:
                 logger.error(f"Error adding member (attempt {retry_count+1}): {str(e)}")
                 retry_count += 1
@@ -108,10 +152,8 @@ class MemberManager:
     def get_member(self, member_id=None, email=None):
         """Get a member by ID or email."""
         try:
-            data = self.load_data()
-
-            for member in data["members"]:
-                if (member_id and member["id"] == member_id) or (email and member["email"].lower() == email.lower()):
+            for member in self.load_members():
+                if (member_id and member.id == member_id) or (email and member.email.lower() == email.lower()):
                     return member
 
             return None
@@ -122,21 +164,28 @@ class MemberManager:
     def update_member(self, member_id, updates):
         """Update a member's data."""
         try:
-            data = self.load_data()
-
-            for member in data["members"]:
-                if member["id"] == member_id:
-                    # Update the member data
-                    for key, value in updates.items():
-                        member[key] = value
-
-                    # Save the data
-                    if self.save_data(data):
-                        return {"success": True, "message": "Member updated successfully"}
-                    else:
-                        return {"success": False, "message": "Failed to save data"}
-
-            return {"success": False, "message": "Member not found"}
+            with self._store_lock():
+                members = self.load_members()
+
+                for member in members:
+                    if member.id == member_id:
+                        # Update the member data
+                        for key, value in updates.items():
+                            if key == "id" or key not in Member.__slots__:
+                                return {"success": False, "message": f"Unknown member field: {key}"}
+                            if key == "status":
+                                value = MemberStatus.parse(value)
+                            elif key == "member_type":
+                                value = MemberType.parse(value)
+                            setattr(member, key, value)
+
+                        # Save the data
+                        if self.save_members(members):
+                            return {"success": True, "message": "Member updated successfully"}
+                        else:
+                            return {"success": False, "message": "Failed to save data"}
+
+                return {"success": False, "message": "Member not found"}
         except Exception as e:
             logger.error(f"Error updating member: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}"}
@@ -144,30 +193,33 @@ class MemberManager:
     def record_email_sent(self, member_id, email_type, email_subject):
         """Record that an email was sent to a member."""
         try:
-            data = self.load_data()
-
-            for member in data["members"]:
-                if member["id"] == member_id:
-                    # Record the email
-                    email_record = {
-                        "type": email_type,
-                        "subject": email_subject,
-                        "sent_at": datetime.datetime.now().isoformat()
-                    }
-
-                    if "email_history" not in member:
-                        member["email_history"] = []
-
-                    member["email_history"].append(email_record)
-                    member["last_email_sent"] = datetime.datetime.now().isoformat()
-
-                    # Save the data
-                    if self.save_data(data):
-                        return {"success": True, "message": "Email recorded successfully"}
-                    else:
-                        return {"success": False, "message": "Failed to save data"}
-
-            return {"success": False, "message": "Member not found"}
+            with self._store_lock():
+                members = self.load_members()
+
+                for member in members:
+                    if member.id == member_id:
+                        # Record the email
+                        email_record = {
+                            "type": email_type,
+                            "subject": email_subject,
+                            "sent_at": datetime.datetime.now().isoformat()
+                        }
+
+                        member.record_email(email_record)
+
+                        # Move entries beyond the retention limit to the archive
+                        overflow = len(member.email_history) - self.history_limit
+                        if overflow > 0:
+                            self.archive_email_history(member.id, member.email_history[:overflow])
+                            del member.email_history[:overflow]
+
+                        # Save the data
+                        if self.save_members(members):
+                            return {"success": True, "message": "Email recorded successfully"}
+                        else:
+                            return {"success": False, "message": "Failed to save data"}
+
+                return {"success": False, "message": "Member not found"}
         except Exception as e:
             logger.error(f"Error recording email: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}"}
@@ -175,29 +227,22 @@ class MemberManager:
     def get_members_needing_reminder(self, days_since_signup=3):
         """Get members who need a reminder email."""
         try:
-            data = self.load_data()
             now = datetime.datetime.now()
             members_needing_reminder = []
 
-            for member in data["members"]:
+            for member in self.load_members():
                 # Skip members who have completed the survey
-                if member.get("survey_completed", False):
+                if member.survey_completed:
                     continue
 
                 # Calculate days since signup
-                date_added = datetime.datetime.fromisoformat(member["date_added"])
+                date_added = datetime.datetime.fromisoformat(member.date_added)
                 days_elapsed = (now - date_added).days
 
                 # Check if enough days have passed
                 if days_elapsed >= days_since_signup:
                     # Check if a reminder has already been sent
-                    reminder_sent = False
-                    for email in member.get("email_history", []):
-                        if email.get("type") == "reminder":
-                            reminder_sent = True
-                            break
-
-                    if not reminder_sent:
+                    if not member.has_received("reminder"):
                         members_needing_reminder.append(member)
 
             return members_needing_reminder
@@ -208,31 +253,134 @@ class MemberManager:
     def record_survey_completion(self, member_id, survey_data):
         """Record that a member has completed the survey."""
         try:
-            data = self.load_data()
+            with self._store_lock():
+                members = self.load_members()
+
+                for member in members:
+                    if member.id == member_id:
+                        # Record the survey completion
+                        member.survey_completed = True
+                        member.survey_completed_at = datetime.datetime.now().isoformat()
+                        member.survey_data = survey_data
+                        member.status = MemberStatus.ACTIVE
+
+                        # Save the data
+                        if self.save_members(members):
+                            return {"success": True, "message": "Survey completion recorded successfully", "member_id": member_id}
+                        else:
+                            return {"success": False, "message": "Failed to save data"}
+
+                return {"success": False, "message": "Member not found"}
+        except Exception as e:
+            logger.error(f"Error recording survey completion: {str(e)}")
+            return {"success": False, "message": f"Error: {str(e)}"}
+
+    def get_members_due_for_drip(self, now=None, campaign=None):
+        """Get members whose next drip email is due, earliest first."""
+        try:
+            now = now or datetime.datetime.now()
+            if not os.path.exists(self.file_path):
+                return []
+            stat = os.stat(self.file_path)
+            if self._drip_index is None or self._drip_index_key != (stat.st_mtime_ns, stat.st_size):
+                self._build_drip_index(self.load_members())
+
+            due_times, members = self._drip_index
+            due_members = members[:bisect.bisect_right(due_times, now)]
+            if campaign:
+                due_members = [member for member in due_members if member.drip_campaign == campaign]
+            return due_members
+        except Exception as e:
+            logger.error(f"Error getting members due for drip: {str(e)}")
+            return []
 
-            for member in data["members"]:
-                if member["id"] == member_id:
-                    # Record the survey completion
-                    member["survey_completed"] = True
-                    member["survey_data"] = survey_data
-                    member["status"] = "active"
+    def _build_drip_index(self, members):
+        """Index enrolled members by drip_next_due for the file as currently saved."""
+        entries = []
+        for member in members:
+            if member.drip_campaign and member.drip_next_due:
+                try:
+                    entries.append((datetime.datetime.fromisoformat(member.drip_next_due), member))
+                except ValueError:
+                    logger.warning(f"Invalid drip_next_due for member {member.id}: {member.drip_next_due}")
+        entries.sort(key=lambda entry: entry[0])
+
+        stat = os.stat(self.file_path)
+        self._drip_index = ([due for due, _ in entries], [member for _, member in entries])
+        self._drip_index_key = (stat.st_mtime_ns, stat.st_size)
+
+    def archive_email_history(self, member_id, email_records):
+        """Append email history entries to the archive file, skipping any already archived.
+
+        Entries are keyed on member id, sent_at and type, so archiving the
+        same entries again after a save that failed does not duplicate them.
+        """
+        archived = self._archived_keys()
+        with open(self.archive_path, 'ab') as f:
+            for email_record in email_records:
+                key = (member_id, email_record.get("sent_at"), email_record.get("type"))
+                if key in archived:
+                    continue
+                line = json_codec.dumps({"member_id": member_id, **email_record}) + b"\n"
+                f.write(line)
+                archived.add(key)
+                self._archive_offset += len(line)
 
-                    # Save the data
-                    if self.save_data(data):
-                        return {"success": True, "message": "Survey completion recorded successfully", "member_id": member_id}
-                    else:
-                        return {"success": False, "message": "Failed to save data"}
+    def _archived_keys(self):
+        """Keys of the archived entries, reading only what was appended since the last call."""
+        try:
+            size = os.path.getsize(self.archive_path)
+        except FileNotFoundError:
+            size = 0
+        if self._archive_keys is None or size < self._archive_offset:
+            self._archive_keys = set()
+            self._archive_offset = 0
+
+        if size > self._archive_offset:
+            with open(self.archive_path, 'rb') as f:
+                f.seek(self._archive_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # A partly written last line; read it again next time
+                        break
+                    self._archive_offset += len(line)
+                    try:
+                        entry = json_codec.loads(line)
+                    except ValueError:
+                        continue
+                    self._archive_keys.add((entry.get("member_id"), entry.get("sent_at"), entry.get("type")))
+        return self._archive_keys
+
+    def compact_email_history(self, max_age_days=90):
+        """Archive email history older than max_age_days or beyond the retention limit."""
+        try:
+            with self._store_lock():
+                members = self.load_members()
+                cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).isoformat()
+                archived_count = 0
+
+                for member in members:
+                    keep_from = max(len(member.email_history) - self.history_limit, 0)
+                    while keep_from < len(member.email_history) and member.email_history[keep_from].get("sent_at", "") < cutoff:
+                        keep_from += 1
+
+                    if keep_from:
+                        self.archive_email_history(member.id, member.email_history[:keep_from])
+                        del member.email_history[:keep_from]
+                        archived_count += keep_from
 
-            return {"success": False, "message": "Member not found"}
+                if archived_count and not self.save_members(members):
+                    return {"success": False, "message": "Failed to save data"}
+
+                return {"success": True, "message": f"Archived {archived_count} email history entries", "archived": archived_count}
         except Exception as e:
-            logger.error(f"Error recording survey completion: {str(e)}")
+            logger.error(f"Error compacting email history: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}"}
 
     def get_all_members(self):
         """Get all members."""
         try:
-            data = self.load_data()
-            return data["members"]
+            return self.load_members()
         except Exception as e:
             logger.error(f"Error getting all members: {str(e)}")
             return []
@@ -275,11 +423,11 @@ if __name__ == "__main__":
     print(member)
 
     # Update the member
-    result = manager.update_member(member["id"], {"status": "active"})
+    result = manager.update_member(member.id, {"status": MemberStatus.ACTIVE})
     print(result)
 
     # Record an email sent
-    result = manager.record_email_sent(member["id"], "welcome", "Welcome to BLKOUT NXT")
+    result = manager.record_email_sent(member.id, "welcome", "Welcome to BLKOUT NXT")
     print(result)
 
     # Get all members
@@ -0,0 +1,204 @@
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+import json_codec
+
+logger = logging.getLogger('blkout_nxt')
+
+
+class MemberStatus(str, Enum):
+    """Lifecycle status of a member."""
+
+    NEW = "new"
+    WELCOMED = "welcomed"
+    ACTIVE = "active"
+    UNSUBSCRIBED = "unsubscribed"
+
+    @classmethod
+    def parse(cls, value):
+        """Parse a stored status, falling back to NEW for unknown values."""
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(str(value).lower())
+        except ValueError:
+            logger.warning(f"Unknown member status: {value}")
+            return cls.NEW
+
+
+class MemberType(str, Enum):
+    """The member categories offered on the signup form."""
+
+    ALLY = "Ally"
+    BQM = "Black Queer Men"
+    QTIPOC_ORGANISER = "QTIPOC Organiser"
+    ORGANISATION = "Organisation"
+    OTHER = "Other"
+
+    @property
+    def survey_key(self):
+        """The survey this member type is asked to complete, if any."""
+        return _SURVEY_KEYS.get(self)
+
+    @property
+    def drip_campaign(self):
+        """The drip campaign this member type is enrolled in, if any."""
+        return _DRIP_CAMPAIGNS.get(self)
+
+    @classmethod
+    def parse(cls, value):
+        """Parse a form or stored member type, falling back to OTHER."""
+        if isinstance(value, cls):
+            return value
+        member_type = _MEMBER_TYPE_LOOKUP.get(str(value or "").strip().lower())
+        if member_type is None:
+            logger.warning(f"Unknown member type: {value}")
+            return cls.OTHER
+        return member_type
+
+
+_SURVEY_KEYS = {
+    MemberType.ALLY: "ally_survey",
+    MemberType.BQM: "bqm_survey",
+    MemberType.QTIPOC_ORGANISER: "qtipoc_organiser_survey",
+    MemberType.ORGANISATION: "organisation_survey",
+}
+
+_DRIP_CAMPAIGNS = {
+    MemberType.ALLY: "ally",
+    MemberType.BQM: "bqm",
+    MemberType.QTIPOC_ORGANISER: "organiser",
+    MemberType.ORGANISATION: "organisation",
+}
+
+# Accept the display values plus the short names used by the n8n workflows
+_MEMBER_TYPE_LOOKUP = {member_type.value.lower(): member_type for member_type in MemberType}
+_MEMBER_TYPE_LOOKUP.update({
+    "bqm": MemberType.BQM,
+    "organiser": MemberType.QTIPOC_ORGANISER,
+    "qtipoc_organiser": MemberType.QTIPOC_ORGANISER,
+    "organization": MemberType.ORGANISATION,
+})
+
+
+@dataclass(slots=True)
+class Member:
+    """A BLKOUT NXT member as stored in the members file."""
+
+    id: str
+    name: str
+    email: str
+    member_type: MemberType = MemberType.OTHER
+    status: MemberStatus = MemberStatus.NEW
+    date_added: str = ""
+    last_email_sent: Optional[str] = None
+    email_history: list = field(default_factory=list)
+    last_sent_by_type: dict = field(default_factory=dict)
+    count_by_type: dict = field(default_factory=dict)
+    survey_completed: bool = False
+    survey_completed_at: Optional[str] = None
+    survey_data: Optional[dict] = None
+    drip_campaign: Optional[str] = None
+    drip_stage: int = 0
+    drip_next_due: Optional[str] = None
+    drip_last_sent: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Member from its stored dict representation."""
+        email_history = data.get("email_history") or []
+        last_sent_by_type = data.get("last_sent_by_type")
+        count_by_type = data.get("count_by_type")
+        if last_sent_by_type is None or count_by_type is None:
+            # Members saved before the summary fields existed
+            last_sent_by_type, count_by_type = summarize_email_history(email_history)
+
+        return cls(
+            id=data["id"],
+            name=data.get("name") or "",
+            email=data["email"],
+            member_type=MemberType.parse(data.get("member_type")),
+            status=MemberStatus.parse(data.get("status", "new")),
+            date_added=data.get("date_added") or "",
+            last_email_sent=data.get("last_email_sent"),
+            email_history=email_history,
+            last_sent_by_type=last_sent_by_type,
+            count_by_type=count_by_type,
+            survey_completed=bool(data.get("survey_completed", False)),
+            survey_completed_at=data.get("survey_completed_at"),
+            survey_data=data.get("survey_data"),
+            drip_campaign=data.get("drip_campaign"),
+            drip_stage=int(data.get("drip_stage") or 0),
+            drip_next_due=data.get("drip_next_due"),
+            drip_last_sent=data.get("drip_last_sent"),
+        )
+
+    def to_dict(self):
+        """Return the dict representation used for storage and the API."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "member_type": self.member_type.value,
+            "status": self.status.value,
+            "date_added": self.date_added,
+            "last_email_sent": self.last_email_sent,
+            "email_history": self.email_history,
+            "last_sent_by_type": self.last_sent_by_type,
+            "count_by_type": self.count_by_type,
+            "survey_completed": self.survey_completed,
+            "survey_completed_at": self.survey_completed_at,
+            "survey_data": self.survey_data,
+            "drip_campaign": self.drip_campaign,
+            "drip_stage": self.drip_stage,
+            "drip_next_due": self.drip_next_due,
+            "drip_last_sent": self.drip_last_sent,
+        }
+
+    def record_email(self, email_record):
+        """Append an email to the history and update the per-type summary."""
+        email_type = email_record.get("type") or "unknown"
+        self.email_history.append(email_record)
+        self.last_email_sent = email_record.get("sent_at")
+        self.last_sent_by_type[email_type] = email_record.get("sent_at")
+        self.count_by_type[email_type] = self.count_by_type.get(email_type, 0) + 1
+
+    def has_received(self, email_type):
+        """Check whether an email of the given type was ever sent."""
+        return self.count_by_type.get(email_type, 0) > 0
+
+
+def summarize_email_history(email_history):
+    """Build the last-sent and count-by-type summaries from a history list."""
+    last_sent_by_type = {}
+    count_by_type = {}
+    for email_record in email_history:
+        email_type = email_record.get("type") or "unknown"
+        sent_at = email_record.get("sent_at")
+        if sent_at and sent_at > last_sent_by_type.get(email_type, ""):
+            last_sent_by_type[email_type] = sent_at
+        count_by_type[email_type] = count_by_type.get(email_type, 0) + 1
+    return last_sent_by_type, count_by_type
+
+
+def encode_members(members):
+    """Serialize a list of members to a JSON document (bytes)."""
+    return json_codec.dumps({"members": [member.to_dict() for member in members]})
+
+
+def decode_members(raw):
+    """Parse a JSON members document into a list of members.
+
+    Records that cannot be decoded are logged and skipped rather than
+    failing the whole document; a document that is not valid JSON raises.
+    """
+    document = json_codec.loads(raw)
+    members = []
+    for position, item in enumerate(document.get("members", [])):
+        try:
+            members.append(Member.from_dict(item))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.error(f"Skipping undecodable member record {position}: {type(e).__name__}: {str(e)}")
+    return members
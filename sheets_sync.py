@@ -0,0 +1,312 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import requests
+
+import json_codec
+from models import MemberStatus
+
+logger = logging.getLogger('blkout_nxt')
+
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+SHEETS_SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+# Status labels used in the sheet (see google_sheets.status_values in the config)
+STATUS_LABELS = {
+    MemberStatus.NEW: "New",
+    MemberStatus.WELCOMED: "Welcomed",
+    MemberStatus.ACTIVE: "Survey Completed",
+    MemberStatus.UNSUBSCRIBED: "Unsubscribed",
+}
+
+# Member fields the sync writes; any other sheet column (Organisation, the
+# n8n workflows' Notes, ...) belongs to someone else and is never touched
+SYNCED_FIELDS = ("email", "name", "role", "status", "date_added", "last_email_sent",
+                 "email_history", "opt_out", "source")
+
+
+def column_letter(index):
+    """Convert a zero-based column index to an A1 column letter."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+class ServiceAccountTokenProvider:
+    """Provide OAuth tokens from a service account file, refreshing only when expired."""
+
+    def __init__(self, service_account_file):
+        """Initialize the provider; credentials are built on first use and then reused."""
+        self.service_account_file = service_account_file
+        self._credentials = None
+
+    def __call__(self):
+        """Return a valid access token."""
+        # google-auth is only needed when syncing against the real API
+        from google.oauth2 import service_account
+        from google.auth.transport.requests import Request
+
+        if self._credentials is None:
+            self._credentials = service_account.Credentials.from_service_account_file(
+                self.service_account_file, scopes=SHEETS_SCOPES
+            )
+        if not self._credentials.valid:
+            self._credentials.refresh(Request())
+        return self._credentials.token
+
+
+class SheetsSync:
+    """Mirror the member store into the Subscribers Google Sheet.
+
+    The sync keeps a row-number index and a hash of each row it last wrote
+    in a local state file, so each run only pushes members whose row
+    changed: existing rows through one values:batchUpdate call per batch,
+    new members through one values:append call per batch. Only the cells of
+    SYNCED_FIELDS are compared and overwritten, so columns kept by hand or
+    by the n8n workflows survive. Each run holds
+    a lock on the state file and starts from what is on disk, so several
+    workers can share it without appending the same member twice.
+    """
+
+    def __init__(self, member_manager, config, token_provider=None, base_url=SHEETS_API_URL,
+                 session=None, batch_size=500, state_path="data/sheets_sync_state.json"):
+        """Initialize the sync from the google_sheets section of the config."""
+        sheets_config = config.get("google_sheets", {})
+        self.member_manager = member_manager
+        self.spreadsheet_id = sheets_config.get("subscriber_sheet_id")
+        self.sheet_name = sheets_config.get("subscriber_sheet_name", "Subscribers")
+        self.columns = sheets_config.get("columns", {})
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self.batch_size = batch_size
+        self.state_path = state_path
+
+        if token_provider is None:
+            service_account_file = os.environ.get("GOOGLE_SERVICE_ACCOUNT_FILE", "service_account.json")
+            token_provider = ServiceAccountTokenProvider(service_account_file)
+        self.token_provider = token_provider
+
+        self.state = self._load_state()
+
+    def sync(self):
+        """Push changed members to the sheet and return a summary."""
+        try:
+            with self._state_lock():
+                return self._sync()
+        except Exception as e:
+            logger.error(f"Error syncing sheet: {str(e)}")
+            return {"success": False, "message": f"Error: {str(e)}"}
+
+    def _sync(self):
+        """Run one sync while holding the state lock."""
+        # Another worker may have synced since this one last looked
+        self.state = self._load_state()
+        if not self.state.get("header"):
+            self._bootstrap()
+
+        header = self.state["header"]
+        row_index = self.state["row_index"]
+        row_hashes = self.state["row_hashes"]
+        positions = self._synced_positions(header)
+
+        updates = []
+        appends = []
+        for member in self.member_manager.get_all_members():
+            key = member.email.lower()
+            row = self.member_row(member, header)
+            row_hash = self._hash_row([row[position] for position in positions])
+
+            if row_hashes.get(key) == row_hash:
+                continue
+            if key in row_index:
+                updates.append((key, row, row_hash))
+            else:
+                appends.append((key, row, row_hash))
+
+        for start in range(0, len(updates), self.batch_size):
+            batch = updates[start:start + self.batch_size]
+            self._batch_update(batch, positions)
+            for key, _, row_hash in batch:
+                row_hashes[key] = row_hash
+            self._save_state()
+
+        for start in range(0, len(appends), self.batch_size):
+            batch = appends[start:start + self.batch_size]
+            first_row = self._append(batch, len(header))
+            for offset, (key, _, row_hash) in enumerate(batch):
+                row_index[key] = first_row + offset
+                row_hashes[key] = row_hash
+            self._save_state()
+
+        logger.info(f"Sheets sync: {len(updates)} rows updated, {len(appends)} rows appended")
+        return {"success": True, "message": "Sheet synced successfully", "updated": len(updates), "appended": len(appends)}
+
+    def member_row(self, member, header):
+        """Build a sheet row for a member, ordered to match the sheet header."""
+        status = STATUS_LABELS.get(member.status, "Other")
+        values = {
+            "email": member.email,
+            "name": member.name,
+            "role": member.member_type.value,
+            "status": status,
+            "date_added": member.date_added,
+            "last_email_sent": member.last_email_sent or "",
+            "email_history": json_codec.dumps(member.email_history).decode("utf-8"),
+            "opt_out": "TRUE" if member.status == MemberStatus.UNSUBSCRIBED else "FALSE",
+            "source": "BLKOUT NXT Backend",
+        }
+        by_column = {self.columns.get(field, field): value for field, value in values.items()}
+        return [by_column.get(column_name, "") for column_name in header]
+
+    def _synced_positions(self, header):
+        """The header positions of the columns the sync writes."""
+        synced_columns = {self.columns.get(field, field) for field in SYNCED_FIELDS}
+        return [position for position, column_name in enumerate(header) if column_name in synced_columns]
+
+    def reset(self):
+        """Forget the sync state so the next run re-reads the sheet."""
+        with self._state_lock():
+            self.state = {"header": None, "row_index": {}, "row_hashes": {}}
+            self._save_state()
+
+    def _bootstrap(self):
+        """Read the sheet once to learn its header, row numbers and current contents."""
+        values = self._get_values(self.sheet_name)
+        header = values[0] if values else []
+        if not header:
+            # Empty sheet: write the header in config order
+            header = list(self.columns.values())
+            self._request("PUT", f"/values/{self._quote_range(f'{self.sheet_name}!A1')}",
+                          params={"valueInputOption": "RAW"}, json={"values": [header]})
+
+        email_column = self.columns.get("email", "Email")
+        email_position = header.index(email_column) if email_column in header else 0
+        positions = self._synced_positions(header)
+
+        row_index = {}
+        row_hashes = {}
+        for row_number, row in enumerate(values[1:], start=2):
+            if len(row) <= email_position or not row[email_position]:
+                continue
+            key = row[email_position].lower()
+            row_index[key] = row_number
+            padded = row + [""] * (len(header) - len(row))
+            row_hashes[key] = self._hash_row([padded[position] for position in positions])
+
+        self.state = {"header": header, "row_index": row_index, "row_hashes": row_hashes}
+        self._save_state()
+
+    def _batch_update(self, batch, positions):
+        """Overwrite the synced cells of existing rows in one values:batchUpdate call."""
+        # Group the synced positions into runs of adjacent columns, one range each
+        runs = []
+        for position in positions:
+            if runs and runs[-1][1] == position - 1:
+                runs[-1][1] = position
+            else:
+                runs.append([position, position])
+
+        data = []
+        for key, row, _ in batch:
+            row_number = self.state["row_index"][key]
+            for first, last in runs:
+                data.append({
+                    "range": f"{self.sheet_name}!{column_letter(first)}{row_number}:{column_letter(last)}{row_number}",
+                    "values": [row[first:last + 1]]
+                })
+        self._request("POST", "/values:batchUpdate", json={"valueInputOption": "RAW", "data": data})
+
+    def _append(self, batch, column_count):
+        """Append new rows in one values:append call and return the first row number."""
+        sheet_range = f"{self.sheet_name}!A:{column_letter(column_count - 1)}"
+        result = self._request(
+            "POST", f"/values/{self._quote_range(sheet_range)}:append",
+            params={"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+            json={"values": [row for _, row, _ in batch]}
+        )
+        updated_range = result.get("updates", {}).get("updatedRange", "")
+        match = re.search(r"![A-Z]+(\d+)", updated_range)
+        if not match:
+            raise ValueError(f"Unexpected append response range: {updated_range}")
+        return int(match.group(1))
+
+    def _get_values(self, sheet_range):
+        """Read a range of values."""
+        return self._request("GET", f"/values/{self._quote_range(sheet_range)}").get("values", [])
+
+    def _request(self, method, path, **kwargs):
+        """Call the Sheets API for this spreadsheet."""
+        headers = {"Authorization": f"Bearer {self.token_provider()}"}
+        response = self.session.request(
+            method, f"{self.base_url}/{self.spreadsheet_id}{path}", headers=headers, timeout=30, **kwargs
+        )
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    @staticmethod
+    def _quote_range(sheet_range):
+        """URL-encode an A1 range for use in a path."""
+        return quote(sheet_range, safe="!:")
+
+    @staticmethod
+    def _hash_row(row):
+        """Hash a row's values for change detection."""
+        return hashlib.sha1(json.dumps(row, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _state_lock(self):
+        """Hold an exclusive lock on the state file, waiting for any other sync to finish."""
+        try:
+            import fcntl
+        except ImportError:
+            # No flock on Windows, where the backend runs as a single process
+            yield
+            return
+
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(f"{self.state_path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_state(self):
+        """Load the sync state from disk."""
+        try:
+            with open(self.state_path, 'rb') as f:
+                return json_codec.loads(f.read())
+        except FileNotFoundError:
+            return {"header": None, "row_index": {}, "row_hashes": {}}
+        except Exception as e:
+            logger.error(f"Error loading sheets sync state: {str(e)}")
+            return {"header": None, "row_index": {}, "row_hashes": {}}
+
+    def _save_state(self):
+        """Save the sync state to disk."""
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        temp_file = f"{self.state_path}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(json_codec.dumps(self.state))
+        os.replace(temp_file, self.state_path)
+
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    from member_manager import MemberManager
+
+    with open('blkout_nxt_config.json', 'r') as f:
+        config = json.load(f)
+
+    result = SheetsSync(MemberManager(), config).sync()
+    print(result)
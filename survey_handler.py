@@ -3,15 +3,24 @@ import os
 import datetime
 import logging
 from member_manager import MemberManager
+from models import MemberType
 
 logger = logging.getLogger('blkout_nxt')
 
+# Where each survey's URL lives in the "surveys" section of the config
+SURVEY_URL_KEYS = {
+    "ally_survey": "ally_survey_url",
+    "bqm_survey": "bqm_survey_url",
+    "qtipoc_organiser_survey": "organiser_survey_url",
+    "organisation_survey": "organisation_survey_url"
+}
+
 class SurveyHandler:
     """A class to handle survey responses."""
 
-    def __init__(self):
-        """Initialize the SurveyHandler."""
-        self.member_manager = MemberManager()
+    def __init__(self, member_manager=None):
+        """Initialize the SurveyHandler, sharing member_manager if one is given."""
+        self.member_manager = member_manager or MemberManager()
         self.config = self._load_config()
 
     def _load_config(self):
@@ -23,11 +32,11 @@ class SurveyHandler:
             logger.error(f"Error loading config: {str(e)}")
             # Return default config
             return {
-                "survey_links": {
-                    "ally_survey": "https://forms.gle/DerFGtG8vrZVPZaB7",
-                    "bqm_survey": "https://forms.gle/DerFGtG8vrZVPZaB7",
-                    "qtipoc_organiser_survey": "https://forms.gle/bvZm2UkcsL4LGSq17",
-                    "organisation_survey": "https://forms.gle/w3mZSj8KPiVnW3Zx7"
+                "surveys": {
+                    "ally_survey_url": "https://forms.gle/DerFGtG8vrZVPZaB7",
+                    "bqm_survey_url": "https://forms.gle/DerFGtG8vrZVPZaB7",
+                    "organiser_survey_url": "https://forms.gle/bvZm2UkcsL4LGSq17",
+                    "organisation_survey_url": "https://forms.gle/w3mZSj8KPiVnW3Zx7"
                 }
             }
 
@@ -42,31 +51,23 @@ class SurveyHandler:
                 return {"success": False, "message": "Member not found"}
 
             # Check if the survey type matches the member type
-            if not self._validate_survey_type(member["member_type"], survey_type):
-                logger.warning(f"Survey type {survey_type} does not match member type {member['member_type']}")
+            if not self._validate_survey_type(member.member_type, survey_type):
+                logger.warning(f"Survey type {survey_type} does not match member type {member.member_type.value}")
                 return {"success": False, "message": "Survey type does not match member type"}
 
             # Record the survey completion
-            result = self.member_manager.record_survey_completion(member["id"], survey_data)
+            result = self.member_manager.record_survey_completion(member.id, survey_data)
 
-            return {"success": result["success"], "message": result["message"], "member_id": member["id"]}
+            return {"success": result["success"], "message": result["message"], "member_id": member.id}
         except Exception as e:
             logger.error(f"Error processing survey response: {str(e)}")
             return {"success": False, "message": f"Error: {str(e)}"}
 
     def _validate_survey_type(self, member_type, survey_type):
         """Validate that the survey type matches the member type."""
-        # Map member types to survey types
-        member_type_map = {
-            "Ally": "ally_survey",
-            "Black Queer Men": "bqm_survey",
-            "QTIPOC Organiser": "qtipoc_organiser_survey",
-            "Organisation": "organisation_survey"
-        }
-
         # Check if the survey type matches the member type
-        expected_survey_type = member_type_map.get(member_type)
-        return expected_survey_type == survey_type
+        expected_survey_type = MemberType.parse(member_type).survey_key
+        return expected_survey_type is not None and expected_survey_type == survey_type
 
     def get_survey_link(self, member_id):
         """Get the appropriate survey link for a member."""
@@ -78,26 +79,18 @@ class SurveyHandler:
                 logger.warning(f"Member not found for ID: {member_id}")
                 return None
 
-            # Map member types to survey links from config
-            survey_links = self.config.get("survey_links", {})
-
-            # Map member types to survey link keys
-            member_type_map = {
-                "Ally": "ally_survey",
-                "Black Queer Men": "bqm_survey",
-                "QTIPOC Organiser": "qtipoc_organiser_survey",
-                "Organisation": "organisation_survey"
-            }
+            # Survey URLs come from the "surveys" section of the config
+            surveys = self.config.get("surveys", {})
 
             # Get the survey link key for this member type
-            survey_link_key = member_type_map.get(member["member_type"])
+            survey_link_key = member.member_type.survey_key
 
             if not survey_link_key:
-                logger.warning(f"No survey link key for member type: {member['member_type']}")
+                logger.warning(f"No survey link key for member type: {member.member_type.value}")
                 return None
 
             # Get the base survey link
-            survey_link = survey_links.get(survey_link_key)
+            survey_link = surveys.get(SURVEY_URL_KEYS[survey_link_key])
 
             if not survey_link:
                 logger.warning(f"No survey link found for key: {survey_link_key}")
@@ -105,9 +98,9 @@ class SurveyHandler:
 
             # Add the member's email as a parameter
             if "?" in survey_link:
-                survey_link = f"{survey_link}&emailAddress={member['email']}"
+                survey_link = f"{survey_link}&emailAddress={member.email}"
             else:
-                survey_link = f"{survey_link}?emailAddress={member['email']}"
+                survey_link = f"{survey_link}?emailAddress={member.email}"
 
             return survey_link
         except Exception as e:
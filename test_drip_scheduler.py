@@ -0,0 +1,136 @@
+import datetime
+import os
+import tempfile
+
+from drip_scheduler import DripScheduler
+from member_manager import MemberManager
+
+CONFIG = {
+    "surveys": {"reminder_wait_days": 3},
+    "drip_campaigns": {"initial_delay_days": 1, "email_frequency_days": 7}
+}
+
+START = datetime.datetime(2025, 5, 1, 9, 0)
+
+
+class FakeEmailSender:
+    """Records the emails the scheduler asks for; results can be queued to simulate failures."""
+
+    def __init__(self, member_manager):
+        self.member_manager = member_manager
+        self.config = CONFIG
+        self.sent = []
+        self.results = []
+
+    def get_drip_length(self, campaign):
+        return 3
+
+    def send_reminder_email(self, member_id):
+        return self._send(member_id, "reminder")
+
+    def send_drip_email(self, member_id, campaign, stage):
+        return self._send(member_id, f"drip_{campaign}")
+
+    def _send(self, member_id, email_type):
+        result = self.results.pop(0) if self.results else {"success": True, "message": "Email sent"}
+        self.sent.append((member_id, email_type, result["success"]))
+        if result["success"]:
+            self.member_manager.record_email_sent(member_id, email_type, email_type)
+        return result
+
+
+def make_scheduler(data_dir, signup_days=(0,)):
+    """A scheduler over a fresh store with one Ally member per signup day offset (from START)."""
+    manager = MemberManager(file_path=os.path.join(data_dir, "members.json"))
+    member_ids = []
+    for i, days in enumerate(signup_days):
+        member_id = manager.add_member(f"Member {i}", f"member{i}@example.com", "Ally")["member_id"]
+        manager.update_member(member_id, {"date_added": (START + datetime.timedelta(days=days)).isoformat()})
+        member_ids.append(member_id)
+    sender = FakeEmailSender(manager)
+    scheduler = DripScheduler(manager, sender, retry_delay_minutes=60, max_attempts=3)
+    scheduler.rebuild()
+    return scheduler, sender, member_ids
+
+
+def test_heap_ordering():
+    """Jobs come off the heap in due order, and only once they are due."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        scheduler, sender, member_ids = make_scheduler(data_dir, signup_days=(2, 0, 1))
+        assert scheduler.seconds_until_next(now=START) == 3 * 86400
+
+        assert scheduler.run_due(now=START + datetime.timedelta(days=3, hours=1)) == 1
+        assert scheduler.run_due(now=START + datetime.timedelta(days=6)) == 2
+        assert [member_id for member_id, _, _ in sender.sent] == [member_ids[1], member_ids[2], member_ids[0]]
+
+        # Reminders are sent once; nothing is left to do for members without a survey
+        assert scheduler.seconds_until_next() is None
+
+
+def test_recheck_before_send():
+    """A queued reminder is not sent once the member has completed the survey."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        scheduler, sender, member_ids = make_scheduler(data_dir)
+        scheduler.member_manager.record_survey_completion(member_ids[0], {"answer": "yes"})
+
+        assert scheduler.run_due(now=START + datetime.timedelta(days=4)) == 0
+        assert sender.sent == []
+
+
+def test_backoff_until_max_attempts():
+    """A failing job is retried after retry_delay, then twice that, and dropped at max_attempts."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        scheduler, sender, _ = make_scheduler(data_dir)
+        sender.results = [{"success": False, "message": "SMTP unavailable"}] * 3
+        due = START + datetime.timedelta(days=3)
+
+        scheduler.run_due(now=due)
+        assert scheduler.seconds_until_next(now=due) == 3600
+        scheduler.run_due(now=due + datetime.timedelta(minutes=30))
+        assert len(sender.sent) == 1
+
+        scheduler.run_due(now=due + datetime.timedelta(hours=1))
+        assert scheduler.seconds_until_next(now=due + datetime.timedelta(hours=1)) == 2 * 3600
+        scheduler.run_due(now=due + datetime.timedelta(hours=3))
+        assert len(sender.sent) == 3 and scheduler.seconds_until_next() is None
+
+
+def test_permanent_failure():
+    """A failure retrying cannot fix drops the job after one attempt."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        scheduler, sender, _ = make_scheduler(data_dir)
+        sender.results = [{"success": False, "message": "Could not generate survey link"}]
+
+        scheduler.run_due(now=START + datetime.timedelta(days=3))
+        assert len(sender.sent) == 1 and scheduler.seconds_until_next() is None
+
+
+def test_picks_up_store_changes():
+    """Members added by another process are queued when the store changes; retries keep their backoff."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        scheduler, sender, _ = make_scheduler(data_dir)
+        sender.results = [{"success": False, "message": "SMTP unavailable"}]
+        due = START + datetime.timedelta(days=3)
+        scheduler.run_due(now=due)
+        assert not scheduler.store_changed()
+
+        # Another worker signs a member up through its own manager
+        other = MemberManager(file_path=scheduler.member_manager.file_path)
+        new_id = other.add_member("New Member", "new@example.com", "Ally")["member_id"]
+        other.update_member(new_id, {"date_added": START.isoformat()})
+        assert scheduler.store_changed()
+
+        scheduler.rebuild()
+        assert scheduler.seconds_until_next(now=due) == 0
+        assert scheduler.run_due(now=due) == 1
+        assert sender.sent[-1][0] == new_id
+        assert scheduler.seconds_until_next(now=due) == 3600
+
+
+if __name__ == "__main__":
+    test_heap_ordering()
+    test_recheck_before_send()
+    test_backoff_until_max_attempts()
+    test_permanent_failure()
+    test_picks_up_store_changes()
+    print("Drip scheduler tests passed")
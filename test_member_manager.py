@@ -0,0 +1,99 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+from member_manager import MemberManager
+from models import MemberStatus
+
+
+def test_concurrent_updates():
+    """Writers in different threads and managers (as in separate workers) do not lose each other's changes."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        file_path = os.path.join(data_dir, "members.json")
+        manager = MemberManager(file_path=file_path)
+        member_id = manager.add_member("Member One", "one@example.com", "Ally")["member_id"]
+
+        def send_emails():
+            sender = MemberManager(file_path=file_path)
+            for i in range(20):
+                sender.record_email_sent(member_id, "drip_ally_drip", f"Drip {i}")
+
+        thread = threading.Thread(target=send_emails)
+        thread.start()
+        for _ in range(20):
+            manager.record_survey_completion(member_id, {"answer": "yes"})
+        thread.join()
+
+        member = manager.get_member(member_id=member_id)
+        assert member.status == MemberStatus.ACTIVE and member.survey_completed
+        assert member.count_by_type["drip_ally_drip"] == 20
+
+
+def test_unreadable_store_is_not_overwritten():
+    """If the store cannot be parsed, adding a member fails instead of saving over it."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        file_path = os.path.join(data_dir, "members.json")
+        manager = MemberManager(file_path=file_path)
+        with open(file_path, "w") as f:
+            f.write('{"members": [{"id": "m1", "email": "one@example.com"}')
+
+        result = manager.add_member("Member Two", "two@example.com", "Ally")
+        assert result["success"] is False
+        with open(file_path) as f:
+            assert f.read().startswith('{"members": [{"id": "m1"')
+
+
+def read_archive(manager):
+    with open(manager.archive_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_history_limit():
+    """Recording an email beyond history_limit moves the oldest entries to the archive."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = MemberManager(file_path=os.path.join(data_dir, "members.json"), history_limit=3)
+        member_id = manager.add_member("Member One", "one@example.com", "Ally")["member_id"]
+        for i in range(5):
+            manager.record_email_sent(member_id, "drip_ally", f"Drip {i}")
+
+        member = manager.get_member(member_id=member_id)
+        assert [entry["subject"] for entry in member.email_history] == ["Drip 2", "Drip 3", "Drip 4"]
+        assert [entry["subject"] for entry in read_archive(manager)] == ["Drip 0", "Drip 1"]
+        # The per-type summary still counts every email
+        assert member.count_by_type["drip_ally"] == 5
+
+
+def test_compact_email_history():
+    """Old entries are archived once, even when a failed save makes compaction run again."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = MemberManager(file_path=os.path.join(data_dir, "members.json"), history_limit=10)
+        member_id = manager.add_member("Member One", "one@example.com", "Ally")["member_id"]
+        now = datetime.datetime.now()
+        history = [{"type": "drip_ally", "subject": f"Drip {days}",
+                    "sent_at": (now - datetime.timedelta(days=days)).isoformat()}
+                   for days in (200, 120, 30, 1)]
+        manager.update_member(member_id, {"email_history": history})
+
+        save_members = manager.save_members
+        manager.save_members = lambda members: False
+        assert manager.compact_email_history(max_age_days=90)["success"] is False
+        manager.save_members = save_members
+
+        # A fresh manager (another process) retries the compaction
+        retry = MemberManager(file_path=manager.file_path, history_limit=10)
+        assert retry.compact_email_history(max_age_days=90)["archived"] == 2
+        assert [entry["subject"] for entry in read_archive(retry)] == ["Drip 200", "Drip 120"]
+        assert [entry["subject"] for entry in retry.get_member(member_id=member_id).email_history] == ["Drip 30", "Drip 1"]
+
+        assert retry.compact_email_history(max_age_days=90)["archived"] == 0
+        assert len(read_archive(retry)) == 2
+
+
+if __name__ == "__main__":
+    test_concurrent_updates()
+    test_unreadable_store_is_not_overwritten()
+    test_history_limit()
+    test_compact_email_history()
+    print("Member manager tests passed")
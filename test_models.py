@@ -0,0 +1,66 @@
+import json
+
+import json_codec
+from models import Member, MemberStatus, MemberType, decode_members, encode_members
+
+
+def test_member_round_trip():
+    """to_dict and from_dict are inverses, and old records get their email summaries rebuilt."""
+    member = Member(id="m1", name="Member One", email="one@example.com", member_type=MemberType.BQM,
+                    status=MemberStatus.ACTIVE, date_added="2025-05-01T09:00:00",
+                    survey_completed=True, drip_campaign="bqm", drip_stage=2)
+    member.record_email({"type": "welcome", "subject": "Welcome", "sent_at": "2025-05-01T09:00:01"})
+    assert Member.from_dict(member.to_dict()) == member
+
+    stored = member.to_dict()
+    del stored["last_sent_by_type"], stored["count_by_type"]
+    restored = Member.from_dict(stored)
+    assert restored.count_by_type == {"welcome": 1}
+    assert restored.last_sent_by_type == {"welcome": "2025-05-01T09:00:01"}
+
+
+def test_enum_parsing():
+    """Member types accept display values and workflow aliases; unknown values fall back."""
+    assert MemberType.parse("black queer men") is MemberType.BQM
+    assert MemberType.parse(" bqm ") is MemberType.BQM
+    assert MemberType.parse("organization") is MemberType.ORGANISATION
+    assert MemberType.parse("Volunteer") is MemberType.OTHER
+    assert MemberType.parse(None) is MemberType.OTHER
+    assert MemberStatus.parse("Unsubscribed") is MemberStatus.UNSUBSCRIBED
+    assert MemberStatus.parse("lapsed") is MemberStatus.NEW
+    assert MemberType.OTHER.survey_key is None and MemberType.ALLY.drip_campaign == "ally"
+
+
+def test_decode_skips_bad_records():
+    """A record missing its id or email is skipped; the rest of the document still loads."""
+    raw = json.dumps({"members": [
+        {"id": "m1", "name": "Member One", "email": "one@example.com", "member_type": "Ally"},
+        {"name": "No Id", "email": "noid@example.com"},
+        {"id": "m3", "email": "three@example.com", "drip_stage": "not a number"},
+        "not a record"
+    ]})
+    assert [member.id for member in decode_members(raw)] == ["m1"]
+
+
+def test_codec_fallback():
+    """The stdlib fallback encodes the same documents, including enums and datetimes."""
+    members = [Member(id="m1", name="Member One", email="one@example.com", member_type=MemberType.ALLY)]
+    fast = encode_members(members)
+
+    # msgspec is only bound when orjson is missing
+    saved = json_codec.orjson, getattr(json_codec, "msgspec", None)
+    json_codec.orjson = json_codec.msgspec = None
+    try:
+        assert json_codec.loads(encode_members(members)) == json_codec.loads(fast)
+        assert json_codec.dumps({"type": MemberType.BQM}) == b'{"type":"Black Queer Men"}'
+        assert decode_members(fast) == members
+    finally:
+        json_codec.orjson, json_codec.msgspec = saved
+
+
+if __name__ == "__main__":
+    test_member_round_trip()
+    test_enum_parsing()
+    test_decode_skips_bad_records()
+    test_codec_fallback()
+    print("Model tests passed")
@@ -0,0 +1,198 @@
+import os
+import re
+import tempfile
+from urllib.parse import unquote, urlparse
+
+from fake_http_server import FakeJSONHandler, start_fake_server
+from member_manager import MemberManager
+from sheets_sync import SheetsSync
+
+CONFIG = {
+    "google_sheets": {
+        "subscriber_sheet_id": "test-sheet",
+        "subscriber_sheet_name": "Subscribers",
+        "columns": {
+            "email": "Email",
+            "name": "Name",
+            "role": "Role",
+            "status": "Status",
+            "date_added": "DateAdded"
+        }
+    }
+}
+
+
+class FakeSheetsHandler(FakeJSONHandler):
+    """A minimal stand-in for the Sheets values API, backed by an in-memory grid."""
+
+    def _path(self):
+        path = unquote(urlparse(self.path).path)
+        self.record(path.split("/test-sheet", 1)[1])
+        return path
+
+    def _write_row(self, row_number, values, first_column=0):
+        rows = self.server.rows
+        while len(rows) < row_number:
+            rows.append([])
+        row = rows[row_number - 1]
+        row.extend([""] * (first_column + len(values) - len(row)))
+        row[first_column:first_column + len(values)] = values
+
+    def do_GET(self):
+        self._path()
+        self.reply({"values": self.server.rows})
+
+    def do_PUT(self):
+        self._path()
+        self._write_row(1, self.body()["values"][0])
+        self.reply({})
+
+    def do_POST(self):
+        path = self._path()
+        body = self.body()
+
+        if path.endswith(":batchUpdate"):
+            for item in body["data"]:
+                letters, row_number = re.search(r"!([A-Z]+)(\d+):", item["range"]).groups()
+                first_column = sum((ord(letter) - 64) * 26 ** i for i, letter in enumerate(reversed(letters))) - 1
+                self._write_row(int(row_number), item["values"][0], first_column)
+            self.reply({"totalUpdatedRows": len(body["data"])})
+        elif path.endswith(":append"):
+            if self.server.fail_appends:
+                self.server.fail_appends -= 1
+                self.reply({"error": {"message": "Backend error"}}, status=500)
+                return
+            first_row = len(self.server.rows) + 1
+            self.server.rows.extend(body["values"])
+            self.reply({"updates": {"updatedRange": f"Subscribers!A{first_row}:E{len(self.server.rows)}"}})
+        else:
+            self.send_error(404)
+
+
+class SyncFixture:
+    """A fake sheet, a member store with some members, and a way to build syncs against them."""
+
+    def __init__(self, data_dir, members=5):
+        self.data_dir = data_dir
+        self.server = start_fake_server(FakeSheetsHandler, rows=[], fail_appends=0)
+        self.manager = MemberManager(file_path=os.path.join(data_dir, "members.json"))
+        for i in range(members):
+            self.manager.add_member(f"Member {i}", f"member{i}@example.com", "Ally")
+
+    def make_sync(self, batch_size=3, config=CONFIG):
+        return SheetsSync(self.manager, config, token_provider=lambda: "test-token",
+                          base_url=f"{self.server.base_url}/v4/spreadsheets", batch_size=batch_size,
+                          state_path=os.path.join(self.data_dir, "sync_state.json"))
+
+    def close(self):
+        self.server.shutdown()
+
+
+def test_first_sync():
+    """The first run reads the sheet once, writes the header and appends every member in batches."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        fixture = SyncFixture(data_dir)
+        try:
+            result = fixture.make_sync().sync()
+            assert result == {"success": True, "message": "Sheet synced successfully", "updated": 0, "appended": 5}
+            assert [call.split(" ")[0] for call in fixture.server.calls] == ["GET", "PUT", "POST", "POST"]
+            assert fixture.server.rows[0] == ["Email", "Name", "Role", "Status", "DateAdded"]
+            assert len(fixture.server.rows) == 6
+        finally:
+            fixture.close()
+
+
+def test_no_op_sync():
+    """When nothing changed, a sync makes no API calls."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        fixture = SyncFixture(data_dir)
+        try:
+            fixture.make_sync().sync()
+            fixture.server.calls.clear()
+            result = fixture.make_sync().sync()
+            assert result["updated"] == 0 and result["appended"] == 0
+            assert fixture.server.calls == []
+        finally:
+            fixture.close()
+
+
+def test_changed_row():
+    """A changed member is written with a single batchUpdate of its row."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        fixture = SyncFixture(data_dir)
+        try:
+            fixture.make_sync().sync()
+            fixture.server.calls.clear()
+            member = fixture.manager.get_member(email="member3@example.com")
+            fixture.manager.update_member(member.id, {"name": "Renamed Member"})
+            result = fixture.make_sync().sync()
+            assert result["updated"] == 1 and result["appended"] == 0
+            assert fixture.server.calls == ["POST /values:batchUpdate"]
+            assert fixture.server.rows[4][:2] == ["member3@example.com", "Renamed Member"]
+        finally:
+            fixture.close()
+
+
+def test_append_failure():
+    """A failed append is reported, and only the batches that landed are remembered."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        fixture = SyncFixture(data_dir)
+        try:
+            fixture.server.fail_appends = 1
+            result = fixture.make_sync().sync()
+            assert result["success"] is False and "500" in result["message"]
+            assert len(fixture.server.rows) == 1
+
+            # The next run appends every member exactly once
+            result = fixture.make_sync().sync()
+            assert result["appended"] == 5 and len(fixture.server.rows) == 6
+        finally:
+            fixture.close()
+
+
+def test_unsynced_columns_survive():
+    """Columns the sync does not own, such as Organisation and the workflows' Notes, are never overwritten."""
+    config = {"google_sheets": dict(CONFIG["google_sheets"], columns=dict(
+        CONFIG["google_sheets"]["columns"], organisation="Organisation"))}
+    with tempfile.TemporaryDirectory() as data_dir:
+        fixture = SyncFixture(data_dir, members=2)
+        try:
+            member = fixture.manager.get_member(email="member1@example.com")
+            notes = "DripCampaign: ally_drip; DripStage: 2; NextDripDate: 2025-05-08"
+            fixture.server.rows[:] = [
+                ["Email", "Name", "Role", "Organisation", "Status", "DateAdded", "Notes"],
+                ["member1@example.com", "Old Name", "Ally", "BLKOUT", "New", member.date_added, notes]
+            ]
+
+            result = fixture.make_sync(config=config).sync()
+            assert result["updated"] == 1 and result["appended"] == 1
+            assert fixture.server.rows[1] == ["member1@example.com", "Member 1", "Ally", "BLKOUT", "New",
+                                              member.date_added, notes]
+        finally:
+            fixture.close()
+
+
+def test_shared_state():
+    """Syncs in different workers start from the state on disk, so a new member is appended once."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        fixture = SyncFixture(data_dir)
+        try:
+            first, second = fixture.make_sync(), fixture.make_sync()
+            first.sync()
+            second.sync()
+            fixture.manager.add_member("Member 5", "member5@example.com", "Ally")
+            assert first.sync()["appended"] == 1
+            assert second.sync()["appended"] == 0
+            assert len(fixture.server.rows) == 7
+        finally:
+            fixture.close()
+
+
+if __name__ == "__main__":
+    test_first_sync()
+    test_no_op_sync()
+    test_changed_row()
+    test_append_failure()
+    test_unsynced_columns_survive()
+    test_shared_state()
+    print("Sheets sync tests passed")